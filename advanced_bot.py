@@ -67,26 +67,21 @@ def start_command(message):
         inline_keypad=keypad
     )
 
-@bot.inline_handler
-def handle_inline_clicks(inline_message):
-    """مدیریت کلیک روی دکمه‌ها"""
-    button_id = inline_message.button_id
-    
-    if button_id == "profile":
-        show_profile(inline_message.chat_id)
-    
-    elif button_id == "settings":
-        show_settings(inline_message.chat_id)
-    
-    elif button_id == "support":
-        show_support(inline_message.chat_id)
-    
-    elif button_id == "location":
-        send_location(inline_message.chat_id)
-    
-    elif button_id == "products":
-        # این برای دکمه انتخاب، پاسخ در هندلر جداگانه مدیریت می‌شود
-        pass
+@bot.button_handler("profile")
+def profile_clicked(inline_message):
+    show_profile(inline_message.chat_id)
+
+@bot.button_handler("settings")
+def settings_clicked(inline_message):
+    show_settings(inline_message.chat_id)
+
+@bot.button_handler("support")
+def support_clicked(inline_message):
+    show_support(inline_message.chat_id)
+
+@bot.button_handler("location")
+def location_clicked(inline_message):
+    send_location(inline_message.chat_id)
 
 def show_profile(chat_id):
     """نمایش پروفایل کاربر"""
@@ -198,7 +193,7 @@ if __name__ == "__main__":
         print("🔸 از Ctrl+C برای توقف استفاده کنید")
         
         bot.run_polling(interval=1)
-        
+    
     except KeyboardInterrupt:
         print("\n⏹ بات متوقف شد")
     except Exception as e:
@@ -0,0 +1,354 @@
+import asyncio
+import inspect
+import time
+from typing import List, Optional, Dict, Any, Callable, Union, AsyncIterator
+from .async_client import AsyncClient
+from .keypad import CompiledKeypad
+from .bot import BaseBot
+from .dispatcher import AsyncDispatcher
+from .broadcast import AsyncBroadcaster, BroadcastCheckpoint, BroadcastResult
+from .offsets import OffsetStore, OffsetCommitter, open_offset_store
+from .dedup import DedupWindow
+from .recorder import UpdateRecorder
+from .tracing import Span, UpdateTrace, handler_name
+from .models import *
+from .enums import *
+from .exceptions import *
+from .utils import parse_update_data
+
+class AsyncBot(BaseBot, AsyncClient):
+    """
+    نسخه‌ی ناهمگام Bot؛ هندلرها می‌توانند تابع عادی یا async def باشند
+    """
+    
+    def __init__(self, token: str, timeout: int = 30, workers: int = 0, queue_size: int = 1000,
+                 message_model: str = "dataclass", dedup: Optional[DedupWindow] = None,
+                 recorder: Optional[UpdateRecorder] = None, **kwargs):
+        super().__init__(token, timeout, **kwargs)
+        self._setup_handlers(message_model, dedup, recorder)
+        self._polling_task = None
+        
+        # با workers > 0 هندلرها در taskهای جدا و با حفظ ترتیب هر چت اجرا می‌شوند
+        self._dispatcher = None
+        if workers:
+            self._dispatcher = AsyncDispatcher(
+                workers, queue_size, on_error=lambda e: self._handle_error(e, None)
+            )
+            if self.metrics is not None:
+                self.metrics.track_queue("dispatcher", lambda: self._dispatcher.pending)
+    
+    async def get_bot_info(self) -> Bot:
+        """
+        دریافت و کش اطلاعات بات
+        
+        با response_cache اطلاعات بعد از TTL متد getMe دوباره دریافت می‌شود.
+        """
+        if self.response_cache is not None and self.response_cache.enabled("getMe"):
+            self._bot_info = await self.get_me()
+        elif not self._bot_info:
+            self._bot_info = await self.get_me()
+        return self._bot_info
+    
+    async def send_message_with_buttons(
+        self,
+        chat_id: str,
+        text: str,
+        buttons: List[List[tuple]],
+        **kwargs
+    ) -> str:
+        """ارسال پیام با دکمه‌های ساده"""
+        keypad = self._build_button_keypad(buttons)
+        return await self.send_message(chat_id, text, inline_keypad=keypad, **kwargs)
+    
+    def broadcast(
+        self,
+        chat_ids,
+        text: str,
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
+        disable_notification: bool = False,
+        concurrency: int = 100,
+        checkpoint: Union[str, BroadcastCheckpoint, None] = None
+    ) -> AsyncIterator[BroadcastResult]:
+        """
+        ارسال یک پیام به تعداد زیادی چت (async for روی نتیجه‌ها)
+        
+        chat_ids می‌تواند iterable یا async iterable باشد.
+        """
+        inline_keypad = self.compile_keypad(inline_keypad) if inline_keypad else None
+        chat_keypad = self.compile_keypad(chat_keypad) if chat_keypad else None
+        
+        def send(chat_id: str):
+            return self.send_message(
+                chat_id, text, inline_keypad=inline_keypad, chat_keypad=chat_keypad,
+                chat_keypad_type=chat_keypad_type, disable_notification=disable_notification
+            )
+        
+        return AsyncBroadcaster(send, concurrency, checkpoint).run(chat_ids)
+    
+    async def _call_handler(self, handler: Callable, argument: Any):
+        """اجرای هندلر و انتظار برای نتیجه در صورت ناهمگام بودن"""
+        result = handler(argument)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    
+    async def process_updates(self, updates_data: Dict[str, Any]):
+        """پردازش آپدیت‌ها"""
+        updates = updates_data.get("updates", [])
+        if self.recorder is not None and updates:
+            self._record_updates(updates, "polling")
+        if self.metrics is not None:
+            self.metrics.observe_page(updates)
+        fetch = self.tracer.page_fetch(updates_data) if self.tracer is not None else None
+        
+        for update_data in updates:
+            await self._process_single_update(update_data, fetch)
+    
+    async def _process_single_update(self, update_data: Dict[str, Any], fetch: Optional[Span] = None):
+        """پردازش یک آپدیت (یا ارسال آن به صف dispatcher)"""
+        if self.dedup is not None and self.dedup.is_duplicate(update_data):
+            return
+        trace = self.tracer.receive(update_data, fetch) if self.tracer is not None else None
+        if self._dispatcher:
+            # در صورت پر بودن صف، submit منتظر می‌ماند و پولینگ هم متوقف می‌شود
+            await self._dispatcher.submit(self._update_key(update_data), self._handle_update, update_data, trace)
+        else:
+            await self._handle_update(update_data, trace)
+    
+    async def _handle_update(self, update_data: Dict[str, Any], trace: Optional[UpdateTrace] = None):
+        """اجرای هندلرهای یک آپدیت (با trace، در محدوده‌ی همان trace)"""
+        if trace is None:
+            return await self._pipeline(update_data)
+        token = self.tracer.enter(trace)
+        try:
+            await self._pipeline(update_data)
+        finally:
+            self.tracer.exit(trace, token)
+    
+    async def _run_update(self, update_data: Dict[str, Any]):
+        parsed_data = parse_update_data(update_data)
+        if not parsed_data:
+            return
+        
+        # اجرای هندلرهای عمومی آپدیت
+        for handler in self._update_handlers:
+            await self._call_handler(handler, parsed_data)
+        
+        if self.tracer is not None:
+            span = self.tracer.start("parse", parsed_data.get("type", ""))
+            context, handlers = self._route_update(parsed_data)
+            self.tracer.finish(span)
+        else:
+            context, handlers = self._route_update(parsed_data)
+        
+        if self.metrics is not None or self.tracer is not None:
+            await self._run_instrumented(handlers, context, parsed_data.get("type"))
+            return
+        for handler in handlers:
+            try:
+                await self._call_handler(handler, context)
+            except Exception as e:
+                self._handle_error(e, context)
+    
+    async def _run_instrumented(self, handlers: List[Callable], context: Any, update_type: Optional[str]):
+        """اجرای هندلرها با ثبت زمان و خطای هر کدام در metrics و tracer"""
+        metrics, tracer = self.metrics, self.tracer
+        if metrics is not None:
+            metrics.observe_update(update_type)
+        for handler in handlers:
+            span = tracer.start("handler", handler_name(handler)) if tracer is not None else None
+            started = time.perf_counter()
+            error = None
+            try:
+                await self._call_handler(handler, context)
+            except Exception as e:
+                error = e
+                self._handle_error(e, context)
+            if span is not None:
+                tracer.finish(span, error)
+            if metrics is not None:
+                metrics.observe_handler(handler, time.perf_counter() - started, error)
+    
+    async def run_polling(self, interval: float = 2, limit: int = 100,
+                          pipelined: bool = False, min_interval: float = 0.1,
+                          offset_store: Union[str, OffsetStore, None] = None,
+                          commit_every: int = 1, commit_interval: Optional[float] = None):
+        """
+        اجرای بات با روش پولینگ
+        
+        با pipelined=True صفحه‌ی بعدی آپدیت‌ها هم‌زمان با پردازش صفحه‌ی فعلی
+        دریافت می‌شود و interval فقط سقف مکث تطبیقی برای صفحه‌های خالی است.
+        
+        با offset_store (آبجکت OffsetStore یا مسیر فایل) پولینگ از آخرین offset
+        ثبت‌شده ادامه پیدا می‌کند و offset هر commit_every صفحه (یا بعد از
+        commit_interval ثانیه) پس از پایان هندلرهای آن صفحه‌ها ثبت می‌شود.
+        """
+        store, owned = open_offset_store(offset_store)
+        committer = OffsetCommitter(store, commit_every, commit_interval) if store else None
+        try:
+            if pipelined:
+                return await self._run_pipelined_polling(interval, limit, min_interval, committer)
+            return await self._run_simple_polling(interval, limit, committer)
+        finally:
+            if committer:
+                await self._commit_offset(committer, drain=True)
+            if owned:
+                store.close()
+    
+    async def _commit_offset(self, committer: OffsetCommitter, drain: bool = False):
+        """ثبت offset صفحه‌های تمام‌شده؛ با drain=True (هنگام توقف) اول صف dispatcher خالی می‌شود"""
+        if drain and self._dispatcher:
+            await self._dispatcher.join()
+        try:
+            # نوشتن روی دیسک (و fsync) event loop را بلاک نمی‌کند
+            await asyncio.get_running_loop().run_in_executor(None, committer.commit)
+        except Exception as e:
+            print(f"❌ خطا در ثبت offset: {e}")
+    
+    async def _advance_offset(self, committer: Optional[OffsetCommitter], offset_id: Optional[str]):
+        if not committer or not offset_id:
+            return
+        done = committer.track(offset_id)
+        if self._dispatcher:
+            # offset وقتی قابل ثبت است که هندلرهای همین صفحه (و قبلی‌ها) تمام شده باشند
+            self._dispatcher.after_pending(done)
+        else:
+            done()
+        if committer.due():
+            await self._commit_offset(committer)
+    
+    async def _run_simple_polling(self, interval: float, limit: int, committer: Optional[OffsetCommitter]):
+        self._is_running = True
+        offset_id = committer.load() if committer else None
+        
+        bot_info = await self.get_bot_info()
+        print(f"🤖 بات @{bot_info.username} در حال اجرا با پولینگ...")
+        
+        try:
+            while self._is_running:
+                try:
+                    updates_data = await self.get_updates(limit=limit, offset_id=offset_id)
+                    await self.process_updates(updates_data)
+                    
+                    # آپدیت offset برای دریافت آپدیت‌های جدید
+                    offset_id = updates_data.get("next_offset_id")
+                    await self._advance_offset(committer, offset_id)
+                    
+                    await asyncio.sleep(interval)
+                
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"❌ خطا در پولینگ: {e}")
+                    await asyncio.sleep(interval)
+        finally:
+            self._is_running = False
+    
+    async def _run_pipelined_polling(self, interval: float, limit: int, min_interval: float,
+                                     committer: Optional[OffsetCommitter] = None):
+        """پولینگ با پیش‌دریافت صفحه‌ی بعدی در یک task جداگانه"""
+        self._is_running = True
+        offset_id = committer.load() if committer else None
+        delay = min_interval
+        
+        bot_info = await self.get_bot_info()
+        print(f"🤖 بات @{bot_info.username} در حال اجرا با پولینگ...")
+        
+        pending = asyncio.ensure_future(self.get_updates(limit=limit, offset_id=offset_id))
+        
+        try:
+            while self._is_running:
+                try:
+                    updates_data = await pending
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"❌ خطا در پولینگ: {e}")
+                    await asyncio.sleep(interval)
+                    pending = asyncio.ensure_future(self.get_updates(limit=limit, offset_id=offset_id))
+                    continue
+                
+                updates = updates_data.get("updates", [])
+                offset_id = updates_data.get("next_offset_id") or offset_id
+                sleep_for, delay = self._next_poll_delay(len(updates), delay, min_interval, interval)
+                
+                if sleep_for:
+                    await self._advance_offset(committer, updates_data.get("next_offset_id"))
+                    await asyncio.sleep(sleep_for)
+                    pending = asyncio.ensure_future(self.get_updates(limit=limit, offset_id=offset_id))
+                    continue
+                
+                # دریافت صفحه‌ی بعد هم‌زمان با پردازش صفحه‌ی فعلی
+                pending = asyncio.ensure_future(self.get_updates(limit=limit, offset_id=offset_id))
+                try:
+                    await self.process_updates(updates_data)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"❌ خطا در پردازش آپدیت‌ها: {e}")
+                await self._advance_offset(committer, updates_data.get("next_offset_id"))
+        finally:
+            self._is_running = False
+            if not pending.done():
+                pending.cancel()
+    
+    def start_polling(self, interval: float = 2, limit: int = 100,
+                      pipelined: bool = False, min_interval: float = 0.1, **kwargs) -> "asyncio.Task":
+        """
+        شروع پولینگ به صورت یک task در event loop جاری (kwargs همان پارامترهای
+        offset در run_polling)
+        """
+        self._polling_task = asyncio.ensure_future(
+            self.run_polling(interval, limit, pipelined, min_interval, **kwargs)
+        )
+        return self._polling_task
+    
+    async def stop_polling(self):
+        """توقف پولینگ"""
+        self._is_running = False
+        if self._polling_task and not self._polling_task.done():
+            self._polling_task.cancel()
+            try:
+                await self._polling_task
+            except asyncio.CancelledError:
+                pass
+        self._polling_task = None
+        if self._dispatcher:
+            await self._dispatcher.stop(drain=True)
+    
+    async def set_webhook(self, url: str,
+                          receive_update: bool = True,
+                          receive_inline_message: bool = True,
+                          receive_query: bool = False,
+                          get_selection_item: bool = False,
+                          search_selection_items: bool = False) -> bool:
+        """تنظیم وب‌هوک برای انواع مختلف"""
+        endpoint_types = self._webhook_endpoint_types(
+            receive_update, receive_inline_message, receive_query,
+            get_selection_item, search_selection_items
+        )
+        results = await asyncio.gather(*[
+            self.update_bot_endpoints(url, endpoint_type) for endpoint_type in endpoint_types
+        ])
+        return all(results)
+    
+    async def process_webhook_update(self, update_data: Dict[str, Any]):
+        """پردازش آپدیت دریافتی از وب‌هوک"""
+        if self.recorder is not None:
+            self._record_updates([update_data], "webhook")
+        await self._process_single_update(update_data)
+    
+    async def run_webhook(self, host: str = "0.0.0.0", port: int = 8080, path: str = "/", **kwargs):
+        """
+        اجرای سرور وب‌هوک داخلی تا لغو شدن task؛ هنگام توقف آپدیت‌های
+        دریافت‌شده پیش از خروج پردازش می‌شوند
+        """
+        self._is_running = True
+        try:
+            await self.create_webhook_server(host, port, path, **kwargs).serve_forever()
+        finally:
+            self._is_running = False
+            if self._dispatcher:
+                await self._dispatcher.stop(drain=True)
@@ -0,0 +1,502 @@
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from .client import BaseClient
+from .codec import JSONCodec
+from .filecache import FileIdCache, content_hash
+from .cache import _RETRY, ResponseCache
+from .upload import DEFAULT_CHUNK_SIZE, MultipartEncoder, ProgressCallback
+from .models import *
+from .enums import *
+from .exceptions import *
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy, parse_retry_after
+from .keypad import CompiledKeypad
+from .outbox import Outbox, AsyncOutboxSender
+from .metrics import Metrics
+from .tracing import Tracer
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+class AsyncClient(BaseClient):
+    """
+    کلاینت ناهمگام (asyncio) برای ارتباط با API روبیکا
+    
+    همه‌ی درخواست‌ها از یک ClientSession و استخر اتصال مشترک استفاده می‌کنند.
+    برای استفاده نیاز به نصب aiohttp است: pip install ruplika[async]
+    """
+    
+    JSON_HEADERS = {'Content-Type': 'application/json'}
+    
+    def __init__(
+        self,
+        token: str,
+        timeout: int = 30,
+        pool_size: int = 100,
+        pool_size_per_host: int = 0,
+        session: Optional["aiohttp.ClientSession"] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        keypad_cache_size: int = 256,
+        codec: Optional[JSONCodec] = None,
+        file_id_cache: Optional[FileIdCache] = None,
+        response_cache: Optional[ResponseCache] = None,
+        keep_alive: bool = True,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        outbox: Optional[Outbox] = None,
+        outbox_concurrency: int = 16,
+        api_url: Optional[str] = None,
+        metrics: Optional[Metrics] = None,
+        tracer: Optional[Tracer] = None
+    ):
+        if aiohttp is None:
+            raise ImportError("AsyncClient requires aiohttp: pip install ruplika[async]")
+        
+        super().__init__(
+            token, timeout, rate_limiter, retry_policy, keypad_cache_size, codec, file_id_cache, response_cache,
+            api_url, metrics, tracer
+        )
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._session = session
+        self._owns_session = session is None
+        self._upload_flights: Dict[Tuple[str, FileTypeEnum], "asyncio.Future"] = {}
+        # با outbox متدهای send_* درخواست را در صف پایدار ثبت و شناسه‌ی کار را
+        # برمی‌گردانند؛ ارسال با اولین enqueue یا start_outbox شروع می‌شود
+        self.outbox = outbox
+        self.outbox_sender = AsyncOutboxSender(self, outbox, outbox_concurrency) if outbox is not None else None
+        if outbox is not None and metrics is not None:
+            metrics.track_queue("outbox", outbox.__len__)
+    
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def _get_session(self) -> "aiohttp.ClientSession":
+        """ساخت تنبل سشن مشترک (باید داخل event loop صدا زده شود)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                force_close=not self.keep_alive
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=self.timeout,
+                    sock_connect=self.connect_timeout,
+                    sock_read=self.read_timeout
+                ),
+                headers={'User-Agent': self.USER_AGENT}
+            )
+            self._owns_session = True
+        return self._session
+    
+    async def close(self):
+        """بستن سشن و آزاد کردن اتصال‌های استخر"""
+        await self.stop_outbox()
+        if self._session is not None and self._owns_session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    def start_outbox(self):
+        """شروع ارسال کارهای outbox (از جمله کارهای باقی‌مانده از اجرای قبلی)"""
+        if self.outbox_sender is not None:
+            self.outbox_sender.start()
+    
+    async def flush_outbox(self, timeout: Optional[float] = None) -> bool:
+        """انتظار تا ارسال کارهای آماده‌ی outbox؛ False در صورت پایان timeout"""
+        if self.outbox_sender is None:
+            return True
+        self.outbox_sender.start()
+        return await self.outbox_sender.flush(timeout)
+    
+    async def stop_outbox(self):
+        """توقف ارسال outbox؛ کارهای ارسال‌نشده برای اجرای بعد در صف می‌مانند"""
+        if self.outbox_sender is not None:
+            await self.outbox_sender.stop()
+    
+    async def _send(self, method: str, data: Dict[str, Any]) -> str:
+        """ارسال مستقیم یا ثبت در outbox؛ message_id یا شناسه‌ی کار outbox"""
+        if self.outbox is not None:
+            job_id = await self.outbox_sender.enqueue(method, self.codec.encode_body(data))
+            return str(job_id)
+        result = await self._make_request(method, data)
+        return result.get("message_id", "")
+    
+    async def _make_request(self, method: str, data: Dict[str, Any] = None, retry: bool = True) -> Dict[str, Any]:
+        """
+        ارسال درخواست به API روبیکا (با تلاش مجدد طبق retry_policy)؛ با
+        retry=False فقط یک تلاش انجام می‌شود (مثلا برای outbox که خودش تلاش
+        مجدد را مدیریت می‌کند)
+        """
+        if self.tracer is None:
+            return await self._request_with_retry(method, data, retry)
+        
+        span = self.tracer.start("request", method)
+        try:
+            result = await self._request_with_retry(method, data, retry)
+        except Exception as e:
+            self.tracer.finish(span, e)
+            raise
+        self.tracer.finish(span, result=result)
+        return result
+    
+    async def _request_ok(self, method: str, data: Dict[str, Any]) -> bool:
+        """مانند Client._request_ok"""
+        try:
+            await self._make_request(method, data)
+            return True
+        except APIException:
+            if self.retry_policy is not None and self.retry_policy.raise_errors:
+                raise
+            return False
+    
+    async def _request_with_retry(self, method: str, data: Dict[str, Any] = None, retry: bool = True) -> Dict[str, Any]:
+        policy = self.retry_policy if retry else None
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                result = await self._send_request(method, data)
+            except RubikaException as e:
+                if self.metrics is not None:
+                    self.metrics.observe_request(method, time.perf_counter() - started, e)
+                delay = policy.next_delay(method, e, attempt) if policy else None
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            
+            if self.metrics is not None:
+                self.metrics.observe_request(method, time.perf_counter() - started)
+            if policy:
+                policy.on_success()
+            return result
+    
+    async def _cached_request(self, method: str, key: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """درخواست متدهای خواندنی از طریق response_cache (در صورت وجود)"""
+        if self.response_cache is None or not self.response_cache.enabled(method):
+            return await self._make_request(method, data)
+        return await self.response_cache.get_or_load_async(method, key, lambda: self._make_request(method, data))
+    
+    async def _send_request(self, method: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """یک بار ارسال درخواست به API روبیکا"""
+        url = f"{self.base_url}/{method}"
+        session = await self._get_session()
+        
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async(method, data.get("chat_id") if data else None)
+        
+        try:
+            async with session.post(url, data=self.codec.encode_body(data), headers=self.JSON_HEADERS) as response:
+                if response.status == 401:
+                    raise AuthenticationException("Invalid token")
+                if response.status == 429:
+                    raise RateLimitException(
+                        f"HTTP Error: {response.status}, message='{response.reason}'",
+                        retry_after=parse_retry_after(response.headers.get("Retry-After"))
+                    )
+                response.raise_for_status()
+                
+                return self._decode_response(await response.read(), response.status)
+        
+        except aiohttp.ClientConnectorError:
+            raise ConnectException("Connection error")
+        except asyncio.TimeoutError:
+            raise NetworkException("Request timeout")
+        except aiohttp.ClientConnectionError:
+            raise NetworkException("Connection error")
+        except aiohttp.ClientResponseError as e:
+            raise APIException(f"HTTP Error: {e}", status_code=e.status)
+        except aiohttp.ClientError as e:
+            raise NetworkException(f"Request failed: {e}")
+    
+    async def get_me(self) -> Bot:
+        """دریافت اطلاعات بات"""
+        data = await self._cached_request("getMe", "")
+        return self._parse_bot_info(data)
+    
+    async def send_message(
+        self,
+        chat_id: str,
+        text: str,
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
+        reply_to_message_id: Optional[str] = None,
+        disable_notification: bool = False
+    ) -> str:
+        """ارسال پیام"""
+        data = self._send_message_data(
+            chat_id, text, inline_keypad, chat_keypad,
+            chat_keypad_type, reply_to_message_id, disable_notification
+        )
+        
+        return await self._send("sendMessage", data)
+    
+    async def send_poll(self, chat_id: str, question: str, options: List[str]) -> str:
+        """ارسال نظرسنجی"""
+        data = self._send_poll_data(chat_id, question, options)
+        
+        return await self._send("sendPoll", data)
+    
+    async def send_location(
+        self,
+        chat_id: str,
+        latitude: str,
+        longitude: str,
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
+        reply_to_message_id: Optional[str] = None,
+        disable_notification: bool = False
+    ) -> str:
+        """ارسال موقعیت مکانی"""
+        data = self._send_location_data(
+            chat_id, latitude, longitude, inline_keypad, chat_keypad,
+            chat_keypad_type, reply_to_message_id, disable_notification
+        )
+        
+        return await self._send("sendLocation", data)
+    
+    async def send_contact(
+        self,
+        chat_id: str,
+        first_name: str,
+        last_name: str,
+        phone_number: str,
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
+        reply_to_message_id: Optional[str] = None,
+        disable_notification: bool = False
+    ) -> str:
+        """ارسال مخاطب"""
+        data = self._send_contact_data(
+            chat_id, first_name, last_name, phone_number, inline_keypad,
+            chat_keypad, chat_keypad_type, reply_to_message_id, disable_notification
+        )
+        
+        return await self._send("sendContact", data)
+    
+    async def get_chat(self, chat_id: str) -> Chat:
+        """دریافت اطلاعات چت"""
+        data = self._get_chat_data(chat_id)
+        result = await self._cached_request("getChat", chat_id, data)
+        return self._parse_chat(result)
+    
+    async def get_updates(self, limit: int = 100, offset_id: Optional[str] = None) -> Dict[str, Any]:
+        """دریافت آخرین آپدیت‌ها"""
+        data = self._get_updates_data(limit, offset_id)
+        return await self._make_request("getUpdates", data)
+    
+    async def forward_message(
+        self,
+        from_chat_id: str,
+        message_id: str,
+        to_chat_id: str,
+        disable_notification: bool = False
+    ) -> str:
+        """فوروارد کردن پیام"""
+        data = self._forward_message_data(from_chat_id, message_id, to_chat_id, disable_notification)
+        
+        result = await self._make_request("forwardMessage", data)
+        return result.get("new_message_id", "")
+    
+    async def edit_message_text(self, chat_id: str, message_id: str, text: str) -> bool:
+        """ویرایش متن پیام"""
+        data = self._edit_message_text_data(chat_id, message_id, text)
+        
+        return await self._request_ok("editMessageText", data)
+    
+    async def edit_inline_keypad(self, chat_id: str, message_id: str, inline_keypad: Union[Keypad, CompiledKeypad, Dict]) -> bool:
+        """ویرایش اینلاین کیپد"""
+        data = self._edit_inline_keypad_data(chat_id, message_id, inline_keypad)
+        
+        return await self._request_ok("editInlineKeypad", data)
+    
+    async def delete_message(self, chat_id: str, message_id: str) -> bool:
+        """حذف پیام"""
+        data = self._delete_message_data(chat_id, message_id)
+        
+        return await self._request_ok("deleteMessage", data)
+    
+    async def set_commands(self, commands: List[BotCommand]) -> bool:
+        """تنظیم دستورات بات"""
+        data = self._set_commands_data(commands)
+        
+        return await self._request_ok("setCommands", data)
+    
+    async def update_bot_endpoints(self, url: str, endpoint_type: UpdateEndpointTypeEnum) -> bool:
+        """آپدیت آدرس بات"""
+        data = self._update_bot_endpoints_data(url, endpoint_type)
+        
+        return await self._request_ok("updateBotEndpoints", data)
+    
+    async def edit_chat_keypad(
+        self,
+        chat_id: str,
+        chat_keypad_type: ChatKeypadTypeEnum,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None
+    ) -> bool:
+        """ویرایش یا حذف کیپد چت"""
+        data = self._edit_chat_keypad_data(chat_id, chat_keypad_type, chat_keypad)
+        
+        return await self._request_ok("editChatKeypad", data)
+    
+    async def get_file(self, file_id: str) -> str:
+        """دریافت لینک دانلود فایل"""
+        data = self._get_file_data(file_id)
+        result = await self._cached_request("getFile", file_id, data)
+        return result.get("download_url", "")
+    
+    async def send_file(
+        self,
+        chat_id: str,
+        file_id: str,
+        text: str = "",
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
+        reply_to_message_id: Optional[str] = None,
+        disable_notification: bool = False
+    ) -> str:
+        """ارسال فایل"""
+        data = self._send_file_data(
+            chat_id, file_id, text, inline_keypad, chat_keypad,
+            chat_keypad_type, reply_to_message_id, disable_notification
+        )
+        
+        return await self._send("sendFile", data)
+    
+    async def request_send_file(self, file_type: FileTypeEnum) -> Dict[str, Any]:
+        """درخواست آپلود فایل"""
+        data = {"type": file_type.value}
+        return await self._make_request("requestSendFile", data)
+    
+    async def upload_file(
+        self,
+        file_path: Any,
+        file_type: Optional[FileTypeEnum] = None,
+        file_name: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap: bool = False,
+        size: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        آپلود فایل به سرور روبیکا
+        
+        مانند Client.upload_file؛ file_path می‌تواند async iterable از bytes هم
+        باشد. timeout کل آپلود است و به صورت پیش‌فرض فقط مهلت هر خواندن اعمال می‌شود.
+        """
+        file_type, encoder = self._upload_encoder(
+            file_path, file_type, file_name, progress, chunk_size, use_mmap, size
+        )
+        
+        digest = None
+        if self.file_id_cache is not None:
+            loop = asyncio.get_running_loop()
+            digest = await loop.run_in_executor(None, content_hash, file_path, chunk_size)
+        if digest is None:
+            return await self._upload(file_type, encoder, timeout)
+        
+        key = (digest, file_type)
+        while True:
+            file_id = self.file_id_cache.get(digest, file_type)
+            if file_id:
+                return file_id
+            flight = self._upload_flights.get(key)
+            if flight is None:
+                break
+            # اگر آپلودکننده لغو شود یکی از منتظرها آپلود را دوباره انجام می‌دهد
+            file_id = await asyncio.shield(flight)
+            if file_id is not _RETRY:
+                return file_id
+        
+        flight = self._upload_flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            file_id = await self._upload(file_type, encoder, timeout)
+            if file_id:
+                self.file_id_cache.put(digest, file_type, file_id)
+            flight.set_result(file_id)
+            return file_id
+        except asyncio.CancelledError:
+            flight.set_result(_RETRY)
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            # اگر منتظر دیگری نباشد خطا همین‌جا مصرف می‌شود
+            flight.exception()
+            raise
+        finally:
+            self._upload_flights.pop(key, None)
+    
+    async def _upload(self, file_type: FileTypeEnum, encoder: MultipartEncoder, timeout: Optional[float] = None) -> str:
+        # دریافت آدرس آپلود
+        upload_data = await self.request_send_file(file_type)
+        upload_url = upload_data.get("upload_url")
+        
+        if not upload_url:
+            raise FileUploadException("Failed to get upload URL")
+        
+        headers = {'Content-Type': encoder.content_type}
+        if encoder.length is not None:
+            headers['Content-Length'] = str(encoder.length)
+        
+        # آپلود فایل
+        session = await self._get_session()
+        try:
+            upload_timeout = aiohttp.ClientTimeout(
+                total=timeout,
+                sock_connect=self.connect_timeout or self.timeout,
+                sock_read=self.read_timeout or self.timeout
+            )
+            async with session.post(upload_url, data=encoder.aiter(), headers=headers, timeout=upload_timeout) as response:
+                response.raise_for_status()
+                
+                result = self.codec.loads(await response.read())
+                return result.get("file_id", "")
+        
+        except Exception as e:
+            raise FileUploadException(f"Upload failed: {e}")
+    
+    async def upload_files(
+        self,
+        files: Iterable[Any],
+        file_type: Optional[FileTypeEnum] = None,
+        concurrency: int = 4,
+        **kwargs
+    ) -> List[str]:
+        """
+        آپلود هم‌زمان چند فایل با حداکثر concurrency آپلود در جریان
+        
+        file_idها به ترتیب ورودی برگردانده می‌شوند؛ مانند Client.upload_files.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def upload(file):
+            async with semaphore:
+                return await self.upload_file(file, file_type, **kwargs)
+        
+        results = await asyncio.gather(*(upload(file) for file in files), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return list(results)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+مقایسه‌ی codecهای JSON روی پاسخ‌های getUpdates و بدنه‌ی sendMessage
+    
+    python benchmarks/bench_codec.py
+    python benchmarks/bench_codec.py --file captured_updates.jsonl
+
+فایل ورودی هر خط یک پاسخ خام getUpdates است؛ بدون آن، پاسخ‌های نمونه با
+ساختار API ساخته می‌شوند.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ruplika.client import Client
+from ruplika.models import Keypad, KeypadRow, Button
+from ruplika.enums import ButtonTypeEnum
+from ruplika.codec import JSONCodec, OrjsonCodec, UjsonCodec
+from payloads import load_pages, sample_pages
+
+def available_codecs():
+    codecs = [JSONCodec()]
+    for cls in (OrjsonCodec, UjsonCodec):
+        try:
+            codecs.append(cls())
+        except ImportError:
+            pass
+    return codecs
+
+def send_message_body(client: Client):
+    keypad = Keypad(rows=[
+        KeypadRow(buttons=[Button(id=f"btn_{row}_{col}", type=ButtonTypeEnum.SIMPLE, button_text=f"گزینه {row}-{col}")
+                           for col in range(3)])
+        for row in range(4)
+    ])
+    return client._send_message_data("b0123456789abcdef", "منوی اصلی", inline_keypad=keypad)
+
+def bench(label: str, func, number: int):
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"  {label:<28} {seconds * 1e6:10.1f} µs")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="captured getUpdates responses, one JSON document per line")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+    
+    pages = load_pages(args.file) if args.file else sample_pages(args.pages)
+    size = sum(len(page) for page in pages)
+    print(f"{len(pages)} getUpdates pages, {size / 1024:.1f} KiB total\n")
+    
+    for codec in available_codecs():
+        client = Client("TOKEN", codec=codec)
+        body = send_message_body(client)
+        decoded = [codec.loads(page) for page in pages]
+        
+        print(codec.name)
+        bench("decode getUpdates (bytes)", lambda: [codec.loads(page) for page in pages], args.number)
+        if codec.name == "json":
+            bench("decode via response.json()", lambda: [json.loads(page.decode("utf-8")) for page in pages], args.number)
+        bench("encode getUpdates", lambda: [codec.dumps(page) for page in decoded], args.number)
+        bench("encode sendMessage body", lambda: codec.encode_body(body), args.number * 100)
+        print()
+
+if __name__ == "__main__":
+    main()
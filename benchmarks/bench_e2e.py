@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+بنچمارک end-to-end کتابخانه روی سرور mock محلی (benchmarks/mock_server.py)
+    
+    python benchmarks/bench_e2e.py
+    python benchmarks/bench_e2e.py --latency 0.02 --error-rate 0.01 --scenarios sends,broadcast
+    python benchmarks/bench_e2e.py --mock-url http://127.0.0.1:8081 --json results.json
+
+بدون --mock-url سرور mock در یک پروسه‌ی جدا اجرا می‌شود تا هزینه‌ی آن در
+اندازه‌گیری‌ها نیاید. سناریوها:
+    
+    polling    دریافت و پردازش updates آپدیت با پولینگ pipelined و workers ترد
+    sends      ارسال sends پیام از threads ترد هم‌زمان با Client
+    broadcast  ارسال یک پیام به sends چت با Bot.broadcast
+    upload     آپلود uploads فایل upload_size بایتی از threads ترد
+    async      ارسال sends پیام با AsyncClient و threads درخواست هم‌زمان
+
+برای هر سناریو نرخ، صدک‌های زمان (p50/p99)، تعداد خطا و بیشینه‌ی RSS پروسه
+گزارش می‌شود. با --retry کلاینت‌ها RetryPolicy دارند و خطاهای تزریق‌شده
+دوباره تلاش می‌شوند. با --trace-memory اوج حافظه‌ی پایتون (tracemalloc) هم اندازه
+گرفته می‌شود.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ruplika.async_client import AsyncClient
+from ruplika.bot import Bot
+from ruplika.client import Client
+from ruplika.enums import FileTypeEnum
+from ruplika.retry import RetryPolicy
+
+SCENARIOS = ("polling", "sends", "broadcast", "upload", "async")
+TOKEN = "BENCH"
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))] * 1000
+
+def max_rss_mb() -> float:
+    # ru_maxrss در لینوکس کیلوبایت و در macOS بایت است
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024
+
+def client_options(url, args):
+    options = {"api_url": url}
+    if args.retry:
+        options["retry_policy"] = RetryPolicy(base_delay=0.05, max_delay=1.0)
+    return options
+
+def timed(call, latencies, errors):
+    started = time.perf_counter()
+    try:
+        call()
+    except Exception:
+        errors.append(1)
+    latencies.append(time.perf_counter() - started)
+
+def bench_polling(url, args):
+    bot = Bot(TOKEN, workers=args.workers, **client_options(url, args))
+    handled = itertools.count(1)
+    done = threading.Event()
+    
+    @bot.update_handler
+    def on_update(update):
+        if next(handled) >= args.updates:
+            done.set()
+    
+    started = time.perf_counter()
+    bot.start_polling(interval=0.5, limit=args.page_size, pipelined=True, min_interval=0.01)
+    finished = done.wait(args.timeout)
+    elapsed = time.perf_counter() - started
+    bot.stop_polling()
+    return {
+        "updates": args.updates,
+        "completed": finished,
+        "seconds": elapsed,
+        "updates_per_sec": args.updates / elapsed,
+    }
+
+def bench_sends(url, args):
+    client = Client(TOKEN, pool_size_per_host=args.threads, **client_options(url, args))
+    latencies, errors = [], []
+    
+    def send(index):
+        timed(lambda: client.send_message(f"b0chat{index % 1000}", f"bench {index}"), latencies, errors)
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(send, range(args.sends)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "sends": args.sends,
+        "errors": len(errors),
+        "seconds": elapsed,
+        "sends_per_sec": args.sends / elapsed,
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+def bench_broadcast(url, args):
+    bot = Bot(TOKEN, pool_size_per_host=args.threads, **client_options(url, args))
+    chat_ids = [f"b0chat{index}" for index in range(args.sends)]
+    
+    started = time.perf_counter()
+    errors = sum(1 for result in bot.broadcast(chat_ids, "broadcast", workers=args.threads) if result.error)
+    elapsed = time.perf_counter() - started
+    return {
+        "sends": args.sends,
+        "errors": errors,
+        "seconds": elapsed,
+        "sends_per_sec": args.sends / elapsed,
+    }
+
+def bench_upload(url, args):
+    client = Client(TOKEN, pool_size_per_host=args.threads, **client_options(url, args))
+    files = [os.urandom(args.upload_size) for _ in range(args.uploads)]
+    
+    latencies, errors = [], []
+    
+    def upload(data):
+        timed(lambda: client.upload_file(data, FileTypeEnum.FILE, file_name="bench.bin"), latencies, errors)
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(upload, files))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    total = args.uploads * args.upload_size
+    return {
+        "uploads": args.uploads,
+        "errors": len(errors),
+        "seconds": elapsed,
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99),
+        "uploads_per_sec": args.uploads / elapsed,
+        "mb_per_sec": total / elapsed / (1 << 20),
+    }
+
+async def _async_sends(url, args):
+    latencies, errors = [], []
+    semaphore = asyncio.Semaphore(args.threads)
+    
+    async with AsyncClient(TOKEN, **client_options(url, args)) as client:
+        async def send(index):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    await client.send_message(f"b0chat{index % 1000}", f"bench {index}")
+                except Exception:
+                    errors.append(1)
+                latencies.append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(send(index) for index in range(args.sends)))
+        elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    return {
+        "sends": args.sends,
+        "errors": len(errors),
+        "seconds": elapsed,
+        "sends_per_sec": args.sends / elapsed,
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+def bench_async(url, args):
+    return asyncio.run(_async_sends(url, args))
+
+BENCHMARKS = {
+    "polling": bench_polling,
+    "sends": bench_sends,
+    "broadcast": bench_broadcast,
+    "upload": bench_upload,
+    "async": bench_async,
+}
+
+def start_mock(args):
+    """اجرای mock_server.py در پروسه‌ی جدا؛ (پروسه، آدرس)"""
+    command = [
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_server.py"),
+        "--port", "0",
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate),
+        "--retry-after", str(args.retry_after),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    url = process.stdout.readline().strip()
+    if not url:
+        process.kill()
+        raise RuntimeError("mock server did not start")
+    return process, url
+
+def run_scenario(name, url, args):
+    if args.trace_memory:
+        tracemalloc.start()
+    try:
+        result = BENCHMARKS[name](url, args)
+        if args.trace_memory:
+            result["python_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1 << 20)
+    finally:
+        if args.trace_memory:
+            tracemalloc.stop()
+    result["max_rss_mb"] = max_rss_mb()
+    return result
+
+def report(name, result):
+    parts = []
+    for key, value in result.items():
+        parts.append(f"{key}={value:,.2f}" if isinstance(value, float) else f"{key}={value}")
+    print(f"{name:<10} " + "  ".join(parts))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mock-url", help="use an already running mock server instead of spawning one")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated subset of scenarios")
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4, help="dispatcher threads for polling")
+    parser.add_argument("--sends", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16, help="concurrent senders")
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--upload-size", type=int, default=256 * 1024)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.1)
+    parser.add_argument("--retry", action="store_true", help="give clients a RetryPolicy for injected failures")
+    parser.add_argument("--trace-memory", action="store_true", help="also record tracemalloc peak (slower)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    
+    process = None
+    url = args.mock_url
+    if url is None:
+        process, url = start_mock(args)
+    
+    results = {}
+    try:
+        print(f"mock server {url}")
+        for name in names:
+            results[name] = run_scenario(name, url, args)
+            report(name, results[name])
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"settings": vars(args), "results": results}, fh, indent=2)
+
+if __name__ == "__main__":
+    main()
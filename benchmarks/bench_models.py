@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+مقایسه‌ی زمان و حافظه‌ی پارس پیام‌ها با message_modelهای مختلف بات
+    
+    python benchmarks/bench_models.py
+    python benchmarks/bench_models.py --file captured_updates.jsonl
+
+برای هر حالت دو الگوی دسترسی اندازه‌گیری می‌شود: هندلری که فقط متن را
+می‌خواند و هندلری که همه‌ی فیلدها را می‌خواند. حافظه با tracemalloc روی
+آبجکت‌های نگه‌داشته‌شده‌ی یک صفحه اندازه‌گیری می‌شود.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ruplika.bot import Bot, MESSAGE_MODELS
+from ruplika.codec import get_default_codec
+from payloads import load_pages, sample_pages
+
+FIELDS = (
+    "message_id", "text", "time", "is_edited", "sender_type", "sender_id", "chat_id", "aux_data",
+    "file", "reply_to_message_id", "forwarded_from", "location", "sticker", "contact_message", "poll",
+)
+
+def read_text(message):
+    return message.text
+
+def read_all(message):
+    return [getattr(message, name) for name in FIELDS]
+
+def new_messages(pages):
+    codec = get_default_codec()
+    messages = []
+    for page in pages:
+        for update in codec.loads(page)["data"]["updates"]:
+            if update.get("type") == "NewMessage":
+                messages.append(update["new_message"])
+    return messages
+
+def run(bot, messages, access):
+    parse = bot._parse_message
+    result = []
+    for data in messages:
+        message = parse(data)
+        access(message)
+        result.append(message)
+    return result
+
+def measure_memory(bot, messages, access):
+    """(اوج، باقی‌مانده) بایت‌های تخصیص‌یافته برای پارس و نگه‌داشتن پیام‌ها"""
+    tracemalloc.start()
+    try:
+        result = run(bot, messages, access)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, retained
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="captured getUpdates responses, one JSON document per line")
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+    
+    pages = load_pages(args.file) if args.file else sample_pages(args.pages)
+    messages = new_messages(pages)
+    print(f"{len(messages)} messages\n")
+    print(f"  {'model':<10} {'access':<6} {'µs/message':>11} {'peak B/msg':>11} {'kept B/msg':>11}")
+    
+    for model in MESSAGE_MODELS:
+        bot = Bot("TOKEN", message_model=model)
+        for label, access in (("text", read_text), ("all", read_all)):
+            seconds = min(timeit.repeat(lambda: run(bot, messages, access), number=args.number, repeat=5))
+            per_message = seconds / args.number / len(messages)
+            peak, retained = measure_memory(bot, messages, access)
+            print(f"  {model:<10} {label:<6} {per_message * 1e6:11.2f} "
+                  f"{peak / len(messages):11.0f} {retained / len(messages):11.0f}")
+
+if __name__ == "__main__":
+    main()
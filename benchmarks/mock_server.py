@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+سرور mock محلی API روبیکا برای تست و بنچمارک بدون شبکه
+    
+    python benchmarks/mock_server.py --port 8081 --latency 0.02 --error-rate 0.01 --rate-limit-rate 0.01
+
+کلاینت با api_url به آن وصل می‌شود:
+    
+    bot = Bot(token, api_url="http://127.0.0.1:8081")
+
+getUpdates آپدیت‌های ساختگی (payloads.make_update) برمی‌گرداند، متدهای ارسال
+message_id جدید می‌دهند و requestSendFile آدرس آپلود همین سرور را برمی‌گرداند.
+تأخیر، نرخ خطای 5xx و نرخ 429 (با Retry-After) قابل تنظیم است. پاسخ‌ها مثل
+بقیه‌ی کتابخانه فیلدها را در سطح اول JSON دارند. فقط از کتابخانه‌ی استاندارد
+استفاده می‌کند.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from payloads import make_update
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests", 503: "Service Unavailable"}
+
+SEND_METHODS = {"sendMessage", "sendFile", "sendPoll", "sendLocation", "sendContact", "forwardMessage"}
+OK_METHODS = {
+    "editMessageText", "editInlineKeypad", "editChatKeypad", "deleteMessage",
+    "setCommands", "updateBotEndpoints",
+}
+
+class MockRubikaServer:
+    """
+    سرور HTTP/1.1 (با keep-alive) که متدهای API روبیکا را شبیه‌سازی می‌کند
+    
+    latency یک عدد ثابت یا بازه‌ی (کمینه، بیشینه) ثانیه است. error_rate و
+    rate_limit_rate احتمال پاسخ 503 و 429 برای هر درخواست هستند.
+    total_updates تعداد کل آپدیت‌های getUpdates است (None یعنی بی‌پایان).
+    """
+    
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Union[float, Tuple[float, float]] = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        total_updates: Optional[int] = None,
+        seed: int = 0
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.total_updates = total_updates
+        self.seed = seed
+        self.counts: Dict[str, int] = {}
+        self.statuses: Dict[int, int] = {}
+        self.bytes_uploaded = 0
+        self._random = random.Random(seed)
+        self._message_ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+    
+    def reset_stats(self):
+        self.counts.clear()
+        self.statuses.clear()
+        self.bytes_uploaded = 0
+    
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=1 << 20)
+        self.port = self._server.sockets[0].getsockname()[1]
+    
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            # اتصال‌های keep-alive باز با بستن سرور بسته نمی‌شوند
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+    
+    def start_in_thread(self) -> str:
+        """اجرای سرور در یک ترد پس‌زمینه و برگرداندن آدرس آن"""
+        started = threading.Event()
+        
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+        
+        self._thread = threading.Thread(target=run, name="ruplika-mock", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.url
+    
+    def stop_thread(self):
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+    
+    def _delay(self) -> float:
+        if isinstance(self.latency, tuple):
+            return self._random.uniform(*self.latency)
+        return self.latency
+    
+    def _fault(self) -> Optional[Tuple[int, Dict[str, str]]]:
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return 429, {"Retry-After": f"{self.retry_after:g}"}
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503, {}
+        return None
+    
+    async def _read_body(self, reader: asyncio.StreamReader, headers: Dict[bytes, bytes], keep: bool):
+        """خواندن بدنه (Content-Length یا chunked)؛ با keep=False فقط طول شمرده می‌شود"""
+        parts = []
+        size = 0
+        if headers.get(b"transfer-encoding", b"").lower() == b"chunked":
+            while True:
+                line = await reader.readuntil(b"\r\n")
+                length = int(line.split(b";")[0], 16)
+                if length == 0:
+                    await reader.readuntil(b"\r\n")
+                    break
+                chunk = await reader.readexactly(length)
+                await reader.readexactly(2)
+                size += length
+                if keep:
+                    parts.append(chunk)
+        else:
+            remaining = int(headers.get(b"content-length", b"0"))
+            while remaining:
+                chunk = await reader.read(min(remaining, 1 << 20))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(chunk)
+                size += len(chunk)
+                if keep:
+                    parts.append(chunk)
+        return b"".join(parts), size
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head[:-4].split(b"\r\n")
+                _, target, version = lines[0].decode("latin-1").split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(b":")
+                    headers[name.strip().lower()] = value.strip()
+                
+                path = urlsplit(target).path
+                upload = path.startswith("/upload/")
+                body, size = await self._read_body(reader, headers, keep=not upload)
+                status, payload, extra = await self._respond(path, body, size)
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+                
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                head_lines = [
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(data)}",
+                ]
+                head_lines.extend(f"{name}: {value}" for name, value in extra.items())
+                writer.write(("\r\n".join(head_lines) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                
+                if headers.get(b"connection", b"").lower() == b"close" or version == "HTTP/1.0":
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            return
+        finally:
+            self._connections.discard(task)
+            writer.close()
+    
+    async def _respond(self, path: str, body: bytes, size: int) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        
+        if path.startswith("/upload/"):
+            self.counts["upload"] = self.counts.get("upload", 0) + 1
+            fault = self._fault()
+            if fault:
+                return fault[0], {"status": "ERR"}, fault[1]
+            self.bytes_uploaded += size
+            return 200, {"status": "OK", "file_id": f"mock-file-{next(self._message_ids)}"}, {}
+        
+        parts = path.strip("/").split("/")
+        if len(parts) != 2:
+            return 404, {"status": "ERR", "message": "not found"}, {}
+        method = parts[1]
+        self.counts[method] = self.counts.get(method, 0) + 1
+        
+        fault = self._fault()
+        if fault:
+            return fault[0], {"status": "ERR", "message": "injected"}, fault[1]
+        
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"status": "ERR", "message": "invalid json"}, {}
+        return 200, self.api_response(method, data), {}
+    
+    def api_response(self, method: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """پاسخ موفق یک متد API"""
+        if method == "getUpdates":
+            return self._updates(data)
+        if method in SEND_METHODS:
+            return {"status": "OK", "message_id": str(next(self._message_ids))}
+        if method in OK_METHODS:
+            return {"status": "OK"}
+        if method == "getMe":
+            return {"status": "OK", "bot": {"bot_id": "b0mock", "bot_title": "Mock", "username": "mock_bot"}}
+        if method == "getChat":
+            return {"status": "OK", "chat": {"chat_id": data.get("chat_id", ""), "chat_type": "User"}}
+        if method == "getFile":
+            return {"status": "OK", "download_url": f"{self.url}/download/{data.get('file_id', '')}"}
+        if method == "requestSendFile":
+            return {"status": "OK", "upload_url": f"{self.url}/upload/{data.get('type', 'File')}"}
+        return {"status": "ERR", "message": f"unknown method {method}"}
+    
+    def _updates(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        start = int(data.get("offset_id") or 0)
+        end = start + int(data.get("limit") or 100)
+        if self.total_updates is not None:
+            end = min(end, self.total_updates)
+        rng = random.Random(self.seed + start)
+        updates = [make_update(index, rng) for index in range(start, max(start, end))]
+        return {"status": "OK", "updates": updates, "next_offset_id": str(max(start, end))}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081, help="0 picks a free port")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform random latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--total-updates", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    latency = (args.latency, args.latency + args.jitter) if args.jitter else args.latency
+    server = MockRubikaServer(
+        args.host, args.port, latency, args.error_rate, args.rate_limit_rate,
+        args.retry_after, args.total_updates, args.seed
+    )
+    
+    async def serve():
+        await server.start()
+        # خط اول خروجی آدرس سرور است (برای اجرای خودکار در بنچمارک‌ها)
+        print(server.url, flush=True)
+        await asyncio.Event().wait()
+    
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+ساخت پاسخ‌های نمونه‌ی getUpdates با ساختار پاسخ واقعی API روبیکا
+"""
+
+import json
+import random
+from typing import Any, Dict, List, Optional
+
+TEXTS = [
+    "سلام، وقت بخیر",
+    "/start",
+    "/help",
+    "قیمت این محصول چنده؟",
+    "ممنون از راهنمایی شما 🙏",
+    "لطفا سفارش شماره‌ی ۱۲۳۴۵ را پیگیری کنید",
+    "Hello, is the shop open today?",
+]
+
+def make_update(index: int, rng: random.Random) -> Dict[str, Any]:
+    chat_id = f"b0{rng.randrange(10 ** 8, 10 ** 9)}abcdef"
+    kind = rng.random()
+    
+    if kind < 0.15:
+        return {"type": "RemovedMessage", "chat_id": chat_id, "removed_message_id": str(1000 + index)}
+    
+    message = {
+        "message_id": str(1000 + index),
+        "text": rng.choice(TEXTS),
+        "time": str(1700000000 + index),
+        "is_edited": False,
+        "sender_type": "User",
+        "sender_id": f"u0{rng.randrange(10 ** 8, 10 ** 9)}ghijkl",
+        "aux_data": None,
+        "file": None,
+        "reply_to_message_id": None,
+        "forwarded_from": None,
+        "location": None,
+        "sticker": None,
+        "contact_message": None,
+        "poll": None,
+    }
+    
+    if kind < 0.35:
+        message["aux_data"] = {"start_id": None, "button_id": f"btn_{rng.randrange(20)}"}
+    elif kind < 0.5:
+        message["file"] = {
+            "file_id": f"{rng.randrange(10 ** 12, 10 ** 13)}",
+            "file_name": "photo_2024.jpg",
+            "size": str(rng.randrange(10 ** 4, 10 ** 7)),
+        }
+    elif kind < 0.55:
+        message["location"] = {"longitude": "51.3890", "latitude": "35.6892"}
+    
+    return {"type": "NewMessage", "chat_id": chat_id, "new_message": message}
+
+def make_updates_page(size: int = 100, seed: int = 0, next_offset_id: Optional[str] = None) -> Dict[str, Any]:
+    """یک پاسخ کامل getUpdates با size آپدیت"""
+    rng = random.Random(seed)
+    updates: List[Dict[str, Any]] = [make_update(i, rng) for i in range(size)]
+    return {
+        "status": "OK",
+        "data": {
+            "updates": updates,
+            "next_offset_id": next_offset_id or f"offset_{seed}_{size}",
+        },
+    }
+
+def load_pages(path: str) -> List[bytes]:
+    """
+    خواندن پاسخ‌های ضبط‌شده‌ی getUpdates از فایل (هر خط یک پاسخ JSON)
+    """
+    with open(path, "rb") as fh:
+        return [line.strip() for line in fh if line.strip()]
+
+def sample_pages(count: int = 20, size: int = 100) -> List[bytes]:
+    return [
+        json.dumps(make_updates_page(size, seed), ensure_ascii=False).encode("utf-8")
+        for seed in range(count)
+    ]
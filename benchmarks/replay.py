@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+بازپخش یک فایل ضبط‌شده با UpdateRecorder روی یک بات با هندلرهای خالی
+    
+    python benchmarks/replay.py updates.jsonl.gz --speed 0 --workers 8
+    python benchmarks/replay.py --generate 20000 --out synthetic.bin --format binary
+
+speed=0 یعنی بیشترین سرعت و speed=N یعنی N برابر سرعت ضبط. با --generate
+به جای ترافیک واقعی یک فایل ساختگی از payloads.make_update ساخته می‌شود
+(صفحه‌های page_size تایی با فاصله‌ی interval ثانیه). برای اندازه‌گیری
+هندلرهای واقعی، همین اسکریپت را با ساختن بات خودتان به جای make_bot اجرا کنید.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ruplika.bot import Bot
+from ruplika.recorder import UpdateRecorder, UpdateReplayer
+from payloads import make_update
+
+def generate(path, total, page_size, interval, format, seed=0):
+    rng = random.Random(seed)
+    with UpdateRecorder(path, format=format, buffered=True) as recorder:
+        for start in range(0, total, page_size):
+            updates = [make_update(index, rng) for index in range(start, min(total, start + page_size))]
+            recorder.record_page(updates, timestamp=start // page_size * interval)
+    print(f"wrote {total} updates to {path} ({os.path.getsize(path):,} bytes)")
+
+def make_bot(args):
+    bot = Bot("REPLAY", workers=args.workers, message_model=args.message_model)
+    
+    @bot.message_handler
+    def on_message(message):
+        pass
+    
+    @bot.inline_handler
+    def on_inline(message):
+        pass
+    
+    return bot
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?")
+    parser.add_argument("--speed", type=float, default=0.0)
+    parser.add_argument("--mode", choices=UpdateReplayer.MODES, default="auto")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--message-model", default="dataclass")
+    parser.add_argument("--generate", type=int, metavar="COUNT", help="write a synthetic recording and exit")
+    parser.add_argument("--out", default="synthetic_updates.jsonl")
+    parser.add_argument("--format", choices=("jsonl", "binary"), default="jsonl")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.5)
+    args = parser.parse_args()
+    
+    if args.generate:
+        generate(args.out, args.generate, args.page_size, args.interval, args.format)
+        return
+    if not args.path:
+        parser.error("path is required unless --generate is given")
+    
+    bot = make_bot(args)
+    replayer = UpdateReplayer(args.path, speed=args.speed, mode=args.mode)
+    started = time.perf_counter()
+    count = replayer.replay(bot)
+    if bot._dispatcher:
+        bot._dispatcher.join()
+    elapsed = time.perf_counter() - started
+    print(f"replayed {count} updates in {elapsed:.2f}s: {count / elapsed:,.0f} updates/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+تولیدکننده‌ی بار برای سرور وب‌هوک
+    
+    python benchmarks/webhook_load.py --url http://127.0.0.1:8080/receiveUpdate
+    python benchmarks/webhook_load.py --serve --requests 20000 --connections 64
+
+با --serve یک بات محلی با هندلر خالی روی WebhookServer اجرا می‌شود و بار روی
+همان فرستاده می‌شود. هر اتصال keep-alive است و درخواست‌ها پشت سر هم ارسال
+می‌شوند؛ خروجی شامل نرخ درخواست و صدک‌های زمان پاسخ است.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from payloads import make_update
+
+def build_request(host: str, path: str, body: bytes) -> bytes:
+    head = (
+        f"POST {path} HTTP/1.1\r\n"
+        f"Host: {host}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    )
+    return head.encode("latin-1") + body
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    if length:
+        await reader.readexactly(length)
+    return status
+
+async def worker(host: str, port: int, requests, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while requests:
+            request = requests.pop()
+            started = time.perf_counter()
+            writer.write(request)
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+async def generate(url: str, total: int, connections: int, seed: int = 0):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    rng = random.Random(seed)
+    requests = [
+        build_request(parts.netloc, parts.path or "/", json.dumps({"update": make_update(i, rng)}).encode("utf-8"))
+        for i in range(total)
+    ]
+    latencies, statuses = [], {}
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(host, port, requests, latencies, statuses) for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"{total} requests over {connections} connections in {elapsed:.2f}s: {total / elapsed:,.0f} req/s")
+    print(f"latency p50 {percentile(0.5):.2f} ms, p99 {percentile(0.99):.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+    print(f"statuses {statuses}")
+
+async def serve_and_generate(args):
+    from ruplika.async_bot import AsyncBot
+    
+    bot = AsyncBot("TOKEN", workers=args.workers)
+    handled = []
+    
+    @bot.message_handler
+    async def on_message(message):
+        handled.append(message.message_id)
+    
+    server = bot.create_webhook_server("127.0.0.1", 0)
+    await server.start()
+    host, port = server.sockets[0]
+    await generate(f"http://{host}:{port}/receiveUpdate", args.requests, args.connections)
+    await server.stop()
+    print(f"handled {len(handled)} messages, server stats {server.stats()}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8080/receiveUpdate")
+    parser.add_argument("--serve", action="store_true", help="run a local AsyncBot webhook server and load it")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    
+    if args.serve:
+        asyncio.run(serve_and_generate(args))
+    else:
+        asyncio.run(generate(args.url, args.requests, args.connections))
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,123 @@
 import time
+import inspect
 import threading
-from typing import List, Optional, Dict, Any, Callable, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Callable, Union, Tuple, Iterable, Iterator, Pattern
 from .client import Client
+from .keypad import CompiledKeypad
+from .dispatcher import Dispatcher
+from .broadcast import Broadcaster, BroadcastCheckpoint, BroadcastResult
+from .webhook import WebhookServer
+from .router import CommandRouter, ButtonRouter
+from .filters import FilterIndex
+from .offsets import OffsetStore, OffsetCommitter, open_offset_store
+from .dedup import DedupWindow
+from .recorder import UpdateRecorder
+from .tracing import Span, UpdateTrace, handler_name
+from .middleware import MiddlewareChain
+from .parsing import DATACLASS_MODELS, SLOTTED_MODELS, LazyMessage, parse_message, parse_inline_message
 from .models import *
 from .enums import *
 from .exceptions import *
 from .utils import parse_update_data
 
-class Bot(Client):
+MESSAGE_MODELS = ("dataclass", "slotted", "lazy")
+
+class BaseBot:
     """
-    کلاس اصلی برای ساخت ربات‌های روبیکا
+    بخش مشترک بات همگام و ناهمگام: ثبت هندلرها، پارس پیام‌ها و مسیریابی آپدیت‌ها
     """
     
-    def __init__(self, token: str, timeout: int = 30):
-        super().__init__(token, timeout)
-        self._message_handlers = []
+    def _setup_handlers(self, message_model: str = "dataclass", dedup: Optional[DedupWindow] = None,
+                        recorder: Optional[UpdateRecorder] = None):
+        if message_model not in MESSAGE_MODELS:
+            raise ValueError(f"message_model must be one of {', '.join(MESSAGE_MODELS)}")
+        # dataclass: آبجکت‌های معمولی، slotted: نسخه‌ی __slots__ (بدون
+        # __dict__) و lazy: نمای تنبل LazyMessage روی دیکشنری خام آپدیت
+        self.message_model = message_model
+        self._models = DATACLASS_MODELS if message_model == "dataclass" else SLOTTED_MODELS
+        # آپدیت‌های تکراری (تلاش دوباره‌ی وب‌هوک، پولرهای هم‌پوشان) قبل از
+        # اجرای هر هندلری کنار گذاشته می‌شوند
+        self.dedup = dedup
+        # ضبط آپدیت‌های خام دریافتی برای بازپخش (UpdateReplayer)
+        self.recorder = recorder
+        self._message_handlers = FilterIndex()
         self._inline_handlers = []
-        self._command_handlers = {}
+        self._commands = CommandRouter()
+        self._buttons = ButtonRouter()
         self._update_handlers = []
+        self._middlewares = []
+        # بدون middleware آپدیت مستقیم به _run_update می‌رسد
+        self._pipeline = self._run_update
+        self._middleware_chain = None
         self._is_running = False
-        self._polling_thread = None
         
         # اطلاعات بات
         self._bot_info = None
     
-    def get_bot_info(self) -> Bot:
-        """دریافت و کش اطلاعات بات"""
-        if not self._bot_info:
-            self._bot_info = self.get_me()
-        return self._bot_info
-    
-    def message_handler(self, func: Callable):
-        """دکوریتور برای هندلر پیام‌ها"""
-        self._message_handlers.append(func)
-        return func
+    def message_handler(
+        self,
+        func: Optional[Callable] = None,
+        *,
+        chat_ids: Optional[Iterable[str]] = None,
+        chat_types: Optional[Union[ChatTypeEnum, str, Iterable]] = None,
+        sender_types: Optional[Union[MessageSenderEnum, str, Iterable]] = None,
+        content: Optional[Union[str, Iterable[str]]] = None,
+        text: Optional[Union[str, Pattern]] = None,
+        predicate: Optional[Callable[[Message], bool]] = None
+    ):
+        """
+        دکوریتور برای هندلر پیام‌ها
+        
+        بدون آرگومان (@bot.message_handler) همه‌ی پیام‌ها را می‌گیرد. با
+        فیلترها فقط پیام‌هایی که با همه‌ی فیلترهای داده‌شده جور باشند به هندلر
+        می‌رسند، مثلا:
+            
+            @bot.message_handler(chat_types=ChatTypeEnum.GROUP, content="file")
+            @bot.message_handler(text=r"^سلام", sender_types="User")
+        
+        content یکی یا چند مورد از text، file، location، contact، poll، sticker،
+        forwarded و button است و وجود هر کدام کافی است.
+        """
+        def decorator(func: Callable):
+            self._message_handlers.add(
+                func, chat_ids=chat_ids, chat_types=chat_types, sender_types=sender_types,
+                content=content, text=text, predicate=predicate
+            )
+            return func
+        if func is not None:
+            return decorator(func)
+        return decorator
     
     def inline_handler(self, func: Callable):
         """دکوریتور برای هندلر اینلاین‌ها"""
         self._inline_handlers.append(func)
         return func
     
-    def command_handler(self, command: str):
-        """دکوریتور برای هندلر دستورات"""
+    def button_handler(self, button_id: Union[str, Pattern]):
+        """
+        دکوریتور برای هندلر کلیک یک دکمه
+        
+        button_id می‌تواند شناسه‌ی دقیق، پیشوند با * ("product:*") یا regex
+        کامپایل‌شده باشد. کلیکی که به یک button_handler برسد فقط همان هندلر را
+        اجرا می‌کند و به inline_handlerها نمی‌رسد. اگر هندلر آرگومان دوم بدون
+        مقدار پیش‌فرض داشته باشد، آرگومان دوم یک ButtonMatch است.
+        """
+        def decorator(func: Callable):
+            self._buttons.add(button_id, func)
+            return func
+        return decorator
+    
+    def command_handler(self, command: Union[str, Pattern], aliases: Iterable[str] = ()):
+        """
+        دکوریتور برای هندلر دستورات
+        
+        command می‌تواند نام دقیق ("start")، پیشوند با * ("item_*") یا regex
+        کامپایل‌شده باشد. اگر هندلر آرگومان دوم بدون مقدار پیش‌فرض داشته باشد،
+        آرگومان دوم یک CommandMatch با آرگومان‌های پارس‌شده‌ی دستور است.
+        """
         def decorator(func: Callable):
-            self._command_handlers[command.lower()] = func
+            self._commands.add_command(command, func, aliases)
             return func
         return decorator
     
@@ -52,6 +126,32 @@ class Bot(Client):
         self._update_handlers.append(func)
         return func
     
+    def middleware(self, func: Callable):
+        """
+        دکوریتور ثبت middleware به شکل func(update_data, call_next)
+        
+        middlewareها به ترتیب ثبت دور پردازش هر آپدیت اجرا می‌شوند و با صدا
+        نزدن call_next(update_data) آپدیت را متوقف می‌کنند (مثلا برای احراز
+        هویت یا محدودیت flood). در AsyncBot باید async و در Bot معمولی باشند.
+        زنجیره هنگام ثبت ساخته می‌شود، پس middlewareها را قبل از شروع پولینگ
+        ثبت کنید.
+        """
+        is_async = inspect.iscoroutinefunction(self._run_update)
+        if is_async and not inspect.iscoroutinefunction(func):
+            raise TypeError("AsyncBot middlewares must be async functions")
+        if not is_async and inspect.iscoroutinefunction(func):
+            raise TypeError("Bot middlewares must be regular functions; use AsyncBot for async middlewares")
+        self._middlewares.append(func)
+        self._middleware_chain = MiddlewareChain(self._run_update, self._middlewares, is_async)
+        self._pipeline = self._middleware_chain.call
+        return func
+    
+    def middleware_stats(self) -> List[Dict[str, Any]]:
+        """تعداد اجرا و هزینه‌ی هر مرحله‌ی زنجیره‌ی middleware (MiddlewareChain.stats)"""
+        if self._middleware_chain is None:
+            return []
+        return self._middleware_chain.stats()
+    
     def create_simple_button(self, button_id: str, text: str) -> Button:
         """ساخت دکمه ساده"""
         return Button(
@@ -94,7 +194,7 @@ class Bot(Client):
             button_selection=selection
         )
     
-    def create_selection_item(self, text: str, image_url: str = "", 
+    def create_selection_item(self, text: str, image_url: str = "",
                             item_type: ButtonSelectionTypeEnum = ButtonSelectionTypeEnum.TEXT_ONLY) -> ButtonSelectionItem:
         """ساخت آیتم انتخاب"""
         return ButtonSelectionItem(
@@ -103,14 +203,8 @@ class Bot(Client):
             type=item_type
         )
     
-    def send_message_with_buttons(
-        self,
-        chat_id: str,
-        text: str,
-        buttons: List[List[tuple]],
-        **kwargs
-    ) -> str:
-        """ارسال پیام با دکمه‌های ساده"""
+    def _build_button_keypad(self, buttons: List[List[tuple]]) -> Keypad:
+        """ساخت کیپد از لیست تاپل‌های (شناسه، متن)"""
         button_objects = []
         for row in buttons:
             row_buttons = []
@@ -118,96 +212,67 @@ class Bot(Client):
                 row_buttons.append(self.create_simple_button(btn_id, btn_text))
             button_objects.append(row_buttons)
         
-        keypad = self.create_keypad(button_objects)
-        return self.send_message(chat_id, text, inline_keypad=keypad, **kwargs)
-    
-    def process_updates(self, updates_data: Dict[str, Any]):
-        """پردازش آپدیت‌ها"""
-        updates = updates_data.get("updates", [])
-        
-        for update_data in updates:
-            self._process_single_update(update_data)
+        return self.create_keypad(button_objects)
     
-    def _process_single_update(self, update_data: Dict[str, Any]):
-        """پردازش یک آپدیت"""
-        parsed_data = parse_update_data(update_data)
-        if not parsed_data:
-            return
-        
-        # اجرای هندلرهای عمومی آپدیت
-        for handler in self._update_handlers:
-            handler(parsed_data)
+    def _route_update(self, parsed_data: Dict[str, Any]) -> Tuple[Any, List[Callable]]:
+        """
+        تعیین آبجکت ورودی و هندلرهای مربوط به یک آپدیت
         
+        خروجی (context, handlers) است و هر هندلر با context صدا زده می‌شود.
+        """
         update_type = parsed_data.get("type")
         
         if update_type == "NewMessage":
-            self._process_new_message(parsed_data)
+            return self._route_new_message(parsed_data)
         elif update_type == "UpdatedMessage":
             self._process_updated_message(parsed_data)
         elif update_type == "InlineMessage":
-            self._process_inline_message(parsed_data)
+            return self._route_inline_message(parsed_data)
         elif update_type == "StartedBot":
             self._process_started_bot(parsed_data)
         elif update_type == "StoppedBot":
             self._process_stopped_bot(parsed_data)
         elif update_type == "RemovedMessage":
             self._process_removed_message(parsed_data)
+        
+        return None, []
     
-    def _process_new_message(self, update_data: Dict[str, Any]):
-        """پردازش پیام جدید"""
+    def _route_new_message(self, update_data: Dict[str, Any]) -> Tuple[Any, List[Callable]]:
+        """مسیریابی پیام جدید"""
         message_data = update_data.get("new_message", {})
         message = self._parse_message(message_data)
         
         if not message:
-            return
+            return None, []
         
         # بررسی دستورات
-        if message.text and message.text.startswith('/'):
-            command_parts = message.text.split()
-            if command_parts:
-                command = command_parts[0][1:].lower().split('@')[0]  # حذف / و نام بات
-                if command in self._command_handlers:
-                    try:
-                        self._command_handlers[command](message)
-                        return
-                    except Exception as e:
-                        self._handle_error(e, message)
-                        return
-        
-        # اجرای هندلرهای عمومی پیام
-        for handler in self._message_handlers:
-            try:
-                handler(message)
-            except Exception as e:
-                self._handle_error(e, message)
+        command_handler = self._match_command(message)
+        if command_handler:
+            return message, [command_handler]
+        
+        # اجرای هندلرهای عمومی پیام که فیلترهایشان با پیام جور است
+        chat_id = update_data.get("chat_id") or message.chat_id
+        return message, self._message_handlers.match(chat_id, message_data, message)
     
-    def _process_updated_message(self, update_data: Dict[str, Any]):
-        """پردازش پیام ویرایش شده"""
-        # می‌توانید این قسمت را بر اساس نیاز خود پیاده‌سازی کنید
-        pass
+    def _match_command(self, message: Message) -> Optional[Callable]:
+        """یافتن هندلر دستور متناظر با متن پیام"""
+        return self._commands.resolve(message.text)
     
-    def _process_inline_message(self, update_data: Dict[str, Any]):
-        """پردازش پیام اینلاین"""
+    def _route_inline_message(self, update_data: Dict[str, Any]) -> Tuple[Any, List[Callable]]:
+        """مسیریابی پیام اینلاین"""
         inline_data = update_data.get("inline_message", {})
+        inline_message = self._parse_inline_message(inline_data)
         
-        inline_message = InlineMessage(
-            sender_id=inline_data.get("sender_id", ""),
-            text=inline_data.get("text", ""),
-            message_id=inline_data.get("message_id", ""),
-            chat_id=inline_data.get("chat_id", ""),
-            button_id=inline_data.get("aux_data", {}).get("button_id") if inline_data.get("aux_data") else None,
-            file=File(inline_data["file"]["file_id"]) if inline_data.get("file") else None,
-            location=Location(
-                longitude=inline_data["location"]["longitude"],
-                latitude=inline_data["location"]["latitude"]
-            ) if inline_data.get("location") else None
-        )
+        button_handler = self._buttons.resolve(inline_message.button_id)
+        if button_handler:
+            return inline_message, [button_handler]
         
-        for handler in self._inline_handlers:
-            try:
-                handler(inline_message)
-            except Exception as e:
-                self._handle_error(e, inline_message)
+        return inline_message, list(self._inline_handlers)
+    
+    def _process_updated_message(self, update_data: Dict[str, Any]):
+        """پردازش پیام ویرایش شده"""
+        # می‌توانید این قسمت را بر اساس نیاز خود پیاده‌سازی کنید
+        pass
     
     def _process_started_bot(self, update_data: Dict[str, Any]):
         """پردازش شروع بات توسط کاربر"""
@@ -226,75 +291,16 @@ class Bot(Client):
         # می‌توانید این قسمت را بر اساس نیاز خود پیاده‌سازی کنید
         pass
     
+    def _parse_inline_message(self, inline_data: Dict[str, Any]) -> InlineMessage:
+        """تبدیل داده‌های پیام اینلاین به آبجکت"""
+        return parse_inline_message(inline_data, self._models)
+    
     def _parse_message(self, message_data: Dict[str, Any]) -> Optional[Message]:
         """تبدیل داده‌های پیام به آبجکت"""
         try:
-            aux_data = None
-            if message_data.get("aux_data"):
-                aux_data = AuxData(
-                    start_id=message_data["aux_data"].get("start_id"),
-                    button_id=message_data["aux_data"].get("button_id")
-                )
-            
-            # پارس کردن فایل
-            file_data = None
-            if message_data.get("file"):
-                file_data = File(
-                    file_id=message_data["file"].get("file_id", ""),
-                    file_name=message_data["file"].get("file_name", ""),
-                    size=message_data["file"].get("size", "")
-                )
-            
-            # پارس کردن موقعیت
-            location_data = None
-            if message_data.get("location"):
-                location_data = Location(
-                    longitude=message_data["location"].get("longitude", ""),
-                    latitude=message_data["location"].get("latitude", "")
-                )
-            
-            # پارس کردن مخاطب
-            contact_data = None
-            if message_data.get("contact_message"):
-                contact_data = ContactMessage(
-                    phone_number=message_data["contact_message"].get("phone_number", ""),
-                    first_name=message_data["contact_message"].get("first_name", ""),
-                    last_name=message_data["contact_message"].get("last_name", "")
-                )
-            
-            # پارس کردن نظرسنجی
-            poll_data = None
-            if message_data.get("poll"):
-                poll_status_data = message_data["poll"].get("poll_status", {})
-                poll_status = PollStatus(
-                    state=PollStatusEnum(poll_status_data.get("state", "Open")),
-                    selection_index=poll_status_data.get("selection_index", -1),
-                    percent_vote_options=poll_status_data.get("percent_vote_options", []),
-                    total_vote=poll_status_data.get("total_vote", 0),
-                    show_total_votes=poll_status_data.get("show_total_votes", False)
-                )
-                
-                poll_data = Poll(
-                    question=message_data["poll"].get("question", ""),
-                    options=message_data["poll"].get("options", []),
-                    poll_status=poll_status
-                )
-            
-            return Message(
-                message_id=str(message_data.get("message_id", "")),
-                text=message_data.get("text", ""),
-                time=message_data.get("time", 0),
-                is_edited=message_data.get("is_edited", False),
-                sender_type=MessageSenderEnum(message_data.get("sender_type", "User")),
-                sender_id=message_data.get("sender_id", ""),
-                chat_id=message_data.get("chat_id", ""),
-                aux_data=aux_data,
-                file=file_data,
-                reply_to_message_id=message_data.get("reply_to_message_id"),
-                location=location_data,
-                contact_message=contact_data,
-                poll=poll_data
-            )
+            if self.message_model == "lazy":
+                return LazyMessage(message_data)
+            return parse_message(message_data, self._models)
         except (KeyError, ValueError, AttributeError) as e:
             print(f"Error parsing message: {e}")
             return None
@@ -304,10 +310,259 @@ class Bot(Client):
         print(f"Error in handler: {error}")
         # می‌توانید لاگ‌گیری پیشرفته‌تری انجام دهید
     
-    def run_polling(self, interval: int = 2, limit: int = 100):
-        """اجرای بات با روش پولینگ"""
+    def _update_key(self, update_data: Dict[str, Any]) -> Optional[str]:
+        """کلید شاردینگ آپدیت (chat_id) برای حفظ ترتیب هر چت"""
+        chat_id = update_data.get("chat_id")
+        if not chat_id and update_data.get("inline_message"):
+            chat_id = update_data["inline_message"].get("chat_id")
+        return chat_id
+    
+    def _record_updates(self, updates: List[Dict[str, Any]], source: str):
+        """ضبط آپدیت‌ها؛ خطای ضبط (مثلا پر شدن دیسک) پردازش را متوقف نمی‌کند"""
+        try:
+            if source == "webhook":
+                self.recorder.record(updates[0], source)
+            else:
+                self.recorder.record_page(updates, source)
+        except Exception as e:
+            print(f"❌ خطا در ضبط آپدیت‌ها: {e}")
+    
+    def _next_poll_delay(self, page_size: int, delay: float,
+                         min_interval: float, max_interval: float) -> Tuple[float, float]:
+        """
+        محاسبه‌ی مکث پولینگ تطبیقی
+        
+        خروجی (مکث فعلی، مکث دفعه‌ی بعد) است: تا وقتی صفحه‌ها خالی نیستند
+        مکثی انجام نمی‌شود و برای صفحه‌های خالی مکث تا max_interval دو برابر می‌شود.
+        """
+        if page_size > 0:
+            return 0, min_interval
+        return delay, min(delay * 2, max_interval)
+    
+    def _webhook_endpoint_types(self,
+                                receive_update: bool = True,
+                                receive_inline_message: bool = True,
+                                receive_query: bool = False,
+                                get_selection_item: bool = False,
+                                search_selection_items: bool = False) -> List[UpdateEndpointTypeEnum]:
+        """فهرست انواع endpoint انتخاب شده برای وب‌هوک"""
+        flags = [
+            (receive_update, UpdateEndpointTypeEnum.RECEIVE_UPDATE),
+            (receive_inline_message, UpdateEndpointTypeEnum.RECEIVE_INLINE_MESSAGE),
+            (receive_query, UpdateEndpointTypeEnum.RECEIVE_QUERY),
+            (get_selection_item, UpdateEndpointTypeEnum.GET_SELECTION_ITEM),
+            (search_selection_items, UpdateEndpointTypeEnum.SEARCH_SELECTION_ITEMS),
+        ]
+        return [endpoint_type for enabled, endpoint_type in flags if enabled]
+    
+    def create_webhook_server(self, host: str = "0.0.0.0", port: int = 8080, path: str = "/",
+                              **kwargs) -> WebhookServer:
+        """ساخت سرور وب‌هوک داخلی برای این بات (تنظیمات بیشتر در WebhookServer)"""
+        server = WebhookServer(self, host, port, path, **kwargs)
+        if self.metrics is not None:
+            self.metrics.track_queue("webhook", lambda: server.pending)
+        return server
+
+class Bot(BaseBot, Client):
+    """
+    کلاس اصلی برای ساخت ربات‌های روبیکا
+    """
+    
+    def __init__(self, token: str, timeout: int = 30, workers: int = 0, queue_size: int = 1000,
+                 message_model: str = "dataclass", dedup: Optional[DedupWindow] = None,
+                 recorder: Optional[UpdateRecorder] = None, **kwargs):
+        super().__init__(token, timeout, **kwargs)
+        self._setup_handlers(message_model, dedup, recorder)
+        self._polling_thread = None
+        
+        # با workers > 0 هندلرها روی استخر ترد و با حفظ ترتیب هر چت اجرا می‌شوند
+        self._dispatcher = None
+        if workers:
+            self._dispatcher = Dispatcher(
+                workers, queue_size, on_error=lambda e: self._handle_error(e, None)
+            )
+            if self.metrics is not None:
+                self.metrics.track_queue("dispatcher", lambda: self._dispatcher.pending)
+    
+    def get_bot_info(self) -> Bot:
+        """
+        دریافت و کش اطلاعات بات
+        
+        با response_cache اطلاعات بعد از TTL متد getMe دوباره دریافت می‌شود.
+        """
+        if self.response_cache is not None and self.response_cache.enabled("getMe"):
+            self._bot_info = self.get_me()
+        elif not self._bot_info:
+            self._bot_info = self.get_me()
+        return self._bot_info
+    
+    def send_message_with_buttons(
+        self,
+        chat_id: str,
+        text: str,
+        buttons: List[List[tuple]],
+        **kwargs
+    ) -> str:
+        """ارسال پیام با دکمه‌های ساده"""
+        keypad = self._build_button_keypad(buttons)
+        return self.send_message(chat_id, text, inline_keypad=keypad, **kwargs)
+    
+    def broadcast(
+        self,
+        chat_ids: Iterable[str],
+        text: str,
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
+        disable_notification: bool = False,
+        workers: int = 16,
+        checkpoint: Union[str, BroadcastCheckpoint, None] = None
+    ) -> Iterator[BroadcastResult]:
+        """
+        ارسال یک پیام به تعداد زیادی چت
+        
+        کیپدها یک بار سریال می‌شوند و ارسال‌ها هم‌زمان (و زیر محدودیت rate_limiter)
+        انجام می‌شوند. نتیجه‌ی هر چت به محض آماده شدن yield می‌شود. با دادن مسیر
+        checkpoint، چت‌هایی که قبلا پیام گرفته‌اند در اجرای دوباره رد می‌شوند.
+        """
+        inline_keypad = self.compile_keypad(inline_keypad) if inline_keypad else None
+        chat_keypad = self.compile_keypad(chat_keypad) if chat_keypad else None
+        
+        def send(chat_id: str) -> str:
+            return self.send_message(
+                chat_id, text, inline_keypad=inline_keypad, chat_keypad=chat_keypad,
+                chat_keypad_type=chat_keypad_type, disable_notification=disable_notification
+            )
+        
+        return Broadcaster(send, workers, checkpoint).run(chat_ids)
+    
+    def process_updates(self, updates_data: Dict[str, Any]):
+        """پردازش آپدیت‌ها"""
+        updates = updates_data.get("updates", [])
+        if self.recorder is not None and updates:
+            self._record_updates(updates, "polling")
+        if self.metrics is not None:
+            self.metrics.observe_page(updates)
+        fetch = self.tracer.page_fetch(updates_data) if self.tracer is not None else None
+        
+        for update_data in updates:
+            self._process_single_update(update_data, fetch)
+    
+    def _process_single_update(self, update_data: Dict[str, Any], fetch: Optional[Span] = None):
+        """پردازش یک آپدیت (یا ارسال آن به صف dispatcher)"""
+        if self.dedup is not None and self.dedup.is_duplicate(update_data):
+            return
+        trace = self.tracer.receive(update_data, fetch) if self.tracer is not None else None
+        if self._dispatcher:
+            # در صورت پر بودن صف، submit بلاک می‌شود و پولینگ هم منتظر می‌ماند
+            self._dispatcher.submit(self._update_key(update_data), self._handle_update, update_data, trace)
+        else:
+            self._handle_update(update_data, trace)
+    
+    def _handle_update(self, update_data: Dict[str, Any], trace: Optional[UpdateTrace] = None):
+        """اجرای هندلرهای یک آپدیت (با trace، در محدوده‌ی همان trace)"""
+        if trace is None:
+            return self._pipeline(update_data)
+        token = self.tracer.enter(trace)
+        try:
+            self._pipeline(update_data)
+        finally:
+            self.tracer.exit(trace, token)
+    
+    def _run_update(self, update_data: Dict[str, Any]):
+        parsed_data = parse_update_data(update_data)
+        if not parsed_data:
+            return
+        
+        # اجرای هندلرهای عمومی آپدیت
+        for handler in self._update_handlers:
+            handler(parsed_data)
+        
+        if self.tracer is not None:
+            span = self.tracer.start("parse", parsed_data.get("type", ""))
+            context, handlers = self._route_update(parsed_data)
+            self.tracer.finish(span)
+        else:
+            context, handlers = self._route_update(parsed_data)
+        
+        if self.metrics is not None or self.tracer is not None:
+            self._run_instrumented(handlers, context, parsed_data.get("type"))
+            return
+        for handler in handlers:
+            try:
+                handler(context)
+            except Exception as e:
+                self._handle_error(e, context)
+    
+    def _run_instrumented(self, handlers: List[Callable], context: Any, update_type: Optional[str]):
+        """اجرای هندلرها با ثبت زمان و خطای هر کدام در metrics و tracer"""
+        metrics, tracer = self.metrics, self.tracer
+        if metrics is not None:
+            metrics.observe_update(update_type)
+        for handler in handlers:
+            span = tracer.start("handler", handler_name(handler)) if tracer is not None else None
+            started = time.perf_counter()
+            error = None
+            try:
+                handler(context)
+            except Exception as e:
+                error = e
+                self._handle_error(e, context)
+            if span is not None:
+                tracer.finish(span, error)
+            if metrics is not None:
+                metrics.observe_handler(handler, time.perf_counter() - started, error)
+    
+    def run_polling(self, interval: int = 2, limit: int = 100,
+                    pipelined: bool = False, min_interval: float = 0.1,
+                    offset_store: Union[str, OffsetStore, None] = None,
+                    commit_every: int = 1, commit_interval: Optional[float] = None):
+        """
+        اجرای بات با روش پولینگ
+        
+        با pipelined=True صفحه‌ی بعدی آپدیت‌ها هم‌زمان با پردازش صفحه‌ی فعلی
+        دریافت می‌شود و interval فقط سقف مکث تطبیقی برای صفحه‌های خالی است.
+        
+        با offset_store (آبجکت OffsetStore یا مسیر فایل) پولینگ از آخرین offset
+        ثبت‌شده ادامه پیدا می‌کند و offset هر commit_every صفحه (یا بعد از
+        commit_interval ثانیه) پس از پایان هندلرهای آن صفحه‌ها ثبت می‌شود.
+        """
+        store, owned = open_offset_store(offset_store)
+        committer = OffsetCommitter(store, commit_every, commit_interval) if store else None
+        try:
+            if pipelined:
+                return self._run_pipelined_polling(interval, limit, min_interval, committer)
+            return self._run_simple_polling(interval, limit, committer)
+        finally:
+            if committer:
+                self._commit_offset(committer, drain=True)
+            if owned:
+                store.close()
+    
+    def _commit_offset(self, committer: OffsetCommitter, drain: bool = False):
+        """ثبت offset صفحه‌های تمام‌شده؛ با drain=True (هنگام توقف) اول صف dispatcher خالی می‌شود"""
+        if drain and self._dispatcher:
+            self._dispatcher.join()
+        try:
+            committer.commit()
+        except Exception as e:
+            print(f"❌ خطا در ثبت offset: {e}")
+    
+    def _advance_offset(self, committer: Optional[OffsetCommitter], offset_id: Optional[str]):
+        if not committer or not offset_id:
+            return
+        done = committer.track(offset_id)
+        if self._dispatcher:
+            # offset وقتی قابل ثبت است که هندلرهای همین صفحه (و قبلی‌ها) تمام شده باشند
+            self._dispatcher.after_pending(done)
+        else:
+            done()
+        if committer.due():
+            self._commit_offset(committer)
+    
+    def _run_simple_polling(self, interval: float, limit: int, committer: Optional[OffsetCommitter]):
         self._is_running = True
-        offset_id = None
+        offset_id = committer.load() if committer else None
         
         bot_info = self.get_bot_info()
         print(f"🤖 بات @{bot_info.username} در حال اجرا با پولینگ...")
@@ -319,9 +574,10 @@ class Bot(Client):
                 
                 # آپدیت offset برای دریافت آپدیت‌های جدید
                 offset_id = updates_data.get("next_offset_id")
+                self._advance_offset(committer, offset_id)
                 
                 time.sleep(interval)
-                
+            
             except KeyboardInterrupt:
                 print("\n⏹ توقف بات...")
                 self._is_running = False
@@ -330,10 +586,60 @@ class Bot(Client):
                 print(f"❌ خطا در پولینگ: {e}")
                 time.sleep(interval)
     
-    def start_polling(self, interval: int = 2, limit: int = 100, daemon: bool = True):
-        """شروع پولینگ در ترد جداگانه"""
+    def _run_pipelined_polling(self, interval: float, limit: int, min_interval: float,
+                               committer: Optional[OffsetCommitter] = None):
+        """پولینگ با پیش‌دریافت صفحه‌ی بعدی در یک ترد جداگانه"""
+        self._is_running = True
+        offset_id = committer.load() if committer else None
+        delay = min_interval
+        
+        bot_info = self.get_bot_info()
+        print(f"🤖 بات @{bot_info.username} در حال اجرا با پولینگ...")
+        
+        fetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ruplika-prefetch")
+        pending = fetcher.submit(self.get_updates, limit, offset_id)
+        
+        try:
+            while self._is_running:
+                try:
+                    updates_data = pending.result()
+                except Exception as e:
+                    print(f"❌ خطا در پولینگ: {e}")
+                    time.sleep(interval)
+                    pending = fetcher.submit(self.get_updates, limit, offset_id)
+                    continue
+                
+                updates = updates_data.get("updates", [])
+                offset_id = updates_data.get("next_offset_id") or offset_id
+                sleep_for, delay = self._next_poll_delay(len(updates), delay, min_interval, interval)
+                
+                if sleep_for:
+                    self._advance_offset(committer, updates_data.get("next_offset_id"))
+                    time.sleep(sleep_for)
+                    pending = fetcher.submit(self.get_updates, limit, offset_id)
+                    continue
+                
+                # دریافت صفحه‌ی بعد هم‌زمان با پردازش صفحه‌ی فعلی
+                pending = fetcher.submit(self.get_updates, limit, offset_id)
+                try:
+                    self.process_updates(updates_data)
+                except Exception as e:
+                    print(f"❌ خطا در پردازش آپدیت‌ها: {e}")
+                self._advance_offset(committer, updates_data.get("next_offset_id"))
+        
+        except KeyboardInterrupt:
+            print("\n⏹ توقف بات...")
+            self._is_running = False
+        finally:
+            fetcher.shutdown(wait=False)
+    
+    def start_polling(self, interval: int = 2, limit: int = 100, daemon: bool = True,
+                      pipelined: bool = False, min_interval: float = 0.1, **kwargs):
+        """
+        شروع پولینگ در ترد جداگانه (kwargs همان پارامترهای offset در run_polling)
+        """
         def polling_loop():
-            self.run_polling(interval, limit)
+            self.run_polling(interval, limit, pipelined, min_interval, **kwargs)
         
         self._polling_thread = threading.Thread(target=polling_loop, daemon=daemon)
         self._polling_thread.start()
@@ -348,8 +654,10 @@ class Bot(Client):
         self._is_running = False
         if self._polling_thread and self._polling_thread.is_alive():
             self._polling_thread.join(timeout=5)
+        if self._dispatcher:
+            self._dispatcher.stop(drain=True, timeout=5)
     
-    def set_webhook(self, url: str, 
+    def set_webhook(self, url: str,
                    receive_update: bool = True,
                    receive_inline_message: bool = True,
                    receive_query: bool = False,
@@ -358,28 +666,33 @@ class Bot(Client):
         """تنظیم وب‌هوک برای انواع مختلف"""
         success = True
         
-        if receive_update:
-            if not self.update_bot_endpoints(url, UpdateEndpointTypeEnum.RECEIVE_UPDATE):
-                success = False
-        
-        if receive_inline_message:
-            if not self.update_bot_endpoints(url, UpdateEndpointTypeEnum.RECEIVE_INLINE_MESSAGE):
-                success = False
-        
-        if receive_query:
-            if not self.update_bot_endpoints(url, UpdateEndpointTypeEnum.RECEIVE_QUERY):
-                success = False
-        
-        if get_selection_item:
-            if not self.update_bot_endpoints(url, UpdateEndpointTypeEnum.GET_SELECTION_ITEM):
-                success = False
-        
-        if search_selection_items:
-            if not self.update_bot_endpoints(url, UpdateEndpointTypeEnum.SEARCH_SELECTION_ITEMS):
+        for endpoint_type in self._webhook_endpoint_types(
+            receive_update, receive_inline_message, receive_query,
+            get_selection_item, search_selection_items
+        ):
+            if not self.update_bot_endpoints(url, endpoint_type):
                 success = False
         
         return success
     
     def process_webhook_update(self, update_data: Dict[str, Any]):
         """پردازش آپدیت دریافتی از وب‌هوک"""
-        self._process_single_update(update_data)
\ No newline at end of file
+        if self.recorder is not None:
+            self._record_updates([update_data], "webhook")
+        self._process_single_update(update_data)
+    
+    def run_webhook(self, host: str = "0.0.0.0", port: int = 8080, path: str = "/",
+                    drain_timeout: float = 10.0, **kwargs):
+        """
+        اجرای سرور وب‌هوک داخلی تا SIGINT/SIGTERM
+        
+        آدرس set_webhook باید به host:port و path این سرور برسد. هنگام توقف
+        آپدیت‌های دریافت‌شده پیش از خروج پردازش می‌شوند.
+        """
+        self._is_running = True
+        try:
+            self.create_webhook_server(host, port, path, **kwargs).run(drain_timeout)
+        finally:
+            self._is_running = False
+            if self._dispatcher:
+                self._dispatcher.stop(drain=True, timeout=5)
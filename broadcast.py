@@ -0,0 +1,182 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Optional, Set, Union
+from .exceptions import RubikaException
+
+@dataclass
+class BroadcastResult:
+    chat_id: str
+    message_id: str = ""
+    error: Optional[Exception] = None
+    skipped: bool = False
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+class BroadcastCheckpoint:
+    """
+    فایل ثبت چت‌هایی که پیام برایشان ارسال شده (هر خط یک chat_id)
+    
+    با اجرای دوباره‌ی broadcast با همین فایل، چت‌های ثبت‌شده رد می‌شوند و
+    پیام تکراری ارسال نمی‌شود.
+    """
+    
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._done: Set[str] = set()
+        self._lock = threading.Lock()
+        
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as fh:
+                self._done.update(line.rstrip("\n") for line in fh if line.strip())
+        
+        self._file = open(path, "a", encoding="utf-8")
+    
+    def __contains__(self, chat_id: str) -> bool:
+        return chat_id in self._done
+    
+    def __len__(self) -> int:
+        return len(self._done)
+    
+    def mark(self, chat_id: str):
+        """ثبت ارسال موفق برای یک چت"""
+        with self._lock:
+            if chat_id in self._done:
+                return
+            self._done.add(chat_id)
+            self._file.write(chat_id + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+    
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _open_checkpoint(checkpoint: Union[str, BroadcastCheckpoint, None]):
+    if isinstance(checkpoint, str):
+        return BroadcastCheckpoint(checkpoint), True
+    return checkpoint, False
+
+class Broadcaster:
+    """
+    ارسال هم‌زمان یک پیام به تعداد زیادی چت روی استخر ترد
+    
+    chat_idها به صورت تنبل از iterable خوانده می‌شوند و حداکثر workers * 2
+    ارسال در جریان است؛ نتیجه‌ی هر چت به محض پایان ارسال yield می‌شود.
+    """
+    
+    def __init__(self, send: Callable[[str], str], workers: int = 16,
+                 checkpoint: Union[str, BroadcastCheckpoint, None] = None):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.send = send
+        self.workers = workers
+        self.checkpoint = checkpoint
+    
+    def _send_one(self, chat_id: str, checkpoint: Optional[BroadcastCheckpoint]) -> BroadcastResult:
+        try:
+            message_id = self.send(chat_id)
+        except RubikaException as e:
+            return BroadcastResult(chat_id, error=e)
+        
+        if checkpoint is not None:
+            checkpoint.mark(chat_id)
+        return BroadcastResult(chat_id, message_id=message_id)
+    
+    def run(self, chat_ids: Iterable[str]) -> Iterator[BroadcastResult]:
+        checkpoint, owned = _open_checkpoint(self.checkpoint)
+        max_in_flight = self.workers * 2
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ruplika-broadcast") as executor:
+                pending = set()
+                for chat_id in chat_ids:
+                    if checkpoint is not None and chat_id in checkpoint:
+                        yield BroadcastResult(chat_id, skipped=True)
+                        continue
+                    
+                    if len(pending) >= max_in_flight:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                    
+                    pending.add(executor.submit(self._send_one, chat_id, checkpoint))
+                
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+        finally:
+            if owned:
+                checkpoint.close()
+
+class AsyncBroadcaster:
+    """
+    نسخه‌ی asyncio از Broadcaster؛ chat_ids می‌تواند iterable یا async iterable باشد
+    """
+    
+    def __init__(self, send: Callable[[str], Any], concurrency: int = 100,
+                 checkpoint: Union[str, BroadcastCheckpoint, None] = None):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.send = send
+        self.concurrency = concurrency
+        self.checkpoint = checkpoint
+    
+    async def _send_one(self, chat_id: str, checkpoint: Optional[BroadcastCheckpoint]) -> BroadcastResult:
+        try:
+            message_id = await self.send(chat_id)
+        except RubikaException as e:
+            return BroadcastResult(chat_id, error=e)
+        
+        if checkpoint is not None:
+            checkpoint.mark(chat_id)
+        return BroadcastResult(chat_id, message_id=message_id)
+    
+    async def _iterate(self, chat_ids):
+        if hasattr(chat_ids, "__aiter__"):
+            async for chat_id in chat_ids:
+                yield chat_id
+        else:
+            for chat_id in chat_ids:
+                yield chat_id
+    
+    async def run(self, chat_ids) -> AsyncIterator[BroadcastResult]:
+        checkpoint, owned = _open_checkpoint(self.checkpoint)
+        pending = set()
+        
+        try:
+            async for chat_id in self._iterate(chat_ids):
+                if checkpoint is not None and chat_id in checkpoint:
+                    yield BroadcastResult(chat_id, skipped=True)
+                    continue
+                
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                
+                pending.add(asyncio.ensure_future(self._send_one(chat_id, checkpoint)))
+            
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if owned:
+                checkpoint.close()
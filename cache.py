@@ -0,0 +1,198 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# مدت اعتبار پیش‌فرض هر متد (ثانیه)
+DEFAULT_TTLS = {
+    "getMe": 3600.0,
+    "getChat": 300.0,
+    "getFile": 600.0,
+}
+
+# نتیجه‌ی flight وقتی مالک آن لغو شود؛ منتظرها دوباره بارگذاری را امتحان می‌کنند
+_RETRY = object()
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+class ResponseCache:
+    """
+    کش TTL/LRU پاسخ متدهای خواندنی API
+    
+    هر متد TTL جداگانه دارد و متدهایی که در ttls نیستند کش نمی‌شوند. وقتی
+    تعداد ورودی‌ها از max_entries یا حجم تقریبی آن‌ها از max_bytes بیشتر شود
+    کم‌استفاده‌ترین ورودی‌ها حذف می‌شوند. درخواست‌های هم‌زمان برای یک کلید
+    فقط یک درخواست به سرور می‌فرستند و بقیه منتظر همان نتیجه می‌مانند.
+    خطاها کش نمی‌شوند.
+    """
+    
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = 10000,
+        max_bytes: int = 16 * 1024 * 1024,
+        size_of: Callable[[Any], int] = _json_size
+    ):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.bytes = 0
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[Any, float, int]]" = OrderedDict()
+        self._flights: Dict[Tuple[str, Hashable], Any] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+    
+    def enabled(self, method: str) -> bool:
+        return bool(self.ttls.get(method))
+    
+    def _count(self, method: str, name: str):
+        stats = self._stats.get(method)
+        if stats is None:
+            stats = self._stats[method] = {"hits": 0, "misses": 0, "collapsed": 0, "evictions": 0}
+        stats[name] += 1
+    
+    def _lookup(self, method: str, key: Hashable, now: float) -> Tuple[bool, Any]:
+        entry = self._entries.get((method, key))
+        if entry is None:
+            return False, None
+        value, expires, size = entry
+        if expires <= now:
+            self._remove((method, key))
+            return False, None
+        self._entries.move_to_end((method, key))
+        return True, value
+    
+    def _remove(self, entry_key: Tuple[str, Hashable]):
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+    
+    def get(self, method: str, key: Hashable) -> Tuple[bool, Any]:
+        """(True، مقدار) اگر ورودی معتبر وجود داشته باشد و در غیر این صورت (False، None)"""
+        with self._lock:
+            found, value = self._lookup(method, key, time.monotonic())
+            self._count(method, "hits" if found else "misses")
+            return found, value
+    
+    def put(self, method: str, key: Hashable, value: Any):
+        ttl = self.ttls.get(method)
+        if not ttl:
+            return
+        size = self.size_of(value)
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            self._remove((method, key))
+            self._entries[(method, key)] = (value, time.monotonic() + ttl, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                evicted = next(iter(self._entries))
+                self._remove(evicted)
+                self._count(evicted[0], "evictions")
+    
+    def invalidate(self, method: Optional[str] = None, key: Optional[Hashable] = None):
+        """
+        حذف ورودی‌ها: بدون آرگومان همه، با method همه‌ی ورودی‌های آن متد و با
+        method و key فقط همان ورودی
+        """
+        with self._lock:
+            if method is not None and key is not None:
+                self._remove((method, key))
+                return
+            for entry_key in list(self._entries):
+                if method is None or entry_key[0] == method:
+                    self._remove(entry_key)
+    
+    def _begin(self, method: str, key: Hashable, factory: Callable[[], Any]) -> Tuple[bool, Any, Any, bool]:
+        """بررسی کش و ثبت درخواست در جریان؛ (پیدا شد، مقدار، flight، مالک flight)"""
+        with self._lock:
+            found, value = self._lookup(method, key, time.monotonic())
+            if found:
+                self._count(method, "hits")
+                return True, value, None, False
+            self._count(method, "misses")
+            
+            flight = self._flights.get((method, key))
+            if flight is not None:
+                self._count(method, "collapsed")
+                return False, None, flight, False
+            
+            flight = self._flights[(method, key)] = factory()
+            return False, None, flight, True
+    
+    def _end(self, method: str, key: Hashable):
+        with self._lock:
+            self._flights.pop((method, key), None)
+    
+    def get_or_load(self, method: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """مقدار کش‌شده یا فراخوانی loader (یک بار برای درخواست‌های هم‌زمان)"""
+        found, value, flight, owner = self._begin(method, key, Future)
+        if found:
+            return value
+        if not owner:
+            return flight.result()
+        
+        try:
+            value = loader()
+            self.put(method, key, value)
+            flight.set_result(value)
+            return value
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            self._end(method, key)
+    
+    async def get_or_load_async(self, method: str, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        نسخه‌ی ناهمگام get_or_load؛ لغو مالک flight منتظرها را لغو نمی‌کند و
+        یکی از آن‌ها بارگذاری را دوباره انجام می‌دهد
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            found, value, flight, owner = self._begin(method, key, loop.create_future)
+            if found:
+                return value
+            if owner:
+                break
+            value = await asyncio.shield(flight)
+            if value is not _RETRY:
+                return value
+        
+        try:
+            value = await loader()
+            self.put(method, key, value)
+            flight.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            flight.set_result(_RETRY)
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            # اگر منتظر دیگری نباشد خطا همین‌جا مصرف می‌شود
+            flight.exception()
+            raise
+        finally:
+            self._end(method, key)
+    
+    def stats(self) -> Dict[str, Any]:
+        """شمارش hit/miss به تفکیک متد به همراه تعداد و حجم ورودی‌ها"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "methods": {method: dict(values) for method, values in self._stats.items()},
+            }
+    
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,69 +1,102 @@
 import requests
-import json
+import urllib3
+import os
 import time
-from typing import List, Optional, Dict, Any, Union
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
 from .models import *
 from .enums import *
 from .exceptions import *
 from .utils import validate_chat_id, validate_message_text, get_file_type
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy, parse_retry_after
+from .keypad import CompiledKeypad, KeypadCache, keypad_key
+from .codec import JSONCodec, get_default_codec
+from .pool import StatsHTTPAdapter
+from .filecache import FileIdCache, content_hash
+from .cache import ResponseCache
+from .upload import DEFAULT_CHUNK_SIZE, MultipartEncoder, ProgressCallback, is_path, source_name
+from .outbox import Outbox, OutboxSender
+from .metrics import Metrics
+from .tracing import Tracer
 
-class Client:
+def _is_connect_error(error: requests.exceptions.ConnectionError) -> bool:
+    """آیا خطا پیش از ارسال درخواست (هنگام برقراری اتصال) رخ داده است"""
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError))
+
+class BaseClient:
     """
-    کلاینت اصلی برای ارتباط با API روبیکا
+    بخش مشترک کلاینت همگام و ناهمگام: ساخت داده‌ی درخواست‌ها و تبدیل کیپدها
     """
     
     BASE_URL = "https://botapi.rubika.ir/v3"
+    USER_AGENT = "Ruplika/3.1.2"
     
-    def __init__(self, token: str, timeout: int = 30):
+    def __init__(self, token: str, timeout: int = 30, rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None, keypad_cache_size: int = 256,
+                 codec: Optional[JSONCodec] = None, file_id_cache: Optional[FileIdCache] = None,
+                 response_cache: Optional[ResponseCache] = None, api_url: Optional[str] = None,
+                 metrics: Optional[Metrics] = None, tracer: Optional[Tracer] = None):
         self.token = token
         self.timeout = timeout
-        self.base_url = f"{self.BASE_URL}/{token}"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': f'Ruplika/3.1.2',
-            'Content-Type': 'application/json'
-        })
+        # با api_url می‌توان به سرور دیگری (مثلا سرور mock محلی) وصل شد
+        self.api_url = (api_url or self.BASE_URL).rstrip("/")
+        self.base_url = f"{self.api_url}/{token}"
+        self.metrics = metrics
+        self.tracer = tracer
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.keypad_cache = KeypadCache(keypad_cache_size) if keypad_cache_size else None
+        self.codec = codec if codec is not None else get_default_codec()
+        self.file_id_cache = file_id_cache
+        self.response_cache = response_cache
     
-    def _make_request(self, method: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
-        """ارسال درخواست به API روبیکا"""
-        url = f"{self.base_url}/{method}"
-        
-        try:
-            response = self.session.post(
-                url, 
-                json=data, 
-                timeout=self.timeout
+    def _check_result(self, result: Any, status_code: int = None) -> Dict[str, Any]:
+        """بررسی خطاهای API در پاسخ دریافتی"""
+        if isinstance(result, dict) and 'status' in result and result['status'] != 'OK':
+            raise APIException(
+                f"API Error: {result.get('message', 'Unknown error')}",
+                status_code=status_code,
+                response=result
             )
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # بررسی خطاهای API
-            if isinstance(result, dict) and 'status' in result and result['status'] != 'OK':
-                raise APIException(
-                    f"API Error: {result.get('message', 'Unknown error')}",
-                    status_code=response.status_code,
-                    response=result
-                )
-            
-            return result
-            
-        except requests.exceptions.Timeout:
-            raise NetworkException("Request timeout")
-        except requests.exceptions.ConnectionError:
-            raise NetworkException("Connection error")
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 401:
-                raise AuthenticationException("Invalid token")
-            raise APIException(f"HTTP Error: {e}", status_code=e.response.status_code)
-        except requests.exceptions.RequestException as e:
-            raise NetworkException(f"Request failed: {e}")
-        except json.JSONDecodeError as e:
-            raise APIException(f"Invalid JSON response: {e}")
+        return result
     
-    def get_me(self) -> Bot:
-        """دریافت اطلاعات بات"""
-        data = self._make_request("getMe")
+    def _decode_response(self, content: bytes, status_code: int = None) -> Dict[str, Any]:
+        """کدگشایی مستقیم بدنه‌ی خام پاسخ و بررسی خطاهای API"""
+        try:
+            result = self.codec.loads(content)
+        except ValueError as e:
+            raise APIException(f"Invalid JSON response: {e}", status_code=status_code)
+        
+        return self._check_result(result, status_code)
+    
+    def _apply_send_options(
+        self,
+        data: Dict[str, Any],
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
+        reply_to_message_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """افزودن کیپدها و پاسخ به پیام به داده‌ی ارسال"""
+        if inline_keypad:
+            data["inline_keypad"] = self._keypad_value(inline_keypad)
+        
+        if chat_keypad:
+            data["chat_keypad"] = self._keypad_value(chat_keypad)
+        
+        if chat_keypad_type:
+            data["chat_keypad_type"] = chat_keypad_type.value
+        
+        if reply_to_message_id:
+            data["reply_to_message_id"] = reply_to_message_id
+        
+        return data
+    
+    def _parse_bot_info(self, data: Dict[str, Any]) -> Bot:
+        """تبدیل پاسخ getMe به آبجکت"""
         bot_data = data.get("bot", {})
         
         avatar = None
@@ -84,17 +117,30 @@ class Client:
             share_url=bot_data.get("share_url", "")
         )
     
-    def send_message(
+    def _parse_chat(self, result: Dict[str, Any]) -> Chat:
+        """تبدیل پاسخ getChat به آبجکت"""
+        chat_data = result.get("chat", {})
+        
+        return Chat(
+            chat_id=chat_data.get("chat_id", ""),
+            chat_type=ChatTypeEnum(chat_data.get("chat_type", "User")),
+            title=chat_data.get("title", ""),
+            username=chat_data.get("username", ""),
+            first_name=chat_data.get("first_name", ""),
+            last_name=chat_data.get("last_name", ""),
+            user_id=chat_data.get("user_id", "")
+        )
+    
+    def _send_message_data(
         self,
         chat_id: str,
         text: str,
-        inline_keypad: Optional[Union[Keypad, Dict]] = None,
-        chat_keypad: Optional[Union[Keypad, Dict]] = None,
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
         chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
         reply_to_message_id: Optional[str] = None,
         disable_notification: bool = False
-    ) -> str:
-        """ارسال پیام"""
+    ) -> Dict[str, Any]:
         if not validate_chat_id(chat_id):
             raise ValidationException("Invalid chat_id")
         
@@ -107,23 +153,11 @@ class Client:
             "disable_notification": disable_notification
         }
         
-        if inline_keypad:
-            data["inline_keypad"] = self._keypad_to_dict(inline_keypad)
-        
-        if chat_keypad:
-            data["chat_keypad"] = self._keypad_to_dict(chat_keypad)
-        
-        if chat_keypad_type:
-            data["chat_keypad_type"] = chat_keypad_type.value
-        
-        if reply_to_message_id:
-            data["reply_to_message_id"] = reply_to_message_id
-        
-        result = self._make_request("sendMessage", data)
-        return result.get("message_id", "")
+        return self._apply_send_options(
+            data, inline_keypad, chat_keypad, chat_keypad_type, reply_to_message_id
+        )
     
-    def send_poll(self, chat_id: str, question: str, options: List[str]) -> str:
-        """ارسال نظرسنجی"""
+    def _send_poll_data(self, chat_id: str, question: str, options: List[str]) -> Dict[str, Any]:
         if not validate_chat_id(chat_id):
             raise ValidationException("Invalid chat_id")
         
@@ -133,27 +167,23 @@ class Client:
         if not options or len(options) < 2:
             raise ValidationException("Poll must have at least 2 options")
         
-        data = {
+        return {
             "chat_id": chat_id,
             "question": question,
             "options": options
         }
-        
-        result = self._make_request("sendPoll", data)
-        return result.get("message_id", "")
     
-    def send_location(
+    def _send_location_data(
         self,
         chat_id: str,
         latitude: str,
         longitude: str,
-        inline_keypad: Optional[Union[Keypad, Dict]] = None,
-        chat_keypad: Optional[Union[Keypad, Dict]] = None,
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
         chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
         reply_to_message_id: Optional[str] = None,
         disable_notification: bool = False
-    ) -> str:
-        """ارسال موقعیت مکانی"""
+    ) -> Dict[str, Any]:
         if not validate_chat_id(chat_id):
             raise ValidationException("Invalid chat_id")
         
@@ -164,34 +194,22 @@ class Client:
             "disable_notification": disable_notification
         }
         
-        if inline_keypad:
-            data["inline_keypad"] = self._keypad_to_dict(inline_keypad)
-        
-        if chat_keypad:
-            data["chat_keypad"] = self._keypad_to_dict(chat_keypad)
-        
-        if chat_keypad_type:
-            data["chat_keypad_type"] = chat_keypad_type.value
-        
-        if reply_to_message_id:
-            data["reply_to_message_id"] = reply_to_message_id
-        
-        result = self._make_request("sendLocation", data)
-        return result.get("message_id", "")
+        return self._apply_send_options(
+            data, inline_keypad, chat_keypad, chat_keypad_type, reply_to_message_id
+        )
     
-    def send_contact(
+    def _send_contact_data(
         self,
         chat_id: str,
         first_name: str,
         last_name: str,
         phone_number: str,
-        inline_keypad: Optional[Union[Keypad, Dict]] = None,
-        chat_keypad: Optional[Union[Keypad, Dict]] = None,
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
         chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
         reply_to_message_id: Optional[str] = None,
         disable_notification: bool = False
-    ) -> str:
-        """ارسال مخاطب"""
+    ) -> Dict[str, Any]:
         if not validate_chat_id(chat_id):
             raise ValidationException("Invalid chat_id")
         
@@ -203,42 +221,17 @@ class Client:
             "disable_notification": disable_notification
         }
         
-        if inline_keypad:
-            data["inline_keypad"] = self._keypad_to_dict(inline_keypad)
-        
-        if chat_keypad:
-            data["chat_keypad"] = self._keypad_to_dict(chat_keypad)
-        
-        if chat_keypad_type:
-            data["chat_keypad_type"] = chat_keypad_type.value
-        
-        if reply_to_message_id:
-            data["reply_to_message_id"] = reply_to_message_id
-        
-        result = self._make_request("sendContact", data)
-        return result.get("message_id", "")
+        return self._apply_send_options(
+            data, inline_keypad, chat_keypad, chat_keypad_type, reply_to_message_id
+        )
     
-    def get_chat(self, chat_id: str) -> Chat:
-        """دریافت اطلاعات چت"""
+    def _get_chat_data(self, chat_id: str) -> Dict[str, Any]:
         if not validate_chat_id(chat_id):
             raise ValidationException("Invalid chat_id")
         
-        data = {"chat_id": chat_id}
-        result = self._make_request("getChat", data)
-        chat_data = result.get("chat", {})
-        
-        return Chat(
-            chat_id=chat_data.get("chat_id", ""),
-            chat_type=ChatTypeEnum(chat_data.get("chat_type", "User")),
-            title=chat_data.get("title", ""),
-            username=chat_data.get("username", ""),
-            first_name=chat_data.get("first_name", ""),
-            last_name=chat_data.get("last_name", ""),
-            user_id=chat_data.get("user_id", "")
-        )
+        return {"chat_id": chat_id}
     
-    def get_updates(self, limit: int = 100, offset_id: Optional[str] = None) -> Dict[str, Any]:
-        """دریافت آخرین آپدیت‌ها"""
+    def _get_updates_data(self, limit: int = 100, offset_id: Optional[str] = None) -> Dict[str, Any]:
         if limit < 1 or limit > 100:
             raise ValidationException("Limit must be between 1 and 100")
         
@@ -246,123 +239,88 @@ class Client:
         if offset_id:
             data["offset_id"] = offset_id
         
-        return self._make_request("getUpdates", data)
+        return data
     
-    def forward_message(
+    def _forward_message_data(
         self,
         from_chat_id: str,
         message_id: str,
         to_chat_id: str,
         disable_notification: bool = False
-    ) -> str:
-        """فوروارد کردن پیام"""
+    ) -> Dict[str, Any]:
         if not validate_chat_id(from_chat_id) or not validate_chat_id(to_chat_id):
             raise ValidationException("Invalid chat_id")
         
-        data = {
+        return {
             "from_chat_id": from_chat_id,
             "message_id": message_id,
             "to_chat_id": to_chat_id,
             "disable_notification": disable_notification
         }
-        
-        result = self._make_request("forwardMessage", data)
-        return result.get("new_message_id", "")
     
-    def edit_message_text(self, chat_id: str, message_id: str, text: str) -> bool:
-        """ویرایش متن پیام"""
+    def _edit_message_text_data(self, chat_id: str, message_id: str, text: str) -> Dict[str, Any]:
         if not validate_chat_id(chat_id):
             raise ValidationException("Invalid chat_id")
         
         if not validate_message_text(text):
             raise ValidationException("Message text cannot be empty")
         
-        data = {
+        return {
             "chat_id": chat_id,
             "message_id": message_id,
             "text": text
         }
-        
-        try:
-            self._make_request("editMessageText", data)
-            return True
-        except APIException:
-            return False
     
-    def edit_inline_keypad(self, chat_id: str, message_id: str, inline_keypad: Union[Keypad, Dict]) -> bool:
-        """ویرایش اینلاین کیپد"""
+    def _edit_inline_keypad_data(
+        self,
+        chat_id: str,
+        message_id: str,
+        inline_keypad: Union[Keypad, CompiledKeypad, Dict]
+    ) -> Dict[str, Any]:
         if not validate_chat_id(chat_id):
             raise ValidationException("Invalid chat_id")
         
-        data = {
+        return {
             "chat_id": chat_id,
             "message_id": message_id,
-            "inline_keypad": self._keypad_to_dict(inline_keypad)
+            "inline_keypad": self._keypad_value(inline_keypad)
         }
-        
-        try:
-            self._make_request("editInlineKeypad", data)
-            return True
-        except APIException:
-            return False
     
-    def delete_message(self, chat_id: str, message_id: str) -> bool:
-        """حذف پیام"""
+    def _delete_message_data(self, chat_id: str, message_id: str) -> Dict[str, Any]:
         if not validate_chat_id(chat_id):
             raise ValidationException("Invalid chat_id")
         
-        data = {
+        return {
             "chat_id": chat_id,
             "message_id": message_id
         }
-        
-        try:
-            self._make_request("deleteMessage", data)
-            return True
-        except APIException:
-            return False
     
-    def set_commands(self, commands: List[BotCommand]) -> bool:
-        """تنظیم دستورات بات"""
+    def _set_commands_data(self, commands: List[BotCommand]) -> Dict[str, Any]:
         if not commands:
             raise ValidationException("Commands list cannot be empty")
         
-        data = {
+        return {
             "bot_commands": [
                 {"command": cmd.command, "description": cmd.description}
                 for cmd in commands
             ]
         }
-        
-        try:
-            self._make_request("setCommands", data)
-            return True
-        except APIException:
-            return False
     
-    def update_bot_endpoints(self, url: str, endpoint_type: UpdateEndpointTypeEnum) -> bool:
-        """آپدیت آدرس بات"""
+    def _update_bot_endpoints_data(self, url: str, endpoint_type: UpdateEndpointTypeEnum) -> Dict[str, Any]:
         if not url or not url.startswith(('http://', 'https://')):
             raise ValidationException("Invalid URL")
         
-        data = {
+        return {
             "url": url,
             "type": endpoint_type.value
         }
-        
-        try:
-            self._make_request("updateBotEndpoints", data)
-            return True
-        except APIException:
-            return False
     
-    def edit_chat_keypad(
+    def _edit_chat_keypad_data(
         self,
         chat_id: str,
         chat_keypad_type: ChatKeypadTypeEnum,
-        chat_keypad: Optional[Union[Keypad, Dict]] = None
-    ) -> bool:
-        """ویرایش یا حذف کیپد چت"""
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None
+    ) -> Dict[str, Any]:
         if not validate_chat_id(chat_id):
             raise ValidationException("Invalid chat_id")
         
@@ -372,35 +330,27 @@ class Client:
         }
         
         if chat_keypad and chat_keypad_type == ChatKeypadTypeEnum.NEW:
-            data["chat_keypad"] = self._keypad_to_dict(chat_keypad)
+            data["chat_keypad"] = self._keypad_value(chat_keypad)
         
-        try:
-            self._make_request("editChatKeypad", data)
-            return True
-        except APIException:
-            return False
+        return data
     
-    def get_file(self, file_id: str) -> str:
-        """دریافت لینک دانلود فایل"""
+    def _get_file_data(self, file_id: str) -> Dict[str, Any]:
         if not file_id:
             raise ValidationException("File ID cannot be empty")
         
-        data = {"file_id": file_id}
-        result = self._make_request("getFile", data)
-        return result.get("download_url", "")
+        return {"file_id": file_id}
     
-    def send_file(
+    def _send_file_data(
         self,
         chat_id: str,
         file_id: str,
         text: str = "",
-        inline_keypad: Optional[Union[Keypad, Dict]] = None,
-        chat_keypad: Optional[Union[Keypad, Dict]] = None,
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
         chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
         reply_to_message_id: Optional[str] = None,
         disable_notification: bool = False
-    ) -> str:
-        """ارسال فایل"""
+    ) -> Dict[str, Any]:
         if not validate_chat_id(chat_id):
             raise ValidationException("Invalid chat_id")
         
@@ -414,30 +364,12 @@ class Client:
             "disable_notification": disable_notification
         }
         
-        if inline_keypad:
-            data["inline_keypad"] = self._keypad_to_dict(inline_keypad)
-        
-        if chat_keypad:
-            data["chat_keypad"] = self._keypad_to_dict(chat_keypad)
-        
-        if chat_keypad_type:
-            data["chat_keypad_type"] = chat_keypad_type.value
-        
-        if reply_to_message_id:
-            data["reply_to_message_id"] = reply_to_message_id
-        
-        result = self._make_request("sendFile", data)
-        return result.get("message_id", "")
-    
-    def request_send_file(self, file_type: FileTypeEnum) -> Dict[str, Any]:
-        """درخواست آپلود فایل"""
-        data = {"type": file_type.value}
-        return self._make_request("requestSendFile", data)
+        return self._apply_send_options(
+            data, inline_keypad, chat_keypad, chat_keypad_type, reply_to_message_id
+        )
     
-    def upload_file(self, file_path: str, file_type: Optional[FileTypeEnum] = None) -> str:
-        """آپلود فایل به سرور روبیکا"""
-        import os
-        
+    def _check_upload_path(self, file_path: str, file_type: Optional[FileTypeEnum] = None) -> FileTypeEnum:
+        """بررسی فایل آپلودی و تشخیص نوع آن"""
         if not os.path.exists(file_path):
             raise FileUploadException("File not found")
         
@@ -445,31 +377,75 @@ class Client:
         if not file_type:
             file_type = get_file_type(file_path)
         
-        # دریافت آدرس آپلود
-        upload_data = self.request_send_file(file_type)
-        upload_url = upload_data.get("upload_url")
+        return file_type
+    
+    def _upload_encoder(
+        self,
+        source: Any,
+        file_type: Optional[FileTypeEnum] = None,
+        file_name: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap: bool = False,
+        size: Optional[int] = None
+    ):
+        """بررسی منبع آپلود و ساخت encoder جریانی آن"""
+        if is_path(source):
+            file_type = self._check_upload_path(os.fspath(source), file_type)
+        
+        file_name = file_name or source_name(source)
+        if not file_type:
+            file_type = get_file_type(file_name)
         
-        if not upload_url:
-            raise FileUploadException("Failed to get upload URL")
+        encoder = MultipartEncoder(
+            source, file_name, chunk_size=chunk_size, progress=progress, use_mmap=use_mmap, size=size
+        )
+        return file_type, encoder
+    
+    def compile_keypad(self, keypad: Union[Keypad, CompiledKeypad, Dict]) -> CompiledKeypad:
+        """
+        کامپایل کیپد به payload سریال‌شده‌ی تغییرناپذیر
+        
+        برای منوهای ثابت، کیپد را یک بار کامپایل کنید و CompiledKeypad را
+        در ارسال‌ها استفاده کنید. کیپدهای عادی هم با کلید محتوایی در
+        keypad_cache نگه‌داری می‌شوند و تغییر محتوا باعث کامپایل دوباره می‌شود.
+        """
+        if isinstance(keypad, CompiledKeypad):
+            return keypad
+        if isinstance(keypad, dict):
+            return CompiledKeypad.from_dict(keypad)
         
-        # آپلود فایل
-        try:
-            with open(file_path, 'rb') as file:
-                files = {'file': (os.path.basename(file_path), file)}
-                response = self.session.post(upload_url, files=files)
-                response.raise_for_status()
-                
-                result = response.json()
-                return result.get("file_id", "")
-                
-        except Exception as e:
-            raise FileUploadException(f"Upload failed: {e}")
+        if self.keypad_cache is None:
+            return CompiledKeypad(self._serialize_keypad(keypad))
+        
+        key = keypad_key(keypad)
+        compiled = self.keypad_cache.get(key)
+        if compiled is None:
+            compiled = CompiledKeypad(self._serialize_keypad(keypad), key)
+            self.keypad_cache.put(key, compiled)
+        return compiled
     
-    def _keypad_to_dict(self, keypad: Union[Keypad, Dict]) -> Dict[str, Any]:
+    def _keypad_value(self, keypad: Union[Keypad, CompiledKeypad, Dict]) -> Union[CompiledKeypad, Dict[str, Any]]:
+        """
+        مقدار کیپد در داده‌ی درخواست
+        
+        کیپدهای کامپایل‌شده همان‌طور می‌مانند تا codec بایت‌های آماده‌ی آن‌ها را
+        مستقیما در بدنه قرار دهد.
+        """
+        if isinstance(keypad, dict):
+            return keypad
+        
+        return self.compile_keypad(keypad)
+    
+    def _keypad_to_dict(self, keypad: Union[Keypad, CompiledKeypad, Dict]) -> Dict[str, Any]:
         """تبدیل Keypad به دیکشنری"""
         if isinstance(keypad, dict):
             return keypad
         
+        return self.compile_keypad(keypad).payload
+    
+    def _serialize_keypad(self, keypad: Keypad) -> Dict[str, Any]:
+        """ساخت دیکشنری مستقل از روی درخت Keypad"""
         rows = []
         for row in keypad.rows:
             buttons = []
@@ -543,7 +519,7 @@ class Client:
     
     def _button_string_picker_to_dict(self, picker: ButtonStringPicker) -> Dict[str, Any]:
         result = {
-            "items": picker.items
+            "items": list(picker.items)
         }
         if picker.default_value:
             result["default_value"] = picker.default_value
@@ -587,4 +563,562 @@ class Client:
         if textbox.default_value:
             result["default_value"] = textbox.default_value
         
-        return result
\ No newline at end of file
+        return result
+
+class Client(BaseClient):
+    """
+    کلاینت اصلی برای ارتباط با API روبیکا
+    """
+    
+    def __init__(
+        self,
+        token: str,
+        timeout: int = 30,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        keypad_cache_size: int = 256,
+        codec: Optional[JSONCodec] = None,
+        file_id_cache: Optional[FileIdCache] = None,
+        response_cache: Optional[ResponseCache] = None,
+        pool_size: int = 10,
+        pool_size_per_host: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        warm_connections: int = 0,
+        outbox: Optional[Outbox] = None,
+        outbox_concurrency: int = 4,
+        api_url: Optional[str] = None,
+        metrics: Optional[Metrics] = None,
+        tracer: Optional[Tracer] = None
+    ):
+        """
+        pool_size تعداد میزبان‌هایی است که استخر اتصالشان نگه داشته می‌شود و
+        pool_size_per_host بیشینه‌ی اتصال باز به هر میزبان؛ این عدد را هم‌اندازه‌ی
+        تعداد ترد‌های ارسال‌کننده بگذارید. با pool_block=True ترد اضافی به جای
+        باز کردن اتصال یک‌بارمصرف منتظر آزاد شدن اتصال می‌ماند.
+        connect_timeout و read_timeout به صورت پیش‌فرض برابر timeout هستند.
+        
+        با outbox متدهای send_* به جای ارسال مستقیم درخواست را در صف پایدار
+        ثبت می‌کنند و شناسه‌ی کار در outbox (نه message_id) را برمی‌گردانند؛
+        outbox_concurrency ترد در پس‌زمینه صف را ارسال می‌کنند.
+        
+        با metrics تعداد، نتیجه و زمان هر تلاش درخواست API ثبت می‌شود و با
+        tracer هر درخواست یک span است که به آپدیت در حال پردازش وصل می‌شود.
+        """
+        super().__init__(
+            token, timeout, rate_limiter, retry_policy, keypad_cache_size, codec, file_id_cache, response_cache,
+            api_url, metrics, tracer
+        )
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.keep_alive = keep_alive
+        self.request_timeout = (
+            connect_timeout if connect_timeout is not None else timeout,
+            read_timeout if read_timeout is not None else timeout
+        )
+        self._upload_flights: Dict[Tuple[str, FileTypeEnum], Future] = {}
+        self._upload_flights_lock = threading.Lock()
+        
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': self.USER_AGENT,
+            'Content-Type': 'application/json'
+        })
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+        
+        adapter = StatsHTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size_per_host,
+            pool_block=pool_block
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._adapter = adapter
+        
+        if warm_connections:
+            self.warm_up(warm_connections)
+        
+        self.outbox = outbox
+        self.outbox_sender = None
+        if outbox is not None:
+            self.outbox_sender = OutboxSender(self, outbox, outbox_concurrency)
+            if metrics is not None:
+                metrics.track_queue("outbox", outbox.__len__)
+            # کارهای باقی‌مانده از اجرای قبلی بلافاصله ارسال می‌شوند
+            self.outbox_sender.start()
+    
+    def _pool_for(self, url: str):
+        """استخر urllib3 که requests برای این آدرس استفاده می‌کند یا None در نسخه‌های ناشناخته"""
+        settings = self.session.merge_environment_settings(url, {}, None, None, None)
+        # requests 2.32 به بعد؛ get_connection در این نسخه‌ها منسوخ شده است
+        if hasattr(self._adapter, "get_connection_with_tls_context"):
+            request = requests.Request("POST", url).prepare()
+            return self._adapter.get_connection_with_tls_context(
+                request, settings["verify"], settings["proxies"], settings["cert"]
+            )
+        if hasattr(self._adapter, "get_connection"):
+            return self._adapter.get_connection(url, settings["proxies"])
+        return None
+    
+    def warm_up(self, connections: Optional[int] = None) -> int:
+        """
+        باز کردن پیشاپیش اتصال‌ها (شامل دست‌دهی TLS) به سرور API
+        
+        اتصال‌ها به صورت موازی باز و در استخر قرار می‌گیرند؛ تعداد اتصال‌های
+        موفق برگردانده می‌شود. خطاهای اتصال نادیده گرفته می‌شوند.
+        
+        این کار با APIهای داخلی urllib3 انجام می‌شود؛ اگر در نسخه‌ی نصب‌شده‌ی
+        requests/urllib3 در دسترس نباشند، اتصال‌ها با درخواست‌های HEAD موازی
+        باز می‌شوند (که در pool_stats به عنوان miss شمرده می‌شوند).
+        """
+        connections = min(connections or self.pool_size_per_host, self.pool_size_per_host)
+        if connections < 1 or not self.keep_alive:
+            return 0
+        
+        try:
+            pool = self._pool_for(self.base_url)
+            get_conn, put_conn = pool._get_conn_uncounted, pool._put_conn
+            conns = [get_conn(timeout=self.request_timeout[0]) for _ in range(connections)]
+        except (AttributeError, TypeError):
+            return self._warm_up_with_requests(connections)
+        
+        def connect(conn) -> bool:
+            if getattr(conn, "sock", None) is not None:
+                return True
+            try:
+                conn.timeout = self.request_timeout[0]
+                conn.connect()
+                return True
+            except Exception:
+                conn.close()
+                return False
+        
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            opened = sum(executor.map(connect, conns))
+        
+        for conn in conns:
+            put_conn(conn)
+        return opened
+    
+    def _warm_up_with_requests(self, connections: int) -> int:
+        """گرم کردن استخر با درخواست‌های HEAD هم‌زمان؛ وضعیت پاسخ اهمیتی ندارد"""
+        barrier = threading.Barrier(connections)
+        
+        def head(_) -> bool:
+            try:
+                # تا همه‌ی تردها آماده نشوند درخواستی ارسال نمی‌شود، پس هر کدام اتصال جدا می‌گیرد
+                barrier.wait(self.request_timeout[0])
+            except threading.BrokenBarrierError:
+                pass
+            try:
+                self.session.head(self.api_url, timeout=self.request_timeout).close()
+                return True
+            except requests.RequestException:
+                return False
+        
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            return sum(executor.map(head, range(connections)))
+    
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        آمار استخر اتصال به تفکیک میزبان
+        
+        hits درخواست‌هایی است که از اتصال باز استفاده کرده‌اند، misses
+        درخواست‌هایی که اتصال جدید (دست‌دهی جدید) لازم داشته‌اند و idle تعداد
+        اتصال‌های باز آماده در استخر. نسبت بالای misses زیر بار هم‌زمان یعنی
+        pool_size_per_host از تعداد ترد‌های ارسال‌کننده کمتر است.
+        """
+        return self._adapter.stats()
+    
+    def reset_pool_stats(self):
+        self._adapter.reset_stats()
+    
+    def _make_request(self, method: str, data: Dict[str, Any] = None, retry: bool = True) -> Dict[str, Any]:
+        """
+        ارسال درخواست به API روبیکا (با تلاش مجدد طبق retry_policy)؛ با
+        retry=False فقط یک تلاش انجام می‌شود (مثلا برای outbox که خودش تلاش
+        مجدد را مدیریت می‌کند)
+        """
+        if self.tracer is None:
+            return self._request_with_retry(method, data, retry)
+        
+        span = self.tracer.start("request", method)
+        try:
+            result = self._request_with_retry(method, data, retry)
+        except Exception as e:
+            self.tracer.finish(span, e)
+            raise
+        self.tracer.finish(span, result=result)
+        return result
+    
+    def _request_with_retry(self, method: str, data: Dict[str, Any] = None, retry: bool = True) -> Dict[str, Any]:
+        policy = self.retry_policy if retry else None
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                result = self._send_request(method, data)
+            except RubikaException as e:
+                if self.metrics is not None:
+                    self.metrics.observe_request(method, time.perf_counter() - started, e)
+                delay = policy.next_delay(method, e, attempt) if policy else None
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            
+            if self.metrics is not None:
+                self.metrics.observe_request(method, time.perf_counter() - started)
+            if policy:
+                policy.on_success()
+            return result
+    
+    def _request_ok(self, method: str, data: Dict[str, Any]) -> bool:
+        """
+        درخواستی که فقط موفقیتش برگردانده می‌شود؛ خطای API به False تبدیل
+        می‌شود مگر این‌که retry_policy.raise_errors فعال باشد
+        """
+        try:
+            self._make_request(method, data)
+            return True
+        except APIException:
+            if self.retry_policy is not None and self.retry_policy.raise_errors:
+                raise
+            return False
+    
+    def _cached_request(self, method: str, key: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """درخواست متدهای خواندنی از طریق response_cache (در صورت وجود)"""
+        if self.response_cache is None or not self.response_cache.enabled(method):
+            return self._make_request(method, data)
+        return self.response_cache.get_or_load(method, key, lambda: self._make_request(method, data))
+    
+    def _send(self, method: str, data: Dict[str, Any]) -> str:
+        """ارسال مستقیم یا ثبت در outbox؛ message_id یا شناسه‌ی کار outbox"""
+        if self.outbox is not None:
+            job_id = self.outbox.enqueue(method, self.codec.encode_body(data))
+            self.outbox_sender.start()
+            return str(job_id)
+        result = self._make_request(method, data)
+        return result.get("message_id", "")
+    
+    def flush_outbox(self, timeout: Optional[float] = None) -> bool:
+        """انتظار تا ارسال کارهای آماده‌ی outbox؛ False در صورت پایان timeout"""
+        if self.outbox_sender is None:
+            return True
+        return self.outbox_sender.flush(timeout)
+    
+    def stop_outbox(self, timeout: Optional[float] = None):
+        """توقف ارسال outbox؛ کارهای ارسال‌نشده برای اجرای بعد در صف می‌مانند"""
+        if self.outbox_sender is not None:
+            self.outbox_sender.stop(timeout)
+    
+    def _send_request(self, method: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """یک بار ارسال درخواست به API روبیکا"""
+        url = f"{self.base_url}/{method}"
+        
+        if self.rate_limiter:
+            self.rate_limiter.acquire(method, data.get("chat_id") if data else None)
+        
+        try:
+            response = self.session.post(
+                url, 
+                data=self.codec.encode_body(data), 
+                timeout=self.request_timeout
+            )
+            response.raise_for_status()
+            
+            return self._decode_response(response.content, response.status_code)
+        
+        except requests.exceptions.ConnectTimeout:
+            raise ConnectException("Connection timeout")
+        except requests.exceptions.Timeout:
+            raise NetworkException("Request timeout")
+        except requests.exceptions.ConnectionError as e:
+            if _is_connect_error(e):
+                raise ConnectException("Connection error")
+            raise NetworkException("Connection error")
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 401:
+                raise AuthenticationException("Invalid token")
+            if e.response.status_code == 429:
+                raise RateLimitException(
+                    f"HTTP Error: {e}",
+                    retry_after=parse_retry_after(e.response.headers.get("Retry-After"))
+                )
+            raise APIException(f"HTTP Error: {e}", status_code=e.response.status_code)
+        except requests.exceptions.RequestException as e:
+            raise NetworkException(f"Request failed: {e}")
+    
+    def get_me(self) -> Bot:
+        """دریافت اطلاعات بات"""
+        data = self._cached_request("getMe", "")
+        return self._parse_bot_info(data)
+    
+    def send_message(
+        self,
+        chat_id: str,
+        text: str,
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
+        reply_to_message_id: Optional[str] = None,
+        disable_notification: bool = False
+    ) -> str:
+        """ارسال پیام"""
+        data = self._send_message_data(
+            chat_id, text, inline_keypad, chat_keypad,
+            chat_keypad_type, reply_to_message_id, disable_notification
+        )
+        
+        return self._send("sendMessage", data)
+    
+    def send_poll(self, chat_id: str, question: str, options: List[str]) -> str:
+        """ارسال نظرسنجی"""
+        data = self._send_poll_data(chat_id, question, options)
+        
+        return self._send("sendPoll", data)
+    
+    def send_location(
+        self,
+        chat_id: str,
+        latitude: str,
+        longitude: str,
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
+        reply_to_message_id: Optional[str] = None,
+        disable_notification: bool = False
+    ) -> str:
+        """ارسال موقعیت مکانی"""
+        data = self._send_location_data(
+            chat_id, latitude, longitude, inline_keypad, chat_keypad,
+            chat_keypad_type, reply_to_message_id, disable_notification
+        )
+        
+        return self._send("sendLocation", data)
+    
+    def send_contact(
+        self,
+        chat_id: str,
+        first_name: str,
+        last_name: str,
+        phone_number: str,
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
+        reply_to_message_id: Optional[str] = None,
+        disable_notification: bool = False
+    ) -> str:
+        """ارسال مخاطب"""
+        data = self._send_contact_data(
+            chat_id, first_name, last_name, phone_number, inline_keypad,
+            chat_keypad, chat_keypad_type, reply_to_message_id, disable_notification
+        )
+        
+        return self._send("sendContact", data)
+    
+    def get_chat(self, chat_id: str) -> Chat:
+        """دریافت اطلاعات چت"""
+        data = self._get_chat_data(chat_id)
+        result = self._cached_request("getChat", chat_id, data)
+        return self._parse_chat(result)
+    
+    def get_updates(self, limit: int = 100, offset_id: Optional[str] = None) -> Dict[str, Any]:
+        """دریافت آخرین آپدیت‌ها"""
+        data = self._get_updates_data(limit, offset_id)
+        return self._make_request("getUpdates", data)
+    
+    def forward_message(
+        self,
+        from_chat_id: str,
+        message_id: str,
+        to_chat_id: str,
+        disable_notification: bool = False
+    ) -> str:
+        """فوروارد کردن پیام"""
+        data = self._forward_message_data(from_chat_id, message_id, to_chat_id, disable_notification)
+        
+        result = self._make_request("forwardMessage", data)
+        return result.get("new_message_id", "")
+    
+    def edit_message_text(self, chat_id: str, message_id: str, text: str) -> bool:
+        """ویرایش متن پیام"""
+        data = self._edit_message_text_data(chat_id, message_id, text)
+        
+        return self._request_ok("editMessageText", data)
+    
+    def edit_inline_keypad(self, chat_id: str, message_id: str, inline_keypad: Union[Keypad, CompiledKeypad, Dict]) -> bool:
+        """ویرایش اینلاین کیپد"""
+        data = self._edit_inline_keypad_data(chat_id, message_id, inline_keypad)
+        
+        return self._request_ok("editInlineKeypad", data)
+    
+    def delete_message(self, chat_id: str, message_id: str) -> bool:
+        """حذف پیام"""
+        data = self._delete_message_data(chat_id, message_id)
+        
+        return self._request_ok("deleteMessage", data)
+    
+    def set_commands(self, commands: List[BotCommand]) -> bool:
+        """تنظیم دستورات بات"""
+        data = self._set_commands_data(commands)
+        
+        return self._request_ok("setCommands", data)
+    
+    def update_bot_endpoints(self, url: str, endpoint_type: UpdateEndpointTypeEnum) -> bool:
+        """آپدیت آدرس بات"""
+        data = self._update_bot_endpoints_data(url, endpoint_type)
+        
+        return self._request_ok("updateBotEndpoints", data)
+    
+    def edit_chat_keypad(
+        self,
+        chat_id: str,
+        chat_keypad_type: ChatKeypadTypeEnum,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None
+    ) -> bool:
+        """ویرایش یا حذف کیپد چت"""
+        data = self._edit_chat_keypad_data(chat_id, chat_keypad_type, chat_keypad)
+        
+        return self._request_ok("editChatKeypad", data)
+    
+    def get_file(self, file_id: str) -> str:
+        """دریافت لینک دانلود فایل"""
+        data = self._get_file_data(file_id)
+        result = self._cached_request("getFile", file_id, data)
+        return result.get("download_url", "")
+    
+    def send_file(
+        self,
+        chat_id: str,
+        file_id: str,
+        text: str = "",
+        inline_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad: Optional[Union[Keypad, CompiledKeypad, Dict]] = None,
+        chat_keypad_type: Optional[ChatKeypadTypeEnum] = None,
+        reply_to_message_id: Optional[str] = None,
+        disable_notification: bool = False
+    ) -> str:
+        """ارسال فایل"""
+        data = self._send_file_data(
+            chat_id, file_id, text, inline_keypad, chat_keypad,
+            chat_keypad_type, reply_to_message_id, disable_notification
+        )
+        
+        return self._send("sendFile", data)
+    
+    def request_send_file(self, file_type: FileTypeEnum) -> Dict[str, Any]:
+        """درخواست آپلود فایل"""
+        data = {"type": file_type.value}
+        return self._make_request("requestSendFile", data)
+    
+    def upload_file(
+        self,
+        file_path: Union[str, os.PathLike, bytes, BinaryIO, Iterable[bytes]],
+        file_type: Optional[FileTypeEnum] = None,
+        file_name: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap: bool = False,
+        size: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        آپلود فایل به سرور روبیکا
+        
+        file_path می‌تواند مسیر فایل، bytes، آبجکت فایل‌مانند یا iterable از
+        bytes باشد و به صورت جریانی (chunk_size بایت در هر مرحله) ارسال می‌شود.
+        progress(ارسال‌شده، کل) بعد از هر تکه صدا زده می‌شود. برای منابعی که
+        نام ندارند file_name یا file_type را مشخص کنید.
+        
+        با file_id_cache، محتوایی که قبلا آپلود شده بدون ارسال دوباره file_id
+        قبلی را برمی‌گرداند و آپلودهای هم‌زمان یک محتوا فقط یک بار انجام می‌شوند.
+        """
+        file_type, encoder = self._upload_encoder(
+            file_path, file_type, file_name, progress, chunk_size, use_mmap, size
+        )
+        
+        digest = content_hash(file_path, chunk_size) if self.file_id_cache is not None else None
+        if digest is None:
+            return self._upload(file_type, encoder, timeout)
+        
+        file_id = self.file_id_cache.get(digest, file_type)
+        if file_id:
+            return file_id
+        
+        key = (digest, file_type)
+        with self._upload_flights_lock:
+            flight = self._upload_flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._upload_flights[key] = Future()
+        
+        if not owner:
+            return flight.result()
+        
+        try:
+            file_id = self._upload(file_type, encoder, timeout)
+            if file_id:
+                self.file_id_cache.put(digest, file_type, file_id)
+            flight.set_result(file_id)
+            return file_id
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._upload_flights_lock:
+                self._upload_flights.pop(key, None)
+    
+    def _upload(self, file_type: FileTypeEnum, encoder: MultipartEncoder, timeout: Optional[float] = None) -> str:
+        # دریافت آدرس آپلود
+        upload_data = self.request_send_file(file_type)
+        upload_url = upload_data.get("upload_url")
+        
+        if not upload_url:
+            raise FileUploadException("Failed to get upload URL")
+        
+        # آپلود فایل
+        try:
+            response = self.session.post(
+                upload_url,
+                data=encoder,
+                headers={'Content-Type': encoder.content_type},
+                timeout=timeout if timeout is not None else self.request_timeout
+            )
+            response.raise_for_status()
+            
+            result = self.codec.loads(response.content)
+            return result.get("file_id", "")
+        
+        except Exception as e:
+            raise FileUploadException(f"Upload failed: {e}")
+    
+    def upload_files(
+        self,
+        files: Iterable[Any],
+        file_type: Optional[FileTypeEnum] = None,
+        workers: int = 4,
+        **kwargs
+    ) -> List[str]:
+        """
+        آپلود هم‌زمان چند فایل (مثلا یک آلبوم) با حداکثر workers آپلود در جریان
+        
+        file_idها به ترتیب ورودی برگردانده می‌شوند. اگر آپلودی خطا بدهد بعد از
+        پایان بقیه‌ی آپلودها همان خطا raise می‌شود. سایر آرگومان‌ها به upload_file
+        داده می‌شوند.
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        
+        files = list(files)
+        if not files:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(workers, len(files)), thread_name_prefix="ruplika-upload") as executor:
+            futures = [executor.submit(self.upload_file, file, file_type, **kwargs) for file in files]
+        
+        return [future.result() for future in futures]
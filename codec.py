@@ -0,0 +1,96 @@
+import json
+from typing import Any, Dict, Optional
+from .keypad import CompiledKeypad
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, CompiledKeypad):
+        return obj.payload
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class JSONCodec:
+    """
+    کدگذار/کدگشای JSON بدنه‌ی درخواست‌ها و پاسخ‌ها (پیاده‌سازی stdlib)
+    
+    برای استفاده از کتابخانه‌ی دیگر کافی است dumps و loads بازنویسی شوند.
+    """
+    
+    name = "json"
+    
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+    
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+    
+    def encode_body(self, data: Optional[Dict[str, Any]]) -> Optional[bytes]:
+        """
+        کدگذاری بدنه‌ی درخواست
+        
+        مقادیر CompiledKeypad در سطح اول دیکشنری بدون کدگذاری دوباره و با
+        همان بایت‌های از پیش ساخته شده در بدنه قرار می‌گیرند.
+        """
+        if data is None:
+            return None
+        
+        compiled = [(key, value) for key, value in data.items() if isinstance(value, CompiledKeypad)]
+        if not compiled:
+            return self.dumps(data)
+        
+        rest = {key: value for key, value in data.items() if not isinstance(value, CompiledKeypad)}
+        parts = [self.dumps(rest)[:-1]]
+        separator = b"," if rest else b""
+        for key, value in compiled:
+            parts.append(separator + self.dumps(key) + b":" + value.json_bytes)
+            separator = b","
+        parts.append(b"}")
+        return b"".join(parts)
+
+class OrjsonCodec(JSONCodec):
+    """کدگذار مبتنی بر orjson (pip install orjson)"""
+    
+    name = "orjson"
+    
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires orjson: pip install orjson")
+    
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default)
+    
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+class UjsonCodec(JSONCodec):
+    """کدگذار مبتنی بر ujson (pip install ujson)"""
+    
+    name = "ujson"
+    
+    def __init__(self):
+        if ujson is None:
+            raise ImportError("UjsonCodec requires ujson: pip install ujson")
+    
+    def dumps(self, obj: Any) -> bytes:
+        if any(isinstance(value, CompiledKeypad) for value in getattr(obj, "values", lambda: ())()):
+            obj = {key: _default(value) if isinstance(value, CompiledKeypad) else value for key, value in obj.items()}
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+    
+    def loads(self, data: bytes) -> Any:
+        return ujson.loads(data)
+
+def get_default_codec() -> JSONCodec:
+    """سریع‌ترین کدگذار نصب‌شده (orjson، سپس ujson و در نهایت stdlib)"""
+    if orjson is not None:
+        return OrjsonCodec()
+    if ujson is not None:
+        return UjsonCodec()
+    return JSONCodec()
@@ -0,0 +1,221 @@
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# کلید شناسه‌ی پیام در هر نوع آپدیت
+MESSAGE_ID_FIELDS = {
+    "NewMessage": ("new_message", "message_id"),
+    "UpdatedMessage": ("updated_message", "message_id"),
+}
+
+def dedup_key(update_data: Dict[str, Any]) -> Optional[str]:
+    """
+    کلید یکتای آپدیت یا None برای آپدیت‌هایی که نباید حذف شوند
+    
+    NewMessage و RemovedMessage با (نوع، chat_id، message_id) شناخته می‌شوند.
+    برای UpdatedMessage زمان و هش متن ویرایش هم در کلید است، پس ویرایش‌های
+    مختلف یک پیام جدا هستند و فقط تحویل دوباره‌ی همان ویرایش حذف می‌شود.
+    InlineMessage (کلیک دکمه) چیزی یکتا برای هر کلیک ندارد (message_id مال
+    پیام کیپد است) و مثل StartedBot هیچ‌وقت حذف نمی‌شود.
+    """
+    update_type = update_data.get("type")
+    message = None
+    if update_type == "RemovedMessage":
+        message_id = update_data.get("removed_message_id")
+    else:
+        fields = MESSAGE_ID_FIELDS.get(update_type)
+        message = update_data.get(fields[0]) if fields else None
+        message_id = message.get(fields[1]) if message else None
+    if message_id is None or message_id == "":
+        return None
+    
+    key = f"{update_type}:{update_data.get('chat_id') or ''}:{message_id}"
+    if update_type == "UpdatedMessage":
+        text = (message.get("text") or "").encode("utf-8")
+        digest = hashlib.blake2b(text, digest_size=8).hexdigest()
+        key = f"{key}:{message.get('time') or ''}:{digest}"
+    return key
+
+class DedupWindow:
+    """
+    پایه‌ی لایه‌های حذف آپدیت تکراری
+    
+    seen کلید را اتمیک بررسی و ثبت می‌کند و اگر کلید قبلا دیده شده باشد True
+    برمی‌گرداند. duplicates تعداد آپدیت‌های حذف‌شده است.
+    
+    کلید قبل از اجرای هندلرها ثبت می‌شود تا دو پولر هم‌زمان یک آپدیت را دو
+    بار پردازش نکنند؛ در نتیجه تحویل برای کلیدهای حذف‌شونده «حداکثر یک
+    بار» است، نه «دست‌کم یک بار».
+    """
+    
+    duplicates = 0
+    
+    def seen(self, key: str) -> bool:
+        raise NotImplementedError
+    
+    def is_duplicate(self, update_data: Dict[str, Any]) -> bool:
+        key = dedup_key(update_data)
+        if key is None or not self.seen(key):
+            return False
+        self.duplicates += 1
+        return True
+    
+    def close(self):
+        pass
+
+class RecentUpdates(DedupWindow):
+    """
+    آخرین size کلید دیده‌شده (بافر حلقوی) و در صورت داشتن ttl فقط کلیدهای
+    ttl ثانیه‌ی اخیر؛ حافظه به size محدود است و خطای مثبت ندارد
+    """
+    
+    def __init__(self, size: int = 100000, ttl: Optional[float] = None):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        self.ttl = ttl
+        self._keys: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def seen(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            keys = self._keys
+            if self.ttl is not None:
+                limit = now - self.ttl
+                while keys and next(iter(keys.values())) <= limit:
+                    keys.popitem(last=False)
+            
+            if key in keys:
+                return True
+            keys[key] = now
+            if len(keys) > self.size:
+                keys.popitem(last=False)
+            return False
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+
+class BloomDedup(DedupWindow):
+    """
+    دو Bloom filter چرخشی با capacity کلید در هر کدام
+    
+    وقتی فیلتر فعلی پر شود فیلتر قبلی دور ریخته می‌شود، پس دست‌کم capacity
+    کلید آخر به خاطر سپرده می‌شوند و حافظه ثابت است. با احتمال حدود
+    error_rate یک آپدیت جدید به اشتباه تکراری تشخیص داده و حذف می‌شود.
+    """
+    
+    def __init__(self, capacity: int = 1000000, error_rate: float = 1e-6):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # خطای دو فیلتر با هم جمع می‌شود
+        bits = -capacity * math.log(error_rate / 2) / (math.log(2) ** 2)
+        self.bits = max(8, int(math.ceil(bits)))
+        self.hashes = max(1, int(round(self.bits / capacity * math.log(2))))
+        self._current = bytearray((self.bits + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + index * second) % self.bits for index in range(self.hashes)]
+    
+    @staticmethod
+    def _contains(bitset: bytearray, positions) -> bool:
+        for position in positions:
+            if not bitset[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+    
+    def seen(self, key: str) -> bool:
+        positions = self._positions(key)
+        with self._lock:
+            if self._contains(self._current, positions) or self._contains(self._previous, positions):
+                return True
+            
+            if self._count >= self.capacity:
+                self._previous = self._current
+                self._current = bytearray(len(self._previous))
+                self._count = 0
+            current = self._current
+            for position in positions:
+                current[position >> 3] |= 1 << (position & 7)
+            self._count += 1
+            return False
+
+class SQLiteDedup(DedupWindow):
+    """
+    کلیدهای مشترک در یک فایل SQLite برای چند پروسه روی یک سرور (مثلا
+    پولرهای هم‌پوشان هنگام deploy)؛ کلیدهای قدیمی‌تر از ttl پاک می‌شوند
+    
+    کلید قبل از اجرای هندلرها ثبت می‌شود و بعد از ری‌استارت هم باقی است: اگر
+    پروسه بعد از ثبت کلید و قبل از ذخیره‌ی offset (OffsetStore) از کار بیفتد،
+    آپدیتی که دوباره تحویل داده می‌شود تکراری حساب و حذف می‌شود. اگر از دست
+    رفتن آپدیت قابل قبول نیست از RecentUpdates (که با ری‌استارت خالی می‌شود)
+    استفاده کنید.
+    """
+    
+    def __init__(self, path: str, ttl: float = 24 * 3600, purge_every: int = 1000):
+        self.path = path
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._inserts = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS seen_updates (key TEXT PRIMARY KEY, seen REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS seen_updates_seen ON seen_updates (seen)")
+    
+    def seen(self, key: str) -> bool:
+        now = time.time()
+        with self._lock:
+            self._inserts += 1
+            if self._inserts >= self.purge_every:
+                self._inserts = 0
+                self._db.execute("DELETE FROM seen_updates WHERE seen <= ?", (now - self.ttl,))
+            
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO seen_updates (key, seen) VALUES (?, ?)", (key, now)
+            )
+            if cursor.rowcount:
+                return False
+            # کلید منقضی‌شده‌ای که هنوز پاک نشده تکراری حساب نمی‌شود
+            cursor = self._db.execute(
+                "UPDATE seen_updates SET seen = ? WHERE key = ? AND seen <= ?", (now, key, now - self.ttl)
+            )
+            return not cursor.rowcount
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class RedisDedup(DedupWindow):
+    """
+    کلیدهای مشترک بین چند سرور در Redis با SET NX و انقضای ttl
+    
+    client یک کلاینت redis-py (یا هر آبجکت با متد set سازگار) است که
+    کاربر خودش می‌سازد؛ این کتابخانه به redis وابسته نیست.
+    
+    مثل SQLiteDedup کلید قبل از اجرای هندلرها ثبت می‌شود، پس آپدیتی که
+    پردازشش با از کار افتادن پروسه نیمه‌کاره مانده تا ttl دوباره اجرا نمی‌شود.
+    """
+    
+    def __init__(self, client: Any, prefix: str = "ruplika:dedup:", ttl: float = 24 * 3600):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+    
+    def seen(self, key: str) -> bool:
+        added = self.client.set(self.prefix + key, 1, nx=True, px=int(self.ttl * 1000))
+        return not added
@@ -0,0 +1,255 @@
+import asyncio
+import inspect
+import queue
+import threading
+import zlib
+from typing import Any, Callable, List, Optional
+
+_STOP = object()
+# نشانه‌ای که after_pending در همه‌ی شاردها قرار می‌دهد
+_MARK = object()
+
+def shard_for(key: Any, shards: int) -> int:
+    """محاسبه‌ی شماره‌ی شارد پایدار برای یک کلید (مثلا chat_id)"""
+    if key is None:
+        return 0
+    return zlib.crc32(str(key).encode("utf-8")) % shards
+
+class Dispatcher:
+    """
+    اجرای هندلرها روی استخر ترد محدود با حفظ ترتیب برای هر chat_id
+    
+    کارهای یک کلید همیشه به یک ترد می‌روند، پس ترتیب آپدیت‌های هر چت حفظ
+    می‌شود و چت‌های مختلف موازی اجرا می‌شوند. وقتی تعداد کارهای در صف به
+    queue_size برسد submit بلاک می‌شود و به این ترتیب پولینگ متوقف می‌ماند.
+    """
+    
+    def __init__(self, workers: int = 8, queue_size: int = 1000,
+                 on_error: Optional[Callable[[Exception], Any]] = None):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        
+        self.workers = workers
+        self.queue_size = queue_size
+        self.on_error = on_error
+        self._queues: List[queue.Queue] = []
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._threads: List[threading.Thread] = []
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+    
+    @property
+    def pending(self) -> int:
+        """تعداد کارهای در صف یا در حال اجرا"""
+        return self._pending
+    
+    @property
+    def running(self) -> bool:
+        return bool(self._threads)
+    
+    def start(self):
+        """راه‌اندازی تردهای کارگر"""
+        if self._threads:
+            return
+        # صف‌های تازه تا _STOP یا کارهای باقی‌مانده از اجرای قبلی به تردهای جدید نرسند
+        self._queues = [queue.Queue() for _ in range(self.workers)]
+        for index, tasks in enumerate(self._queues):
+            thread = threading.Thread(
+                target=self._worker, args=(tasks,),
+                name=f"ruplika-dispatch-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+    
+    def submit(self, key: Any, func: Callable, *args, timeout: Optional[float] = None) -> bool:
+        """
+        افزودن کار به شارد مربوط به key
+        
+        اگر صف پر باشد تا آزاد شدن جا (یا پایان timeout) صبر می‌کند و در صورت
+        پایان timeout مقدار False برمی‌گرداند.
+        """
+        if not self._threads:
+            self.start()
+        
+        if not self._slots.acquire(timeout=timeout):
+            return False
+        
+        with self._lock:
+            self._pending += 1
+        self._queues[shard_for(key, self.workers)].put((func, args))
+        return True
+    
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """انتظار تا خالی شدن صف‌ها"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+    
+    def after_pending(self, callback: Callable[[], Any]):
+        """
+        صدا زدن callback (در یکی از تردهای کارگر) پس از پایان همه‌ی کارهایی که
+        تا این لحظه ثبت شده‌اند، بدون بلاک کردن فراخواننده
+        
+        یک نشانه در انتهای هر شارد قرار می‌گیرد و callback وقتی اجرا می‌شود که
+        همه‌ی شاردها به نشانه‌ی خود رسیده باشند. نشانه‌ها جای صف را نمی‌گیرند.
+        """
+        if not self._threads:
+            callback()
+            return
+        remaining = [len(self._queues)]
+        
+        def arrive():
+            with self._lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                callback()
+        
+        with self._lock:
+            self._pending += len(self._queues)
+        for tasks in self._queues:
+            tasks.put((_MARK, arrive))
+    
+    def stop(self, drain: bool = True, timeout: Optional[float] = None):
+        """توقف تردها؛ با drain=True ابتدا کارهای باقی‌مانده اجرا می‌شوند"""
+        if drain:
+            self.join(timeout)
+        for thread, tasks in zip(self._threads, self._queues):
+            if thread.is_alive():
+                tasks.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+    
+    def _worker(self, tasks: "queue.Queue"):
+        while True:
+            item = tasks.get()
+            if item is _STOP:
+                return
+            
+            func, args = item
+            try:
+                if func is _MARK:
+                    args()
+                else:
+                    func(*args)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+            finally:
+                if func is not _MARK:
+                    self._slots.release()
+                with self._idle:
+                    self._pending -= 1
+                    if self._pending == 0:
+                        self._idle.notify_all()
+
+class AsyncDispatcher:
+    """
+    نسخه‌ی asyncio از Dispatcher که هر شارد را با یک task اجرا می‌کند
+    """
+    
+    def __init__(self, workers: int = 8, queue_size: int = 1000,
+                 on_error: Optional[Callable[[Exception], Any]] = None):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        
+        self.workers = workers
+        self.queue_size = queue_size
+        self.on_error = on_error
+        self._queues: List[asyncio.Queue] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pending = 0
+        self._idle: Optional[asyncio.Event] = None
+    
+    @property
+    def pending(self) -> int:
+        """تعداد کارهای در صف یا در حال اجرا"""
+        return self._pending
+    
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+    
+    def start(self):
+        """راه‌اندازی taskهای کارگر در event loop جاری"""
+        if self._tasks:
+            return
+        self._queues = [asyncio.Queue() for _ in range(self.workers)]
+        self._slots = asyncio.Semaphore(self.queue_size)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks = [asyncio.ensure_future(self._worker(tasks)) for tasks in self._queues]
+    
+    async def submit(self, key: Any, func: Callable, *args):
+        """افزودن کار به شارد مربوط به key؛ در صورت پر بودن صف منتظر می‌ماند"""
+        if not self._tasks:
+            self.start()
+        
+        await self._slots.acquire()
+        self._pending += 1
+        self._idle.clear()
+        self._queues[shard_for(key, self.workers)].put_nowait((func, args))
+    
+    async def join(self):
+        """انتظار تا خالی شدن صف‌ها"""
+        if self._idle is not None:
+            await self._idle.wait()
+    
+    def after_pending(self, callback: Callable[[], Any]):
+        """مانند Dispatcher.after_pending؛ callback در event loop صدا زده می‌شود"""
+        if not self._tasks:
+            callback()
+            return
+        remaining = [len(self._queues)]
+        
+        def arrive():
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                callback()
+        
+        self._pending += len(self._queues)
+        self._idle.clear()
+        for tasks in self._queues:
+            tasks.put_nowait((_MARK, arrive))
+    
+    async def stop(self, drain: bool = True):
+        """توقف taskها؛ با drain=True ابتدا کارهای باقی‌مانده اجرا می‌شوند"""
+        if drain:
+            await self.join()
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # کارهای اجرانشده‌ی صف‌های قدیمی (drain=False) با start بعدی دور ریخته می‌شوند
+        self._pending = 0
+        if self._idle is not None:
+            self._idle.set()
+    
+    async def _worker(self, tasks: "asyncio.Queue"):
+        while True:
+            func, args = await tasks.get()
+            try:
+                if func is _MARK:
+                    args()
+                    continue
+                result = func(*args)
+                if inspect.isawaitable(result):
+                    await result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+            finally:
+                if func is not _MARK:
+                    self._slots.release()
+                self._pending -= 1
+                if self._pending == 0:
+                    self._idle.set()
@@ -24,4 +24,15 @@ class ValidationException(RubikaException):
 
 class FileUploadException(RubikaException):
     """خطای آپلود فایل"""
-    pass
\ No newline at end of file
+    pass
+
+class ConnectException(NetworkException):
+    """خطای برقراری اتصال؛ درخواست به سرور نرسیده است"""
+    pass
+
+class RateLimitException(APIException):
+    """خطای محدودیت نرخ (HTTP 429)"""
+    
+    def __init__(self, message: str, status_code: int = 429, response: dict = None, retry_after: float = None):
+        super().__init__(message, status_code=status_code, response=response)
+        self.retry_after = retry_after
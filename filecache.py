@@ -0,0 +1,140 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+from .enums import FileTypeEnum
+from .upload import DEFAULT_CHUNK_SIZE, is_path
+
+def content_hash(source: Any, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[str]:
+    """
+    sha256 محتوای منبع آپلود یا None اگر بدون مصرف منبع قابل محاسبه نباشد
+    
+    آبجکت‌های فایل‌مانند از موقعیت فعلی خوانده و دوباره به همان موقعیت
+    برگردانده می‌شوند؛ iteratorها hash نمی‌شوند.
+    """
+    digest = hashlib.sha256()
+    if is_path(source):
+        with open(source, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+        return digest.hexdigest()
+    
+    if hasattr(source, "read") and hasattr(source, "seek"):
+        try:
+            position = source.tell()
+            for chunk in iter(lambda: source.read(chunk_size), b""):
+                digest.update(chunk)
+            source.seek(position)
+        except (AttributeError, OSError, ValueError):
+            return None
+        return digest.hexdigest()
+    
+    return None
+
+class FileIdCache:
+    """
+    نگاشت پایدار hash محتوا به file_id برای جلوگیری از آپلود دوباره
+    
+    با path داده‌ها در یک فایل SQLite نگه‌داری می‌شوند و بعد از اجرای دوباره
+    هم معتبرند؛ بدون آن فقط در حافظه هستند. چون file_idها ممکن است در سرور
+    منقضی شوند، ورودی‌ها بعد از ttl ثانیه از زمان آپلود کنار گذاشته می‌شوند و
+    با رسیدن به max_entries کم‌استفاده‌ترین ورودی‌ها حذف می‌شوند.
+    """
+    
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = 7 * 24 * 3600,
+                 max_entries: int = 10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS file_ids ("
+            "key TEXT PRIMARY KEY, file_id TEXT NOT NULL, created REAL NOT NULL, used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS file_ids_used ON file_ids (used)")
+        self._evict()
+    
+    @staticmethod
+    def _key(digest: str, file_type: FileTypeEnum) -> str:
+        # یک محتوا با نوع‌های مختلف file_id متفاوت می‌گیرد
+        return f"{file_type.value}:{digest}"
+    
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and created + self.ttl <= now
+    
+    def get(self, digest: str, file_type: FileTypeEnum) -> Optional[str]:
+        key = self._key(digest, file_type)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT file_id, created FROM file_ids WHERE key = ?", (key,)).fetchone()
+            if row is not None and self._expired(row[1], now):
+                self._db.execute("DELETE FROM file_ids WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE file_ids SET used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+    
+    def put(self, digest: str, file_type: FileTypeEnum, file_id: str):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO file_ids (key, file_id, created, used) VALUES (?, ?, ?, ?)",
+                (self._key(digest, file_type), file_id, now, now)
+            )
+            self._evict()
+    
+    def _evict(self):
+        count = self._db.execute("SELECT COUNT(*) FROM file_ids").fetchone()[0]
+        if count > self.max_entries:
+            self._db.execute(
+                "DELETE FROM file_ids WHERE key IN (SELECT key FROM file_ids ORDER BY used LIMIT ?)",
+                (count - self.max_entries,)
+            )
+    
+    def discard(self, digest: str, file_type: FileTypeEnum):
+        with self._lock:
+            self._db.execute("DELETE FROM file_ids WHERE key = ?", (self._key(digest, file_type),))
+    
+    def discard_file_id(self, file_id: str):
+        """حذف file_id که سرور دیگر آن را نمی‌پذیرد"""
+        with self._lock:
+            self._db.execute("DELETE FROM file_ids WHERE file_id = ?", (file_id,))
+    
+    def purge_expired(self) -> int:
+        """حذف همه‌ی ورودی‌های منقضی و برگرداندن تعداد آن‌ها"""
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM file_ids WHERE created <= ?", (time.time() - self.ttl,))
+            return cursor.rowcount
+    
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM file_ids")
+            self.hits = 0
+            self.misses = 0
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM file_ids").fetchone()[0]
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,173 @@
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Tuple, Union
+from .enums import ChatTypeEnum, MessageSenderEnum
+
+# نوع چت از پیشوند chat_id مشخص می‌شود (در آپدیت‌ها ارسال نمی‌شود)
+CHAT_ID_PREFIXES = {
+    "b0": ChatTypeEnum.USER,
+    "g0": ChatTypeEnum.GROUP,
+    "c0": ChatTypeEnum.CHANNEL,
+}
+
+# نوع محتوا و کلید آن در داده‌ی خام پیام
+CONTENT_KEYS = {
+    "text": "text",
+    "file": "file",
+    "location": "location",
+    "contact": "contact_message",
+    "poll": "poll",
+    "sticker": "sticker",
+    "forwarded": "forwarded_from",
+    "button": "aux_data",
+}
+
+def chat_type_of(chat_id: Optional[str]) -> Optional[ChatTypeEnum]:
+    if not chat_id:
+        return None
+    return CHAT_ID_PREFIXES.get(chat_id[:2])
+
+def _values(value: Any, enum=None) -> Optional[set]:
+    """نرمال‌سازی یک مقدار یا iterable به مجموعه؛ None یعنی بدون محدودیت"""
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)) or (enum is not None and isinstance(value, enum)):
+        value = [value]
+    if enum is None:
+        return set(value)
+    return {item if isinstance(item, enum) else enum(item) for item in value}
+
+class _Dimension:
+    """جدول value → bitmask هندلرهایی که آن مقدار را می‌پذیرند"""
+    
+    def __init__(self):
+        self.values: Dict[Any, int] = {}
+        self.any = 0
+    
+    def add(self, bit: int, values: Optional[set]):
+        if values is None:
+            self.any |= bit
+            return
+        for value in values:
+            self.values[value] = self.values.get(value, 0) | bit
+    
+    def mask(self, value: Any) -> int:
+        return self.any | self.values.get(value, 0)
+
+class FilterIndex:
+    """
+    هندلرهای پیام با فیلترهای اعلانی که در زمان ثبت در جدول‌ها ایندکس می‌شوند
+    
+    هر هندلر یک بیت دارد و هر فیلتر ارزان (chat_id، نوع چت، نوع فرستنده و
+    نوع محتوا) یک جدول value → bitmask است؛ برای هر پیام فقط چند lookup و AND
+    انجام می‌شود و هزینه با تعداد هندلرها رشد نمی‌کند. هر regex متنی یک بار
+    برای هر پیام اجرا می‌شود (هر چند هندلر که آن را داشته باشند) و predicate
+    دلخواه فقط برای هندلرهایی که از فیلترهای دیگر رد شده‌اند صدا زده می‌شود.
+    ترتیب اجرای هندلرها همان ترتیب ثبت است.
+    """
+    
+    # سقف تعداد لیست‌های هندلر کش‌شده برای maskهای مختلف
+    MAX_CACHED_MASKS = 4096
+    
+    def __init__(self):
+        self._handlers: List[Callable] = []
+        self._all = 0
+        self._chat_ids = _Dimension()
+        self._chat_types = _Dimension()
+        self._sender_types = _Dimension()
+        self._content_any = 0
+        self._content: Dict[str, int] = {}
+        self._patterns: Dict[Tuple[str, int], Tuple[Pattern, int]] = {}
+        self._pattern_mask = 0
+        self._predicates: List[Tuple[int, Callable[[Any], bool]]] = []
+        self._predicate_mask = 0
+        self._lists: Dict[int, List[Callable]] = {}
+    
+    def add(
+        self,
+        handler: Callable,
+        chat_ids: Optional[Iterable[str]] = None,
+        chat_types: Optional[Union[ChatTypeEnum, str, Iterable]] = None,
+        sender_types: Optional[Union[MessageSenderEnum, str, Iterable]] = None,
+        content: Optional[Union[str, Iterable[str]]] = None,
+        text: Optional[Union[str, Pattern]] = None,
+        predicate: Optional[Callable[[Any], bool]] = None
+    ):
+        content = _values(content)
+        if content is not None and not content <= CONTENT_KEYS.keys():
+            raise ValueError(f"content must be among {', '.join(CONTENT_KEYS)}")
+        
+        bit = 1 << len(self._handlers)
+        self._handlers.append(handler)
+        self._all |= bit
+        self._chat_ids.add(bit, _values(chat_ids))
+        self._chat_types.add(bit, _values(chat_types, ChatTypeEnum))
+        self._sender_types.add(bit, _values(sender_types, MessageSenderEnum))
+        
+        if content is None:
+            self._content_any |= bit
+        else:
+            for kind in content:
+                self._content[kind] = self._content.get(kind, 0) | bit
+        
+        if text is not None:
+            pattern = re.compile(text) if isinstance(text, str) else text
+            key = (pattern.pattern, pattern.flags)
+            compiled, mask = self._patterns.get(key, (pattern, 0))
+            self._patterns[key] = (compiled, mask | bit)
+            self._pattern_mask |= bit
+        
+        if predicate is not None:
+            self._predicates.append((bit, predicate))
+            self._predicate_mask |= bit
+        
+        self._lists.clear()
+    
+    def _content_mask(self, message_data: Dict[str, Any]) -> int:
+        mask = self._content_any
+        for kind, bits in self._content.items():
+            if message_data.get(CONTENT_KEYS[kind]):
+                mask |= bits
+        return mask
+    
+    def _handlers_for(self, mask: int) -> List[Callable]:
+        handlers = self._lists.get(mask)
+        if handlers is None:
+            handlers = [handler for index, handler in enumerate(self._handlers) if mask >> index & 1]
+            if len(self._lists) >= self.MAX_CACHED_MASKS:
+                self._lists.clear()
+            self._lists[mask] = handlers
+        return handlers
+    
+    def match(self, chat_id: Optional[str], message_data: Dict[str, Any], message: Any = None) -> List[Callable]:
+        """هندلرهایی که فیلترهایشان با پیام جور است (message فقط برای predicateها)"""
+        mask = self._all
+        if not mask:
+            return []
+        
+        sender_type = message_data.get("sender_type", "User")
+        try:
+            sender_type = MessageSenderEnum(sender_type)
+        except ValueError:
+            pass
+        
+        mask &= self._chat_ids.mask(chat_id)
+        mask &= self._chat_types.mask(chat_type_of(chat_id))
+        mask &= self._sender_types.mask(sender_type)
+        if mask & ~self._content_any:
+            mask &= self._content_mask(message_data)
+        
+        if mask & self._pattern_mask:
+            text = message_data.get("text") or ""
+            for pattern, bits in self._patterns.values():
+                if mask & bits and pattern.search(text) is None:
+                    mask &= ~bits
+        
+        if mask & self._predicate_mask:
+            for bit, predicate in self._predicates:
+                if mask & bit and not predicate(message):
+                    mask &= ~bit
+        
+        return list(self._handlers_for(mask))
+    
+    def __len__(self) -> int:
+        return len(self._handlers)
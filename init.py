@@ -5,6 +5,27 @@ Version: 3.1.2
 
 from .bot import Bot
 from .client import Client
+from .async_client import AsyncClient
+from .async_bot import AsyncBot
+from .dispatcher import Dispatcher, AsyncDispatcher
+from .ratelimit import RateLimiter, TokenBucket
+from .retry import RetryPolicy, RetryBudget
+from .broadcast import BroadcastCheckpoint, BroadcastResult
+from .keypad import CompiledKeypad
+from .upload import MultipartEncoder
+from .filecache import FileIdCache
+from .cache import ResponseCache
+from .webhook import WebhookServer
+from .codec import JSONCodec, OrjsonCodec, UjsonCodec, get_default_codec
+from .parsing import LazyMessage
+from .router import CommandMatch, ButtonMatch
+from .offsets import OffsetStore, MemoryOffsetStore, FileOffsetStore, SQLiteOffsetStore
+from .dedup import DedupWindow, RecentUpdates, BloomDedup, SQLiteDedup, RedisDedup
+from .outbox import Outbox, OutboxSender, AsyncOutboxSender
+from .recorder import UpdateRecorder, UpdateReplayer, RecordedUpdate, read_updates
+from .metrics import Metrics, MetricsRegistry, Counter, Gauge, Histogram, start_metrics_server
+from .tracing import Tracer, Span, UpdateTrace, SlowestUpdates
+from .middleware import MiddlewareChain
 from .models import *
 from .enums import *
 from .exceptions import *
@@ -17,8 +38,59 @@ __email__ = "support@ruplika.com"
 __all__ = [
     "Bot",
     "Client",
+    "AsyncBot",
+    "AsyncClient",
+    "Dispatcher",
+    "AsyncDispatcher",
+    "RateLimiter",
+    "TokenBucket",
+    "RetryPolicy",
+    "RetryBudget",
+    "BroadcastCheckpoint",
+    "BroadcastResult",
+    "CompiledKeypad",
+    "MultipartEncoder",
+    "FileIdCache",
+    "ResponseCache",
+    "WebhookServer",
+    "JSONCodec",
+    "OrjsonCodec",
+    "UjsonCodec",
+    "get_default_codec",
+    "LazyMessage",
+    "CommandMatch",
+    "ButtonMatch",
+    "OffsetStore",
+    "MemoryOffsetStore",
+    "FileOffsetStore",
+    "SQLiteOffsetStore",
+    "DedupWindow",
+    "RecentUpdates",
+    "BloomDedup",
+    "SQLiteDedup",
+    "RedisDedup",
+    "Outbox",
+    "OutboxSender",
+    "AsyncOutboxSender",
+    "UpdateRecorder",
+    "UpdateReplayer",
+    "RecordedUpdate",
+    "read_updates",
+    "Metrics",
+    "MetricsRegistry",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "start_metrics_server",
+    "Tracer",
+    "Span",
+    "UpdateTrace",
+    "SlowestUpdates",
+    "MiddlewareChain",
     "RubikaException",
     "APIException",
     "NetworkException",
     "AuthenticationException",
+    "ConnectException",
+    "RateLimitException",
 ]
\ No newline at end of file
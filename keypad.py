@@ -0,0 +1,157 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from .models import *
+
+class CompiledKeypad:
+    """
+    کیپد سریال‌شده‌ی تغییرناپذیر
+    
+    payload یک کپی مستقل از ساختار کیپد است و تغییرات بعدی روی Keypad اصلی
+    روی آن اثری ندارد (payload را تغییر ندهید، بین ارسال‌ها مشترک است).
+    json_bytes همان payload به صورت JSON کدشده است که یک بار ساخته می‌شود.
+    این آبجکت را می‌توان مستقیما به جای Keypad به متدهای ارسال داد.
+    """
+    
+    __slots__ = ("_payload", "_json_bytes", "_key")
+    
+    def __init__(self, payload: Dict[str, Any], key: Optional[Hashable] = None):
+        # payload باید یک ساختار مستقل باشد؛ compile_keypad این را تضمین می‌کند
+        object.__setattr__(self, "_payload", payload)
+        object.__setattr__(self, "_json_bytes", None)
+        object.__setattr__(self, "_key", key)
+    
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "CompiledKeypad":
+        """ساخت از دیکشنری دلخواه با کپی عمیق آن"""
+        encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        compiled = cls(json.loads(encoded))
+        object.__setattr__(compiled, "_json_bytes", encoded)
+        return compiled
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledKeypad is immutable")
+    
+    @property
+    def payload(self) -> Dict[str, Any]:
+        return self._payload
+    
+    @property
+    def json_bytes(self) -> bytes:
+        if self._json_bytes is None:
+            encoded = json.dumps(self._payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            object.__setattr__(self, "_json_bytes", encoded)
+        return self._json_bytes
+    
+    @property
+    def key(self) -> Optional[Hashable]:
+        return self._key
+    
+    def __eq__(self, other):
+        return isinstance(other, CompiledKeypad) and other.json_bytes == self.json_bytes
+    
+    def __hash__(self):
+        return hash(self.json_bytes)
+    
+    def __repr__(self):
+        return f"CompiledKeypad({self.json_bytes.decode('utf-8')})"
+
+def _location_key(location: Optional[Location]) -> Optional[Tuple]:
+    if location is None:
+        return None
+    return (location.longitude, location.latitude)
+
+def _button_key(button: Button) -> Tuple:
+    selection = button.button_selection
+    calendar = button.button_calendar
+    number_picker = button.button_number_picker
+    string_picker = button.button_string_picker
+    location = button.button_location
+    textbox = button.button_textbox
+    
+    return (
+        button.id,
+        button.type,
+        button.button_text,
+        None if selection is None else (
+            selection.selection_id, selection.search_type, selection.get_type,
+            tuple((item.text, item.image_url, item.type) for item in selection.items),
+            selection.is_multi_selection, selection.columns_count, selection.title
+        ),
+        None if calendar is None else (
+            calendar.default_value, calendar.type, calendar.min_year, calendar.max_year, calendar.title
+        ),
+        None if number_picker is None else (
+            number_picker.min_value, number_picker.max_value, number_picker.default_value, number_picker.title
+        ),
+        None if string_picker is None else (
+            tuple(string_picker.items), string_picker.default_value, string_picker.title
+        ),
+        None if location is None else (
+            _location_key(location.default_pointer_location), _location_key(location.default_map_location),
+            location.type, location.title, location.location_image_url
+        ),
+        None if textbox is None else (
+            textbox.type_line, textbox.type_keypad, textbox.place_holder, textbox.title, textbox.default_value
+        ),
+    )
+
+def keypad_key(keypad: Keypad) -> Tuple:
+    """
+    کلید محتوایی کیپد؛ دو کیپد با محتوای یکسان کلید یکسان دارند
+    
+    کلید روی خود کیپد نگه‌داری می‌شود تا ارسال دوباره‌ی همان کیپد درخت
+    دکمه‌ها را پیمایش نکند. هر انتساب به فیلد یکی از مدل‌های کیپد آن را
+    نامعتبر می‌کند؛ تغییر درجای لیست‌ها (مثل rows.append) دیده نمی‌شود و بعد
+    از آن باید لیست را دوباره انتساب داد (keypad.rows = keypad.rows).
+    """
+    generation = KeypadPart.generation
+    cached = keypad.__dict__.get("_content_key")
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+    
+    key = (
+        keypad.resize_keyboard,
+        keypad.on_time_keyboard,
+        tuple(tuple(_button_key(button) for button in row.buttons) for row in keypad.rows),
+    )
+    # object.__setattr__ تا ذخیره‌ی کلید generation را زیاد نکند
+    object.__setattr__(keypad, "_content_key", (generation, key))
+    return key
+
+class KeypadCache:
+    """کش LRU کیپدهای کامپایل‌شده بر اساس کلید محتوایی"""
+    
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, CompiledKeypad]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[CompiledKeypad]:
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return compiled
+    
+    def put(self, key: Hashable, compiled: CompiledKeypad):
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,378 @@
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from .tracing import handler_name
+
+# مرزهای پیش‌فرض هیستوگرام زمان (ثانیه)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PAGE_SIZE_BUCKETS = (0, 1, 5, 10, 25, 50, 100)
+LAG_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class _Cells:
+    """
+    مقدار تکه‌شده بین تردها: هر ترد فقط خانه‌ی خودش را تغییر می‌دهد و
+    خواندن مجموع همه‌ی خانه‌هاست، پس مسیر داغ به قفل نیاز ندارد
+    
+    خانه‌ی تردهای تمام‌شده (مثلا استخرهای ترد upload_files و broadcast) در
+    مقدار پایه جمع و حذف می‌شود تا تعداد خانه‌ها با عمر پروسه رشد نکند.
+    """
+    
+    __slots__ = ("_local", "_cells", "_size", "_base", "_lock")
+    
+    def __init__(self, size: int):
+        self._local = threading.local()
+        self._cells: List[Tuple["weakref.ref[threading.Thread]", list]] = []
+        self._size = size
+        self._base = [0] * size
+        self._lock = threading.Lock()
+    
+    def cell(self) -> list:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = [0] * self._size
+            with self._lock:
+                self._prune()
+                self._cells.append((weakref.ref(threading.current_thread()), cell))
+            return cell
+    
+    def _prune(self):
+        """جمع کردن خانه‌ی تردهای تمام‌شده در مقدار پایه (با قفل)"""
+        alive = []
+        base = self._base
+        for owner, cell in self._cells:
+            thread = owner()
+            if thread is None or not thread.is_alive():
+                for index, value in enumerate(cell):
+                    base[index] += value
+            else:
+                alive.append((owner, cell))
+        self._cells = alive
+    
+    def totals(self) -> List[float]:
+        with self._lock:
+            self._prune()
+            totals = list(self._base)
+            cells = [cell for _, cell in self._cells]
+        for cell in cells:
+            for index, value in enumerate(cell):
+                totals[index] += value
+        return totals
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+class _Metric:
+    kind = ""
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def labels(self, *values: str):
+        """زیرمتریک یک ترکیب برچسب (ساخته‌شده یک بار و کش‌شده)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+    
+    def _samples(self) -> Iterable[Tuple[str, Sequence[str], Sequence[str], float]]:
+        raise NotImplementedError
+    
+    def exposition(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, names, values, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return lines
+
+class _CounterChild:
+    __slots__ = ("_cells",)
+    
+    def __init__(self):
+        self._cells = _Cells(1)
+    
+    def inc(self, amount: float = 1):
+        self._cells.cell()[0] += amount
+    
+    @property
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+class Counter(_Metric):
+    """شمارنده‌ی افزایشی"""
+    
+    kind = "counter"
+    
+    def _new_child(self):
+        return _CounterChild()
+    
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+    
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield "", self.labelnames, values, child.value
+
+class _GaugeChild:
+    __slots__ = ("_value", "_function", "_lock")
+    
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+    
+    def set(self, value: float):
+        self._value = value
+    
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+    
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+    
+    def set_function(self, function: Callable[[], float]):
+        """محاسبه‌ی مقدار در زمان خواندن (مثلا طول صف) به جای به‌روزرسانی در مسیر داغ"""
+        self._function = function
+    
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            try:
+                return self._function()
+            except Exception:
+                return float("nan")
+        return self._value
+
+class Gauge(_Metric):
+    """مقدار لحظه‌ای"""
+    
+    kind = "gauge"
+    
+    def _new_child(self):
+        return _GaugeChild()
+    
+    def set(self, value: float):
+        self.labels().set(value)
+    
+    def set_function(self, function: Callable[[], float]):
+        self.labels().set_function(function)
+    
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield "", self.labelnames, values, child.value
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_cells")
+    
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        # یک خانه برای هر مرز، یکی برای +Inf و آخری برای مجموع
+        self._cells = _Cells(len(bounds) + 2)
+    
+    def observe(self, value: float):
+        cell = self._cells.cell()
+        cell[bisect_left(self._bounds, value)] += 1
+        cell[-1] += value
+    
+    def totals(self) -> List[float]:
+        return self._cells.totals()
+
+class Histogram(_Metric):
+    """هیستوگرام با مرزهای ثابت؛ هر observe یک جستجوی دودویی و دو جمع است"""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+    
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+    
+    def observe(self, value: float):
+        self.labels().observe(value)
+    
+    def _samples(self):
+        names = self.labelnames + ("le",)
+        for values, child in list(self._children.items()):
+            totals = child.totals()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), totals):
+                cumulative += count
+                yield "_bucket", names, values + (_format_value(bound),), cumulative
+            yield "_sum", self.labelnames, values, totals[-1]
+            yield "_count", self.labelnames, values, cumulative
+
+class MetricsRegistry:
+    """مجموعه‌ی متریک‌های یک پروسه و خروجی متنی Prometheus آن‌ها"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _get(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} is already registered as a {metric.kind}")
+            return metric
+    
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+    
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+    
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets)
+    
+    def exposition(self) -> str:
+        """همه‌ی متریک‌ها در قالب متنی Prometheus (نسخه‌ی 0.0.4)"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.exposition())
+        return "\n".join(lines) + "\n"
+
+class Metrics:
+    """
+    متریک‌های کلاینت و بات روی یک MetricsRegistry
+    
+    - ruplika_api_requests_total و ruplika_api_request_duration_seconds:
+      هر تلاش درخواست API بر اساس متد و نتیجه (ok یا نام کلاس خطا)
+    - ruplika_updates_total: آپدیت‌های پردازش‌شده بر اساس نوع
+    - ruplika_handler_duration_seconds و ruplika_handler_errors_total: زمان
+      اجرا و خطاهای هر هندلر
+    - ruplika_polling_page_size و ruplika_update_lag_seconds: اندازه‌ی
+      صفحه‌های getUpdates و فاصله‌ی زمان پیام تا دریافت آن
+    - ruplika_queue_depth: طول صف‌ها (dispatcher، outbox، وب‌هوک) که در
+      زمان خواندن محاسبه می‌شود
+    
+    یک Metrics را می‌توان بین چند کلاینت و بات مشترک کرد.
+    """
+    
+    def __init__(self, registry: Optional[MetricsRegistry] = None, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.registry = registry if registry is not None else MetricsRegistry()
+        registry = self.registry
+        self.requests = registry.counter(
+            "ruplika_api_requests_total", "API request attempts by method and result", ("method", "result")
+        )
+        self.request_seconds = registry.histogram(
+            "ruplika_api_request_duration_seconds", "API request latency", ("method",), buckets
+        )
+        self.updates = registry.counter("ruplika_updates_total", "Processed updates by type", ("type",))
+        self.handler_seconds = registry.histogram(
+            "ruplika_handler_duration_seconds", "Handler execution time", ("handler",), buckets
+        )
+        self.handler_errors = registry.counter(
+            "ruplika_handler_errors_total", "Exceptions raised by handlers", ("handler", "error")
+        )
+        self.page_size = registry.histogram(
+            "ruplika_polling_page_size", "Updates per getUpdates page", (), PAGE_SIZE_BUCKETS
+        )
+        self.update_lag = registry.histogram(
+            "ruplika_update_lag_seconds", "Delay between message time and its processing", (), LAG_BUCKETS
+        )
+        self.queue_depth = registry.gauge("ruplika_queue_depth", "Items waiting in internal queues", ("queue",))
+        self._handlers: Dict[Any, Tuple[_HistogramChild, str]] = {}
+    
+    def observe_request(self, method: str, seconds: float, error: Optional[BaseException] = None):
+        result = "ok" if error is None else type(error).__name__
+        self.requests.labels(method, result).inc()
+        self.request_seconds.labels(method).observe(seconds)
+    
+    def observe_handler(self, handler: Callable, seconds: float, error: Optional[BaseException] = None):
+        # هندلرهای مسیرها برای هر پیام یک BoundHandler تازه‌اند؛ کلید خود هندلر ثبت‌شده است
+        handler = getattr(handler, "__wrapped__", handler)
+        entry = self._handlers.get(handler)
+        if entry is None:
+            name = handler_name(handler)
+            entry = self._handlers[handler] = (self.handler_seconds.labels(name), name)
+        entry[0].observe(seconds)
+        if error is not None:
+            self.handler_errors.labels(entry[1], type(error).__name__).inc()
+    
+    def observe_update(self, update_type: str):
+        self.updates.labels(update_type or "unknown").inc()
+    
+    def observe_page(self, updates: List[Dict[str, Any]]):
+        """اندازه‌ی صفحه و تأخیر پیام‌هایی که زمان ارسال دارند"""
+        self.page_size.observe(len(updates))
+        now = time.time()
+        lag = self.update_lag.labels()
+        for update in updates:
+            message = update.get("new_message") or update.get("updated_message")
+            sent = message.get("time") if message else None
+            if sent:
+                try:
+                    lag.observe(max(0.0, now - float(sent)))
+                except (TypeError, ValueError):
+                    pass
+    
+    def track_queue(self, name: str, function: Callable[[], float]):
+        self.queue_depth.labels(name).set_function(function)
+    
+    def exposition(self) -> str:
+        return self.registry.exposition()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = None
+    path_name = "/metrics"
+    
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != self.path_name:
+            self.send_error(404)
+            return
+        body = self.registry.exposition().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(registry: Any, host: str = "0.0.0.0", port: int = 9100,
+                         path: str = "/metrics") -> ThreadingHTTPServer:
+    """
+    اجرای endpoint متنی Prometheus در یک ترد پس‌زمینه؛ registry یک
+    MetricsRegistry یا Metrics است. برای توقف shutdown سرور را صدا بزنید.
+    """
+    if isinstance(registry, Metrics):
+        registry = registry.registry
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry, "path_name": path})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="ruplika-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,88 @@
+import time
+from typing import Any, Callable, Dict, List, Sequence
+from .metrics import _Cells
+from .tracing import handler_name
+
+class MiddlewareChain:
+    """
+    زنجیره‌ی middlewareها دور پردازش آپدیت که یک بار (هنگام ثبت) به یک
+    زنجیره‌ی تابع ثابت تبدیل می‌شود
+    
+    هر middleware به شکل middleware(update_data, call_next) است و با صدا نزدن
+    call_next(update_data) پردازش آپدیت را متوقف می‌کند. در AsyncBot
+    middlewareها باید async باشند و call_next را await کنند. endpoint آخرین
+    مرحله (اجرای هندلرها) است.
+    
+    برای هر مرحله تعداد اجرا و زمان کل (شامل مراحل بعدی) بدون قفل ثبت
+    می‌شود؛ stats زمان خود هر مرحله را از تفاضل آن با مرحله‌ی بعد حساب می‌کند.
+    """
+    
+    def __init__(self, endpoint: Callable, middlewares: Sequence[Callable] = (), is_async: bool = False):
+        self.endpoint = endpoint
+        self.middlewares = list(middlewares)
+        self.is_async = is_async
+        self.names = [handler_name(middleware) for middleware in self.middlewares] + ["handlers"]
+        self._cells = [_Cells(2) for _ in self.names]
+        self.call = self._compile()
+    
+    def _measured(self, func: Callable, index: int) -> Callable:
+        cells = self._cells[index]
+        perf_counter = time.perf_counter
+        
+        if self.is_async:
+            async def measured(update_data):
+                started = perf_counter()
+                try:
+                    return await func(update_data)
+                finally:
+                    cell = cells.cell()
+                    cell[0] += 1
+                    cell[1] += perf_counter() - started
+            return measured
+        
+        def measured(update_data):
+            started = perf_counter()
+            try:
+                return func(update_data)
+            finally:
+                cell = cells.cell()
+                cell[0] += 1
+                cell[1] += perf_counter() - started
+        return measured
+    
+    def _compile(self) -> Callable:
+        call = self._measured(self.endpoint, len(self.middlewares))
+        for index in reversed(range(len(self.middlewares))):
+            middleware, call_next = self.middlewares[index], call
+            
+            def stage(update_data, middleware=middleware, call_next=call_next):
+                return middleware(update_data, call_next)
+            
+            call = self._measured(stage, index)
+        return call
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        برای هر مرحله: calls، total_seconds (شامل مراحل بعد)، self_seconds
+        (فقط خود مرحله) و stopped (تعداد آپدیت‌هایی که به مرحله‌ی بعد نرسیدند)
+        """
+        totals = [cells.totals() for cells in self._cells]
+        stats = []
+        for index, name in enumerate(self.names):
+            calls, seconds = totals[index]
+            next_calls, next_seconds = totals[index + 1] if index + 1 < len(totals) else (calls, 0.0)
+            stats.append({
+                "stage": name,
+                "calls": calls,
+                "total_seconds": seconds,
+                "self_seconds": seconds - next_seconds,
+                "stopped": calls - next_calls,
+            })
+        return stats
+    
+    def format_stats(self) -> str:
+        lines = [f"{'stage':<32} {'calls':>10} {'self µs/call':>14} {'stopped':>10}"]
+        for stage in self.stats():
+            per_call = stage["self_seconds"] / stage["calls"] * 1e6 if stage["calls"] else 0.0
+            lines.append(f"{stage['stage']:<32} {stage['calls']:>10} {per_call:>14.2f} {stage['stopped']:>10}")
+        return "\n".join(lines)
@@ -1,7 +1,24 @@
 from typing import List, Optional, Dict, Any, Union
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from .enums import *
 
+class KeypadPart:
+    """
+    پایه‌ی مدل‌های کیپد؛ تغییر فیلدهای یک آبجکت ساخته‌شده generation را زیاد
+    می‌کند تا کلیدهای محتوایی کش‌شده روی Keypad (keypad_key) نامعتبر شوند.
+    ساختن آبجکت جدید generation را تغییر نمی‌دهد.
+    """
+    
+    __slots__ = ()
+    generation = 0
+    
+    def __setattr__(self, name: str, value: Any):
+        # نسخه‌های slotted (مثل SlottedLocation) __dict__ ندارند
+        changed = name in getattr(self, "__dict__", ())
+        object.__setattr__(self, name, value)
+        if changed:
+            KeypadPart.generation += 1
+
 @dataclass
 class Bot:
     bot_id: str
@@ -41,7 +58,7 @@ class BotCommand:
     description: str
 
 @dataclass
-class Location:
+class Location(KeypadPart):
     longitude: str
     latitude: str
 
@@ -72,13 +89,13 @@ class Poll:
     poll_status: PollStatus
 
 @dataclass
-class ButtonSelectionItem:
+class ButtonSelectionItem(KeypadPart):
     text: str
     image_url: str = ""
     type: ButtonSelectionTypeEnum = ButtonSelectionTypeEnum.TEXT_ONLY
 
 @dataclass
-class ButtonSelection:
+class ButtonSelection(KeypadPart):
     selection_id: str
     search_type: ButtonSelectionSearchEnum = ButtonSelectionSearchEnum.NONE
     get_type: ButtonSelectionGetEnum = ButtonSelectionGetEnum.LOCAL
@@ -88,7 +105,7 @@ class ButtonSelection:
     title: str = ""
 
 @dataclass
-class ButtonCalendar:
+class ButtonCalendar(KeypadPart):
     default_value: Optional[str] = None
     type: ButtonCalendarTypeEnum = ButtonCalendarTypeEnum.DATE_PERSIAN
     min_year: str = "1300"
@@ -96,20 +113,20 @@ class ButtonCalendar:
     title: str = ""
 
 @dataclass
-class ButtonNumberPicker:
+class ButtonNumberPicker(KeypadPart):
     min_value: str = "0"
     max_value: str = "100"
     default_value: Optional[str] = None
     title: str = ""
 
 @dataclass
-class ButtonStringPicker:
+class ButtonStringPicker(KeypadPart):
     items: List[str] = field(default_factory=list)
     default_value: Optional[str] = None
     title: Optional[str] = None
 
 @dataclass
-class ButtonTextbox:
+class ButtonTextbox(KeypadPart):
     type_line: ButtonTextboxTypeLineEnum = ButtonTextboxTypeLineEnum.SINGLE_LINE
     type_keypad: ButtonTextboxTypeKeypadEnum = ButtonTextboxTypeKeypadEnum.STRING
     place_holder: Optional[str] = None
@@ -117,7 +134,7 @@ class ButtonTextbox:
     default_value: Optional[str] = None
 
 @dataclass
-class ButtonLocation:
+class ButtonLocation(KeypadPart):
     default_pointer_location: Optional[Location] = None
     default_map_location: Optional[Location] = None
     type: ButtonLocationTypeEnum = ButtonLocationTypeEnum.PICKER
@@ -130,7 +147,7 @@ class AuxData:
     button_id: Optional[str] = None
 
 @dataclass
-class Button:
+class Button(KeypadPart):
     id: str
     type: ButtonTypeEnum
     button_text: str
@@ -142,11 +159,11 @@ class Button:
     button_textbox: Optional[ButtonTextbox] = None
 
 @dataclass
-class KeypadRow:
+class KeypadRow(KeypadPart):
     buttons: List[Button]
 
 @dataclass
-class Keypad:
+class Keypad(KeypadPart):
     rows: List[KeypadRow]
     resize_keyboard: bool = True
     on_time_keyboard: bool = False
@@ -196,4 +213,33 @@ class MessageTextUpdate:
 @dataclass
 class MessageKeypadUpdate:
     message_id: str
-    inline_keypad: Keypad
\ No newline at end of file
+    inline_keypad: Keypad
+
+def slotted(cls, name: Optional[str] = None):
+    """
+    نسخه‌ی __slots__دار یک dataclass با همان فیلدها، مقادیر پیش‌فرض و متدها
+    
+    آبجکت‌های این نسخه __dict__ ندارند و حافظه‌ی کمتری می‌گیرند؛ افزودن
+    attribute خارج از فیلدها به آن‌ها ممکن نیست. نسخه‌ی ساخته‌شده زیرکلاس
+    کلاس اصلی نیست، پس isinstance با کلاس اصلی False برمی‌گرداند.
+    """
+    name = name or f"Slotted{cls.__name__}"
+    field_names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    for field_name in field_names:
+        namespace.pop(field_name, None)
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+    namespace["__slots__"] = field_names
+    namespace["__qualname__"] = name
+    return type(cls)(name, cls.__bases__, namespace)
+
+# نسخه‌های __slots__دار مدل‌های پیام
+SlottedAuxData = slotted(AuxData)
+SlottedFile = slotted(File)
+SlottedLocation = slotted(Location)
+SlottedContactMessage = slotted(ContactMessage)
+SlottedPollStatus = slotted(PollStatus)
+SlottedPoll = slotted(Poll)
+SlottedMessage = slotted(Message)
+SlottedInlineMessage = slotted(InlineMessage)
@@ -0,0 +1,194 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Union
+
+class OffsetStore:
+    """
+    محل نگه‌داری آخرین offset_id پردازش‌شده‌ی getUpdates
+    
+    زیرکلاس‌ها load و save را پیاده‌سازی می‌کنند؛ save باید اتمیک باشد تا
+    بعد از قطع ناگهانی همیشه یا offset قبلی یا offset جدید خوانده شود.
+    """
+    
+    def load(self) -> Optional[str]:
+        raise NotImplementedError
+    
+    def save(self, offset_id: str):
+        raise NotImplementedError
+    
+    def close(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class MemoryOffsetStore(OffsetStore):
+    """نگه‌داری offset فقط در حافظه (برای تست و اجرای موقت)"""
+    
+    def __init__(self, offset_id: Optional[str] = None):
+        self.offset_id = offset_id
+    
+    def load(self) -> Optional[str]:
+        return self.offset_id
+    
+    def save(self, offset_id: str):
+        self.offset_id = offset_id
+
+class FileOffsetStore(OffsetStore):
+    """
+    offset در یک فایل متنی که با نوشتن در فایل موقت و os.replace جایگزین
+    می‌شود؛ با fsync=True داده قبل از rename روی دیسک نوشته می‌شود
+    """
+    
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+    
+    def load(self) -> Optional[str]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                return fh.read().strip() or None
+        except FileNotFoundError:
+            return None
+    
+    def save(self, offset_id: str):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with self._lock:
+            fd, temp_path = tempfile.mkstemp(prefix=".offset-", dir=directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    fh.write(offset_id)
+                    fh.flush()
+                    if self.fsync:
+                        os.fsync(fh.fileno())
+                os.replace(temp_path, self.path)
+            except BaseException:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+                raise
+            
+            if self.fsync and hasattr(os, "O_DIRECTORY"):
+                # ثبت خود rename در دایرکتوری
+                dir_fd = os.open(directory, os.O_DIRECTORY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+
+class SQLiteOffsetStore(OffsetStore):
+    """
+    offset در یک جدول SQLite؛ با key چند بات می‌توانند از یک فایل استفاده کنند
+    """
+    
+    def __init__(self, path: str, key: str = "default"):
+        self.path = path
+        self.key = key
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS offsets ("
+            "key TEXT PRIMARY KEY, offset_id TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+    
+    def load(self) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT offset_id FROM offsets WHERE key = ?", (self.key,)).fetchone()
+            return row[0] if row else None
+    
+    def save(self, offset_id: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO offsets (key, offset_id, updated) VALUES (?, ?, ?)",
+                (self.key, offset_id, time.time())
+            )
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def open_offset_store(store: Union[str, OffsetStore, None]):
+    """(store، مالکیت)؛ مسیرهای .db/.sqlite/.sqlite3 با SQLite و بقیه با فایل متنی"""
+    if isinstance(store, str):
+        if store.endswith((".db", ".sqlite", ".sqlite3")):
+            return SQLiteOffsetStore(store), True
+        return FileOffsetStore(store), True
+    return store, False
+
+class OffsetCommitter:
+    """
+    دسته‌بندی ثبت offset: بعد از هر commit_every صفحه یا گذشت commit_interval
+    ثانیه از آخرین ثبت (هر کدام زودتر برسد)
+    
+    هر صفحه با track ثبت می‌شود و تابعی برمی‌گرداند که پس از پایان هندلرهای
+    آن صفحه صدا زده می‌شود (مثلا از Dispatcher.after_pending). pending
+    بزرگ‌ترین offsetی است که آن صفحه و همه‌ی صفحه‌های قبلش تمام شده‌اند، پس
+    commit بدون انتظار برای خالی شدن کل صف فقط کارهای تمام‌شده را ثبت می‌کند.
+    """
+    
+    def __init__(self, store: OffsetStore, commit_every: int = 1, commit_interval: Optional[float] = None):
+        if commit_every < 1:
+            raise ValueError("commit_every must be at least 1")
+        self.store = store
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.pending: Optional[str] = None
+        self.committed: Optional[str] = None
+        self._pages = 0
+        self._last_commit = time.monotonic()
+        # صفحه‌های در حال پردازش به ترتیب دریافت: [offset، تمام‌شده]
+        self._inflight: Deque[list] = deque()
+        self._lock = threading.Lock()
+    
+    def load(self) -> Optional[str]:
+        self.committed = self.store.load()
+        return self.committed
+    
+    def track(self, offset_id: Optional[str]) -> Callable[[], None]:
+        """ثبت صفحه‌ی دریافت‌شده؛ تابع برگشتی پایان پردازش آن را اعلام می‌کند"""
+        if not offset_id:
+            return lambda: None
+        page = [offset_id, False]
+        with self._lock:
+            self._inflight.append(page)
+            self._pages += 1
+        
+        def done():
+            with self._lock:
+                page[1] = True
+                inflight = self._inflight
+                while inflight and inflight[0][1]:
+                    self.pending = inflight.popleft()[0]
+        return done
+    
+    def due(self) -> bool:
+        """آیا زمان commit رسیده است"""
+        if self._pages >= self.commit_every:
+            return True
+        return self.commit_interval is not None and time.monotonic() - self._last_commit >= self.commit_interval
+    
+    def advance(self, offset_id: Optional[str]) -> bool:
+        """ثبت offset صفحه‌ای که پردازشش تمام شده؛ True اگر زمان commit رسیده باشد"""
+        if not offset_id:
+            return False
+        self.track(offset_id)()
+        return self.due()
+    
+    def commit(self):
+        with self._lock:
+            pending = self.pending
+            self._pages = 0
+            self._last_commit = time.monotonic()
+        if pending is not None and pending != self.committed:
+            self.store.save(pending)
+            self.committed = pending
@@ -0,0 +1,441 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .exceptions import *
+from .retry import IDEMPOTENT_METHODS, RetryPolicy
+
+# متدهای ارسالی که با outbox صف می‌شوند
+OUTBOX_METHODS = frozenset({
+    "sendMessage",
+    "sendFile",
+    "sendPoll",
+    "sendLocation",
+    "sendContact",
+})
+
+PENDING = "pending"
+INFLIGHT = "inflight"
+FAILED = "failed"
+
+def outbox_retry_policy() -> RetryPolicy:
+    """
+    سیاست پیش‌فرض تلاش مجدد outbox؛ ارسال‌ها at-least-once هستند پس خطای
+    شبکه و 5xx برای متدهای ارسالی هم تکرار می‌شوند
+    """
+    return RetryPolicy(
+        max_attempts=10, base_delay=1.0, max_delay=300.0, max_retry_after=3600.0,
+        idempotent_methods=IDEMPOTENT_METHODS | OUTBOX_METHODS
+    )
+
+class Outbox:
+    """
+    صف پایدار پیام‌های خروجی در SQLite (حالت WAL)
+    
+    هر ارسال با enqueue در یک تراکنش ثبت می‌شود و فقط بعد از پاسخ موفق سرور
+    (ack) حذف می‌شود. کارهایی که هنگام قطع پروسه در حال ارسال بوده‌اند در
+    اجرای بعد دوباره ارسال می‌شوند، پس تحویل at-least-once است. هر فایل باید
+    فقط توسط یک پروسه استفاده شود. بدون path صف فقط در حافظه است و پایدار نیست.
+    """
+    
+    def __init__(self, path: Optional[str] = None, fsync: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None)
+        if path:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # با WAL حالت NORMAL فقط در قطع برق ممکن است آخرین تراکنش‌ها را از دست بدهد
+            self._db.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, method TEXT NOT NULL, body BLOB NOT NULL, "
+            "state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, next_attempt REAL NOT NULL, "
+            "created REAL NOT NULL, error TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS outbox_ready ON outbox (state, next_attempt)")
+        # کارهای نیمه‌کاره‌ی اجرای قبلی دوباره در صف قرار می‌گیرند
+        self.recovered = self._db.execute(
+            "UPDATE outbox SET state = ? WHERE state = ?", (PENDING, INFLIGHT)
+        ).rowcount
+    
+    def enqueue(self, method: str, body: bytes) -> int:
+        """ثبت پایدار یک درخواست و برگرداندن شناسه‌ی آن"""
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO outbox (method, body, state, next_attempt, created) VALUES (?, ?, ?, ?, ?)",
+                (method, body, PENDING, now, now)
+            )
+            self._ready.notify_all()
+            return cursor.lastrowid
+    
+    def claim(self, limit: int) -> List[Tuple[int, str, bytes, int]]:
+        """برداشتن حداکثر limit کار آماده و علامت‌گذاری آن‌ها به عنوان در حال ارسال"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, method, body, attempts FROM outbox "
+                "WHERE state = ? AND next_attempt <= ? ORDER BY id LIMIT ?",
+                (PENDING, time.time(), limit)
+            ).fetchall()
+            if rows:
+                self._db.executemany("UPDATE outbox SET state = ? WHERE id = ?", [(INFLIGHT, row[0]) for row in rows])
+            return rows
+    
+    def wait(self, timeout: float) -> bool:
+        """انتظار برای کار جدید یا رسیدن زمان تلاش مجدد (حداکثر timeout ثانیه)"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt) FROM outbox WHERE state = ?", (PENDING,)
+            ).fetchone()
+            if row[0] is not None:
+                timeout = min(timeout, max(0.0, row[0] - time.time()))
+            if timeout <= 0:
+                return True
+            return self._ready.wait(timeout)
+    
+    def ready_count(self) -> int:
+        """تعداد کارهایی که همین حالا آماده‌ی ارسال هستند"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM outbox WHERE state = ? AND next_attempt <= ?", (PENDING, time.time())
+            ).fetchone()[0]
+    
+    def notify(self):
+        """بیدار کردن منتظرهای wait"""
+        with self._lock:
+            self._ready.notify_all()
+    
+    def ack(self, job_id: int):
+        """حذف کاری که با موفقیت ارسال شده است"""
+        with self._lock:
+            self._db.execute("DELETE FROM outbox WHERE id = ?", (job_id,))
+            self._ready.notify_all()
+    
+    def retry(self, job_id: int, delay: float, error: Exception):
+        with self._lock:
+            self._db.execute(
+                "UPDATE outbox SET state = ?, attempts = attempts + 1, next_attempt = ?, error = ? WHERE id = ?",
+                (PENDING, time.time() + delay, repr(error), job_id)
+            )
+            self._ready.notify_all()
+    
+    def fail(self, job_id: int, error: Exception):
+        """انتقال کار به وضعیت failed (بدون تلاش دوباره)"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE outbox SET state = ?, attempts = attempts + 1, error = ? WHERE id = ?",
+                (FAILED, repr(error), job_id)
+            )
+            self._ready.notify_all()
+    
+    def failed(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, method, attempts, error, created FROM outbox WHERE state = ? ORDER BY id", (FAILED,)
+            ).fetchall()
+        return [
+            {"id": row[0], "method": row[1], "attempts": row[2], "error": row[3], "created": row[4]}
+            for row in rows
+        ]
+    
+    def requeue_failed(self) -> int:
+        """بازگرداندن همه‌ی کارهای failed به صف"""
+        with self._lock:
+            count = self._db.execute(
+                "UPDATE outbox SET state = ?, attempts = 0, next_attempt = ? WHERE state = ?",
+                (PENDING, time.time(), FAILED)
+            ).rowcount
+            self._ready.notify_all()
+            return count
+    
+    def counts(self) -> Dict[str, int]:
+        """تعداد کارها در هر وضعیت"""
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM outbox GROUP BY state").fetchall()
+        counts = {PENDING: 0, INFLIGHT: 0, FAILED: 0}
+        counts.update(rows)
+        return counts
+    
+    def __len__(self) -> int:
+        """تعداد کارهای ارسال‌نشده (در صف یا در حال ارسال)"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM outbox WHERE state IN (?, ?)", (PENDING, INFLIGHT)
+            ).fetchone()[0]
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class _BaseSender:
+    def __init__(
+        self,
+        client: Any,
+        outbox: Outbox,
+        concurrency: int,
+        retry_policy: Optional[RetryPolicy],
+        on_sent: Optional[Callable[[int, Dict[str, Any]], Any]],
+        on_failed: Optional[Callable[[int, Exception], Any]]
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.client = client
+        self.outbox = outbox
+        self.concurrency = concurrency
+        self.retry_policy = retry_policy or outbox_retry_policy()
+        self.on_sent = on_sent
+        self.on_failed = on_failed
+        self.sent = 0
+        self.retried = 0
+        self.failures = 0
+    
+    def _retry_delay(self, method: str, error: Exception, attempts: int) -> Optional[float]:
+        """مکث پیش از تلاش بعدی یا None برای خطای دائمی؛ بودجه‌ی retry اعمال نمی‌شود"""
+        policy = self.retry_policy
+        if attempts + 1 >= policy.max_attempts or not policy.is_retryable(method, error):
+            return None
+        delay = policy.backoff(attempts)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, policy.max_retry_after))
+        return delay
+    
+    def _settle_error(self, job_id: int, method: str, attempts: int, error: Exception):
+        delay = self._retry_delay(method, error, attempts)
+        if delay is not None:
+            self.retried += 1
+            self.outbox.retry(job_id, delay, error)
+            return
+        self.failures += 1
+        self.outbox.fail(job_id, error)
+        if self.on_failed:
+            self.on_failed(job_id, error)
+    
+    def _settle_success(self, job_id: int, result: Dict[str, Any]):
+        self.outbox.ack(job_id)
+        self.sent += 1
+        if self.on_sent:
+            self.on_sent(job_id, result)
+
+class OutboxSender(_BaseSender):
+    """
+    تخلیه‌ی Outbox با concurrency ترد موازی از طریق client._make_request
+    
+    محدودیت نرخ کلاینت روی هر ارسال اعمال می‌شود ولی retry_policy آن نه: هر
+    کار در هر نوبت یک بار ارسال می‌شود و خطاهای قابل تکرار طبق retry_policy
+    خود outbox با backoff دوباره در صف قرار می‌گیرند و بقیه failed می‌شوند.
+    """
+    
+    def __init__(self, client: Any, outbox: Outbox, concurrency: int = 4,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 on_sent: Optional[Callable[[int, Dict[str, Any]], Any]] = None,
+                 on_failed: Optional[Callable[[int, Exception], Any]] = None):
+        super().__init__(client, outbox, concurrency, retry_policy, on_sent, on_failed)
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active = 0
+        self._idle = threading.Condition()
+        self._running = False
+    
+    @property
+    def running(self) -> bool:
+        return self._running
+    
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ruplika-outbox")
+        self._thread = threading.Thread(target=self._loop, name="ruplika-outbox", daemon=True)
+        self._thread.start()
+    
+    def _loop(self):
+        while self._running:
+            # فقط به اندازه‌ی تردهای آزاد کار برداشته می‌شود تا کارهای برداشته‌شده منتظر نمانند
+            with self._idle:
+                self._idle.wait_for(lambda: self._active < self.concurrency or not self._running)
+                free = self.concurrency - self._active
+            if not self._running:
+                return
+            
+            jobs = self.outbox.claim(free)
+            if not jobs:
+                self.outbox.wait(0.5)
+                continue
+            with self._idle:
+                self._active += len(jobs)
+            for job in jobs:
+                self._executor.submit(self._send, *job)
+    
+    def _send(self, job_id: int, method: str, body: bytes, attempts: int):
+        try:
+            try:
+                result = self.client._make_request(method, self.client.codec.loads(body), retry=False)
+            except Exception as e:
+                self._settle_error(job_id, method, attempts, e)
+            else:
+                self._settle_success(job_id, result)
+        except Exception as e:
+            print(f"❌ خطا در outbox: {e}")
+        finally:
+            with self._idle:
+                self._active -= 1
+                self._idle.notify_all()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """انتظار تا ارسال همه‌ی کارهای آماده (کارهای در انتظار retry حساب نمی‌شوند)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._active or self.outbox.ready_count():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+    
+    def stop(self, timeout: Optional[float] = None):
+        """توقف ارسال؛ کارهای در حال ارسال کامل می‌شوند و بقیه در صف می‌مانند"""
+        if not self._running:
+            return
+        self._running = False
+        with self._idle:
+            self._idle.notify_all()
+        self.outbox.notify()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+        self._thread = None
+        self._executor = None
+
+class AsyncOutboxSender(_BaseSender):
+    """
+    نسخه‌ی ناهمگام OutboxSender برای AsyncClient با حداکثر concurrency
+    ارسال هم‌زمان در یک task
+    
+    همه‌ی فراخوانی‌های SQLite (enqueue، claim، ack/retry/fail و ready_count) در
+    یک ترد اختصاصی اجرا می‌شوند تا حلقه‌ی رویداد پشت قفل و دیسک نماند.
+    """
+    
+    def __init__(self, client: Any, outbox: Outbox, concurrency: int = 16,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 on_sent: Optional[Callable[[int, Dict[str, Any]], Any]] = None,
+                 on_failed: Optional[Callable[[int, Exception], Any]] = None):
+        super().__init__(client, outbox, concurrency, retry_policy, on_sent, on_failed)
+        self._task: Optional["asyncio.Task"] = None
+        self._inflight: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._db_executor: Optional[ThreadPoolExecutor] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    async def _db(self, func: Callable, *args):
+        if self._db_executor is None:
+            self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ruplika-outbox-db")
+        return await asyncio.get_running_loop().run_in_executor(self._db_executor, func, *args)
+    
+    async def enqueue(self, method: str, body: bytes) -> int:
+        """افزودن کار به outbox بدون مسدود کردن حلقه و بیدار کردن ارسال"""
+        job_id = await self._db(self.outbox.enqueue, method, body)
+        self.start()
+        self.notify()
+        return job_id
+    
+    def start(self):
+        if self.running:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._loop())
+    
+    def notify(self):
+        """بیدار کردن حلقه بعد از enqueue"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def _loop(self):
+        while not self._stopping:
+            free = self.concurrency - len(self._inflight)
+            # claim لغو نمی‌شود (stop فقط _stopping را تنظیم می‌کند) تا کار برداشته‌شده گم نشود
+            jobs = await self._db(self.outbox.claim, free) if free > 0 else []
+            if not jobs:
+                self._wakeup.clear()
+                if self._stopping:
+                    return
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), 0.5)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for job in jobs:
+                task = asyncio.ensure_future(self._send(*job))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+    
+    async def _settle_error_async(self, job_id: int, method: str, attempts: int, error: Exception):
+        delay = self._retry_delay(method, error, attempts)
+        if delay is not None:
+            self.retried += 1
+            await self._db(self.outbox.retry, job_id, delay, error)
+            return
+        self.failures += 1
+        await self._db(self.outbox.fail, job_id, error)
+        if self.on_failed:
+            self.on_failed(job_id, error)
+    
+    async def _settle_success_async(self, job_id: int, result: Dict[str, Any]):
+        await self._db(self.outbox.ack, job_id)
+        self.sent += 1
+        if self.on_sent:
+            self.on_sent(job_id, result)
+    
+    async def _send(self, job_id: int, method: str, body: bytes, attempts: int):
+        try:
+            try:
+                result = await self.client._make_request(method, self.client.codec.loads(body), retry=False)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._settle_error_async(job_id, method, attempts, e)
+            else:
+                await self._settle_success_async(job_id, result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ خطا در outbox: {e}")
+        finally:
+            self.notify()
+    
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """انتظار تا ارسال همه‌ی کارهای آماده (کارهای در انتظار retry حساب نمی‌شوند)"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while self._inflight or await self._db(self.outbox.ready_count):
+            if deadline is not None and loop.time() >= deadline:
+                return False
+            await asyncio.sleep(0.01)
+        return True
+    
+    async def stop(self):
+        """توقف ارسال؛ کارهای در حال ارسال کامل می‌شوند و بقیه در صف می‌مانند"""
+        if self._task is not None:
+            self._stopping = True
+            self.notify()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        if self._db_executor is not None:
+            self._db_executor.shutdown(wait=True)
+            self._db_executor = None
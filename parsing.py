@@ -0,0 +1,177 @@
+from typing import Any, Dict, Optional
+from .models import *
+
+class ModelSet:
+    """کلاس‌هایی که پارسر برای ساخت آبجکت‌های پیام استفاده می‌کند"""
+    
+    def __init__(self, message, inline_message, aux_data, file, location, contact_message, poll, poll_status):
+        self.message = message
+        self.inline_message = inline_message
+        self.aux_data = aux_data
+        self.file = file
+        self.location = location
+        self.contact_message = contact_message
+        self.poll = poll
+        self.poll_status = poll_status
+
+DATACLASS_MODELS = ModelSet(Message, InlineMessage, AuxData, File, Location, ContactMessage, Poll, PollStatus)
+
+SLOTTED_MODELS = ModelSet(
+    SlottedMessage, SlottedInlineMessage, SlottedAuxData, SlottedFile, SlottedLocation,
+    SlottedContactMessage, SlottedPoll, SlottedPollStatus
+)
+
+def parse_aux_data(data: Optional[Dict[str, Any]], models: ModelSet = DATACLASS_MODELS):
+    if not data:
+        return None
+    return models.aux_data(start_id=data.get("start_id"), button_id=data.get("button_id"))
+
+def parse_file(data: Optional[Dict[str, Any]], models: ModelSet = DATACLASS_MODELS):
+    if not data:
+        return None
+    return models.file(
+        file_id=data.get("file_id", ""),
+        file_name=data.get("file_name", ""),
+        size=data.get("size", "")
+    )
+
+def parse_location(data: Optional[Dict[str, Any]], models: ModelSet = DATACLASS_MODELS):
+    if not data:
+        return None
+    return models.location(longitude=data.get("longitude", ""), latitude=data.get("latitude", ""))
+
+def parse_contact_message(data: Optional[Dict[str, Any]], models: ModelSet = DATACLASS_MODELS):
+    if not data:
+        return None
+    return models.contact_message(
+        phone_number=data.get("phone_number", ""),
+        first_name=data.get("first_name", ""),
+        last_name=data.get("last_name", "")
+    )
+
+def parse_poll(data: Optional[Dict[str, Any]], models: ModelSet = DATACLASS_MODELS):
+    if not data:
+        return None
+    status = data.get("poll_status", {})
+    poll_status = models.poll_status(
+        state=PollStatusEnum(status.get("state", "Open")),
+        selection_index=status.get("selection_index", -1),
+        percent_vote_options=status.get("percent_vote_options", []),
+        total_vote=status.get("total_vote", 0),
+        show_total_votes=status.get("show_total_votes", False)
+    )
+    return models.poll(
+        question=data.get("question", ""),
+        options=data.get("options", []),
+        poll_status=poll_status
+    )
+
+def parse_message(data: Dict[str, Any], models: ModelSet = DATACLASS_MODELS):
+    """ساخت کامل پیام و همه‌ی آبجکت‌های داخلی آن"""
+    return models.message(
+        message_id=str(data.get("message_id", "")),
+        text=data.get("text", ""),
+        time=data.get("time", 0),
+        is_edited=data.get("is_edited", False),
+        sender_type=MessageSenderEnum(data.get("sender_type", "User")),
+        sender_id=data.get("sender_id", ""),
+        chat_id=data.get("chat_id", ""),
+        aux_data=parse_aux_data(data.get("aux_data"), models),
+        file=parse_file(data.get("file"), models),
+        reply_to_message_id=data.get("reply_to_message_id"),
+        location=parse_location(data.get("location"), models),
+        contact_message=parse_contact_message(data.get("contact_message"), models),
+        poll=parse_poll(data.get("poll"), models)
+    )
+
+def parse_inline_message(data: Dict[str, Any], models: ModelSet = DATACLASS_MODELS):
+    return models.inline_message(
+        sender_id=data.get("sender_id", ""),
+        text=data.get("text", ""),
+        message_id=data.get("message_id", ""),
+        chat_id=data.get("chat_id", ""),
+        button_id=data.get("aux_data", {}).get("button_id") if data.get("aux_data") else None,
+        file=models.file(data["file"]["file_id"]) if data.get("file") else None,
+        location=models.location(
+            longitude=data["location"]["longitude"],
+            latitude=data["location"]["latitude"]
+        ) if data.get("location") else None
+    )
+
+class _RawField:
+    """فیلد ساده‌ای که در هر بار خواندن مستقیما از دیکشنری خام برداشته می‌شود"""
+    
+    def __init__(self, key: str, default: Any = None, convert=None):
+        self.key = key
+        self.default = default
+        self.convert = convert
+    
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self.default
+        value = obj._raw.get(self.key, self.default)
+        return self.convert(value) if self.convert is not None else value
+
+class _NestedField:
+    """
+    آبجکت داخلی که در اولین دسترسی ساخته و در __dict__ نمونه نگه داشته می‌شود
+    
+    descriptor فقط __get__ دارد، پس بعد از اولین دسترسی (یا مقداردهی) مقدار
+    __dict__ نمونه مستقیما خوانده می‌شود.
+    """
+    
+    def __init__(self, key: str, build):
+        self.key = key
+        self.build = build
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return None
+        value = self.build(obj._raw.get(self.key), SLOTTED_MODELS)
+        obj.__dict__[self.name] = value
+        return value
+
+class LazyMessage(Message):
+    """
+    نمای تنبل پیام روی دیکشنری خام آپدیت
+    
+    فیلدهای ساده در هر دسترسی از دیکشنری خوانده می‌شوند و آبجکت‌های داخلی
+    (aux_data، file، location، contact_message، poll) فقط در اولین دسترسی و
+    از نوع Slotted ساخته می‌شوند. زیرکلاس Message است و مقداردهی فیلدها
+    مانند قبل کار می‌کند؛ دیکشنری خام نباید بعد از ساخت تغییر کند.
+    """
+    
+    __slots__ = ("_raw", "_sender_type")
+    
+    message_id = _RawField("message_id", "", str)
+    text = _RawField("text", "")
+    time = _RawField("time", 0)
+    is_edited = _RawField("is_edited", False)
+    sender_id = _RawField("sender_id", "")
+    chat_id = _RawField("chat_id", "")
+    reply_to_message_id = _RawField("reply_to_message_id")
+    aux_data = _NestedField("aux_data", parse_aux_data)
+    file = _NestedField("file", parse_file)
+    location = _NestedField("location", parse_location)
+    contact_message = _NestedField("contact_message", parse_contact_message)
+    poll = _NestedField("poll", parse_poll)
+    
+    def __init__(self, raw: Dict[str, Any]):
+        self._raw = raw
+        # مانند پارسر کامل، نوع فرستنده‌ی نامعتبر همین‌جا خطا می‌دهد
+        self._sender_type = MessageSenderEnum(raw.get("sender_type", "User"))
+    
+    @property
+    def sender_type(self) -> MessageSenderEnum:
+        return self._sender_type
+    
+    @sender_type.setter
+    def sender_type(self, value: MessageSenderEnum):
+        self._sender_type = value
+    
+    @property
+    def raw(self) -> Dict[str, Any]:
+        return self._raw
@@ -0,0 +1,80 @@
+import threading
+from typing import Dict
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+class _StatsPoolMixin:
+    """
+    شمارش استفاده‌ی دوباره از اتصال‌ها در استخر urllib3
+    
+    اتصالی که هنگام برداشتن از استخر سوکت باز ندارد باید دوباره وصل شود
+    (دست‌دهی TCP/TLS جدید) و miss شمرده می‌شود.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+    
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout=timeout)
+        connected = getattr(conn, "sock", None) is not None
+        with self._stats_lock:
+            if connected:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return conn
+    
+    def _get_conn_uncounted(self, timeout=None):
+        return super()._get_conn(timeout=timeout)
+    
+    @property
+    def idle(self) -> int:
+        """تعداد اتصال‌های باز آماده در استخر"""
+        if self.pool is None:
+            return 0
+        return sum(1 for conn in list(self.pool.queue) if getattr(conn, "sock", None) is not None)
+
+class StatsHTTPConnectionPool(_StatsPoolMixin, HTTPConnectionPool):
+    pass
+
+class StatsHTTPSConnectionPool(_StatsPoolMixin, HTTPSConnectionPool):
+    pass
+
+class StatsHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter با استخرهایی که hit/miss اتصال را می‌شمارند"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": StatsHTTPConnectionPool,
+            "https": StatsHTTPSConnectionPool,
+        }
+    
+    def pools(self):
+        """استخرهای فعلی (هر میزبان یک استخر)"""
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                yield pool
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        stats: Dict[str, Dict[str, int]] = {}
+        for pool in self.pools():
+            name = f"{pool.scheme}://{pool.host}:{pool.port}"
+            entry = stats.setdefault(name, {"requests": 0, "hits": 0, "misses": 0, "idle": 0})
+            entry["requests"] += pool.num_requests
+            entry["hits"] += getattr(pool, "hits", 0)
+            entry["misses"] += getattr(pool, "misses", 0)
+            entry["idle"] += getattr(pool, "idle", 0)
+        return stats
+    
+    def reset_stats(self):
+        for pool in self.pools():
+            if isinstance(pool, _StatsPoolMixin):
+                with pool._stats_lock:
+                    pool.hits = 0
+                    pool.misses = 0
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# محدودیت پیش‌فرض متدهای پرترافیک: (درخواست در ثانیه، ظرفیت انفجاری)
+DEFAULT_METHOD_LIMITS = {
+    "sendMessage": (30.0, 30),
+    "sendFile": (10.0, 10),
+    "editMessageText": (20.0, 20),
+}
+
+class TokenBucket:
+    """
+    سطل توکن با مدل رزرو
+    
+    هر درخواست یک توکن برمی‌دارد حتی اگر موجودی منفی شود؛ مقدار بدهی نشان
+    می‌دهد درخواست چقدر باید صبر کند تا در نرخ مجاز قرار بگیرد.
+    """
+    
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float):
+        # now ممکن است کمی قبل از ساخت سطل گرفته شده باشد (سطل‌های تازه‌ی چت)
+        if now <= self.updated:
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def delay(self, now: float, tokens: float = 1) -> float:
+        """زمان انتظار لازم برای برداشتن توکن، بدون برداشتن آن"""
+        self._refill(now)
+        missing = tokens - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+    
+    def take(self, now: float, tokens: float = 1):
+        self._refill(now)
+        self.tokens -= tokens
+    
+    @property
+    def full(self) -> bool:
+        return self.tokens >= self.capacity
+
+class RateLimiter:
+    """
+    محدودکننده‌ی نرخ با سطل سراسری، سطل هر متد و سطل هر chat_id
+    
+    acquire در کلاینت همگام ترد را بلاک می‌کند و acquire_async در کلاینت
+    ناهمگام فقط task جاری را منتظر نگه می‌دارد. مدت انتظار هر فراخوانی
+    برگردانده می‌شود و در stats جمع می‌شود.
+    """
+    
+    def __init__(
+        self,
+        global_rate: Optional[float] = 30.0,
+        global_burst: Optional[float] = None,
+        method_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        chat_rate: Optional[float] = 1.0,
+        chat_burst: Optional[float] = 3,
+        max_chats: int = 10000,
+        on_wait: Optional[Callable[[str, Optional[str], float], Any]] = None
+    ):
+        self._global = TokenBucket(global_rate, global_burst) if global_rate else None
+        limits = DEFAULT_METHOD_LIMITS if method_limits is None else method_limits
+        self._methods = {
+            method: TokenBucket(rate, burst) for method, (rate, burst) in limits.items()
+        }
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_chats = max_chats
+        self.on_wait = on_wait
+        self._chats: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+    
+    def _chat_bucket(self, chat_id: str, now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chats[chat_id] = bucket
+            if len(self._chats) > self.max_chats:
+                self._evict(now)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+    
+    def _evict(self, now: float):
+        """حذف قدیمی‌ترین سطل‌های چت که دوباره پر شده‌اند"""
+        while len(self._chats) > self.max_chats:
+            chat_id, bucket = next(iter(self._chats.items()))
+            bucket._refill(now)
+            if not bucket.full:
+                # سطل هنوز بدهکار است؛ حذف آن محدودیت را دور می‌زند
+                break
+            del self._chats[chat_id]
+    
+    def _buckets(self, method: str, chat_id: Optional[str], now: float):
+        buckets = []
+        if self._global is not None:
+            buckets.append(self._global)
+        bucket = self._methods.get(method)
+        if bucket is not None:
+            buckets.append(bucket)
+        if chat_id and self.chat_rate:
+            buckets.append(self._chat_bucket(chat_id, now))
+        return buckets
+    
+    def reserve(self, method: str, chat_id: Optional[str] = None) -> float:
+        """رزرو یک درخواست و برگرداندن مدت انتظار لازم (ثانیه)"""
+        with self._lock:
+            now = time.monotonic()
+            buckets = self._buckets(method, chat_id, now)
+            wait = max([bucket.delay(now) for bucket in buckets] or [0.0])
+            for bucket in buckets:
+                bucket.take(now)
+            self._record(method, wait)
+        
+        if wait and self.on_wait:
+            self.on_wait(method, chat_id, wait)
+        return wait
+    
+    def try_acquire(self, method: str, chat_id: Optional[str] = None) -> bool:
+        """برداشتن توکن فقط در صورتی که نیازی به انتظار نباشد"""
+        with self._lock:
+            now = time.monotonic()
+            buckets = self._buckets(method, chat_id, now)
+            if any(bucket.delay(now) for bucket in buckets):
+                return False
+            for bucket in buckets:
+                bucket.take(now)
+            self._record(method, 0.0)
+        return True
+    
+    def acquire(self, method: str, chat_id: Optional[str] = None) -> float:
+        """انتظار بلاک‌کننده تا مجاز شدن درخواست"""
+        wait = self.reserve(method, chat_id)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    async def acquire_async(self, method: str, chat_id: Optional[str] = None) -> float:
+        """انتظار ناهمگام تا مجاز شدن درخواست"""
+        wait = self.reserve(method, chat_id)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+    
+    def _record(self, method: str, wait: float):
+        stats = self._stats.get(method)
+        if stats is None:
+            stats = self._stats[method] = {"calls": 0, "waited": 0, "total_wait": 0.0, "max_wait": 0.0}
+        stats["calls"] += 1
+        if wait:
+            stats["waited"] += 1
+            stats["total_wait"] += wait
+            if wait > stats["max_wait"]:
+                stats["max_wait"] = wait
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """آمار انتظار به تفکیک متد: تعداد، تعداد منتظرمانده، مجموع و بیشینه‌ی انتظار"""
+        with self._lock:
+            return {method: dict(values) for method, values in self._stats.items()}
+    
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
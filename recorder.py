@@ -0,0 +1,236 @@
+import asyncio
+import gzip
+import inspect
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+from .codec import JSONCodec, get_default_codec
+
+FORMATS = ("jsonl", "binary")
+SOURCES = ("polling", "webhook")
+
+# سرآیند فایل‌های باینری؛ بعد از آن هر رکورد: زمان (double)، منبع (byte)،
+# طول payload (uint32) و خود JSON آپدیت
+BINARY_MAGIC = b"RUPLIKA-UPDATES\x01"
+_RECORD_HEADER = struct.Struct("<dBI")
+_GZIP_MAGIC = b"\x1f\x8b"
+
+@dataclass
+class RecordedUpdate:
+    timestamp: float
+    source: str
+    update: Dict[str, Any]
+
+class UpdateRecorder:
+    """
+    ضبط آپدیت‌های خام دریافتی در یک فایل append-only برای بازپخش بعدی
+    
+    format یکی از jsonl (هر خط {"t", "s", "u"}) یا binary (رکوردهای با طول
+    مشخص، فشرده‌تر و سریع‌تر برای خواندن) است. فایل‌های با پسوند .gz (یا
+    compress=True) با gzip نوشته می‌شوند. آپدیت‌های یک صفحه‌ی getUpdates
+    زمان یکسان دارند و در بازپخش دوباره یک صفحه می‌شوند.
+    
+    با buffered=False بعد از هر صفحه یا آپدیت داده به فایل flush می‌شود تا
+    در قطع ناگهانی فقط آخرین رکوردها از دست بروند؛ با buffered=True نوشتن
+    ارزان‌تر است (و فشرده‌سازی بهتر) اما داده تا close در بافر می‌ماند.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        format: str = "jsonl",
+        compress: Optional[bool] = None,
+        buffered: bool = False,
+        codec: Optional[JSONCodec] = None
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        self.path = path
+        self.format = format
+        self.compress = path.endswith(".gz") if compress is None else compress
+        self.buffered = buffered
+        self.codec = codec if codec is not None else get_default_codec()
+        self.count = 0
+        self._lock = threading.Lock()
+        
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = gzip.open(path, "ab") if self.compress else open(path, "ab")
+        if format == "binary" and is_new:
+            self._file.write(BINARY_MAGIC)
+    
+    def _encode(self, timestamp: float, source: str, update: Dict[str, Any]) -> bytes:
+        if self.format == "binary":
+            payload = self.codec.dumps(update)
+            return _RECORD_HEADER.pack(timestamp, SOURCES.index(source), len(payload)) + payload
+        return self.codec.dumps({"t": timestamp, "s": source, "u": update}) + b"\n"
+    
+    def record_page(self, updates: Iterable[Dict[str, Any]], source: str = "polling",
+                    timestamp: Optional[float] = None):
+        """
+        ضبط آپدیت‌های یک پاسخ getUpdates با یک زمان مشترک (پیش‌فرض زمان فعلی؛
+        برای تبدیل لاگ‌های قدیمی می‌توان زمان را داد)
+        """
+        updates = list(updates)
+        if not updates:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        data = b"".join(self._encode(timestamp, source, update) for update in updates)
+        with self._lock:
+            self._file.write(data)
+            self.count += len(updates)
+            if not self.buffered:
+                self._file.flush()
+    
+    def record(self, update: Dict[str, Any], source: str = "webhook", timestamp: Optional[float] = None):
+        """ضبط یک آپدیت"""
+        data = self._encode(time.time() if timestamp is None else timestamp, source, update)
+        with self._lock:
+            self._file.write(data)
+            self.count += 1
+            if not self.buffered:
+                self._file.flush()
+    
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+    
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def read_updates(path: str, codec: Optional[JSONCodec] = None) -> Iterator[RecordedUpdate]:
+    """
+    خواندن جریانی رکوردهای یک فایل ضبط‌شده؛ فرمت و فشرده‌سازی از محتوای
+    فایل تشخیص داده می‌شود. رکورد ناقص انتهای فایل (قطع هنگام نوشتن) نادیده
+    گرفته می‌شود.
+    """
+    codec = codec if codec is not None else get_default_codec()
+    with open(path, "rb") as raw:
+        compressed = raw.read(2) == _GZIP_MAGIC
+    
+    with (gzip.open(path, "rb") if compressed else open(path, "rb")) as fh:
+        if fh.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+            while True:
+                header = fh.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    return
+                timestamp, source, length = _RECORD_HEADER.unpack(header)
+                payload = fh.read(length)
+                if len(payload) < length:
+                    return
+                yield RecordedUpdate(timestamp, SOURCES[source], codec.loads(payload))
+        
+        fh.seek(0)
+        for line in fh:
+            if not line.endswith(b"\n"):
+                return
+            record = codec.loads(line)
+            yield RecordedUpdate(record["t"], record["s"], record["u"])
+
+def _batches(records: Iterable[RecordedUpdate], mode: str):
+    """
+    گروه‌بندی رکوردها به (زمان، آپدیت‌ها، صفحه است یا نه)
+    
+    در حالت auto رکوردهای پشت سر هم پولینگ با زمان یکسان یک صفحه هستند و
+    رکوردهای وب‌هوک تکی؛ mode=updates همه را صفحه و mode=webhook همه را تکی
+    پخش می‌کند.
+    """
+    page: List[Dict[str, Any]] = []
+    page_time = None
+    for record in records:
+        as_page = mode == "updates" or (mode == "auto" and record.source == "polling")
+        if page and (not as_page or record.timestamp != page_time):
+            yield page_time, page, True
+            page = []
+        if as_page:
+            page_time = record.timestamp
+            page.append(record.update)
+        else:
+            yield record.timestamp, [record.update], False
+    if page:
+        yield page_time, page, True
+
+class UpdateReplayer:
+    """
+    بازپخش یک فایل ضبط‌شده روی یک بات
+    
+    speed=1 با همان فاصله‌های زمانی ضبط، speed=N با سرعت N برابر و
+    speed=None (یا 0) با بیشترین سرعت پخش می‌کند. صفحه‌های پولینگ به
+    process_updates و آپدیت‌های وب‌هوک به process_webhook_update داده
+    می‌شوند (mode برای تغییر این رفتار). اگر بات خودش recorder داشته باشد
+    آپدیت‌های بازپخش‌شده دوباره ضبط می‌شوند.
+    """
+    
+    MODES = ("auto", "updates", "webhook")
+    
+    def __init__(
+        self,
+        source: Union[str, Iterable[RecordedUpdate]],
+        speed: Optional[float] = 1.0,
+        mode: str = "auto"
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {', '.join(self.MODES)}")
+        if speed is not None and speed < 0:
+            raise ValueError("speed must not be negative")
+        self.source = source
+        self.speed = speed or None
+        self.mode = mode
+        self.count = 0
+        self.elapsed = 0.0
+    
+    def _records(self) -> Iterable[RecordedUpdate]:
+        return read_updates(self.source) if isinstance(self.source, str) else self.source
+    
+    def _delay(self, timestamp: float, first: Optional[float], started: float) -> float:
+        if self.speed is None or first is None:
+            return 0.0
+        return started + (timestamp - first) / self.speed - time.perf_counter()
+    
+    def replay(self, bot) -> int:
+        """بازپخش روی Bot؛ تعداد آپدیت‌های پخش‌شده را برمی‌گرداند"""
+        started = time.perf_counter()
+        first = None
+        self.count = 0
+        for timestamp, updates, as_page in _batches(self._records(), self.mode):
+            first = timestamp if first is None else first
+            delay = self._delay(timestamp, first, started)
+            if delay > 0:
+                time.sleep(delay)
+            if as_page:
+                bot.process_updates({"updates": updates})
+            else:
+                bot.process_webhook_update(updates[0])
+            self.count += len(updates)
+        self.elapsed = time.perf_counter() - started
+        return self.count
+    
+    async def areplay(self, bot) -> int:
+        """بازپخش روی AsyncBot (خواندن فایل در همین حلقه‌ی رویداد انجام می‌شود)"""
+        started = time.perf_counter()
+        first = None
+        self.count = 0
+        for timestamp, updates, as_page in _batches(self._records(), self.mode):
+            first = timestamp if first is None else first
+            delay = self._delay(timestamp, first, started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if as_page:
+                result = bot.process_updates({"updates": updates})
+            else:
+                result = bot.process_webhook_update(updates[0])
+            if inspect.isawaitable(result):
+                await result
+            self.count += len(updates)
+        self.elapsed = time.perf_counter() - started
+        return self.count
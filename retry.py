@@ -0,0 +1,165 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Iterable, Optional
+from .exceptions import *
+
+# متدهایی که تکرارشان اثر جانبی اضافه ندارد
+IDEMPOTENT_METHODS = frozenset({
+    "getMe",
+    "getChat",
+    "getUpdates",
+    "getFile",
+    "requestSendFile",
+    "editMessageText",
+    "editInlineKeypad",
+    "editChatKeypad",
+    "deleteMessage",
+    "setCommands",
+    "updateBotEndpoints",
+})
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """تبدیل هدر Retry-After (ثانیه یا تاریخ HTTP) به ثانیه"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if moment is None:
+        return None
+    return max(0.0, moment.timestamp() - time.time())
+
+class RetryBudget:
+    """
+    بودجه‌ی تلاش مجدد برای جلوگیری از تشدید قطعی سرور
+    
+    هر درخواست موفق ratio توکن و گذر زمان min_per_second توکن در ثانیه
+    اضافه می‌کند؛ هر تلاش مجدد یک توکن مصرف می‌کند. وقتی بودجه تمام شود
+    خطا بدون تلاش مجدد به فراخواننده برمی‌گردد.
+    """
+    
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_balance: float = 50.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_balance = max_balance
+        self._balance = max_balance
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float):
+        self._balance = min(self.max_balance, self._balance + (now - self._updated) * self.min_per_second)
+        self._updated = now
+    
+    def deposit(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._balance = min(self.max_balance, self._balance + self.ratio)
+    
+    def withdraw(self) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+    
+    @property
+    def balance(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._balance
+
+class RetryPolicy:
+    """
+    سیاست تلاش مجدد درخواست‌ها با backoff نمایی، jitter و پشتیبانی از Retry-After
+    
+    خطاهای شبکه و 5xx فقط برای متدهای idempotent تکرار می‌شوند. خطای اتصال
+    (درخواست ارسال نشده) و 429 برای همه‌ی متدها قابل تکرار هستند.
+    
+    متدهایی مثل edit_message_text و delete_message خطای API را به False تبدیل
+    می‌کنند؛ با raise_errors=True خطای نهایی (بعد از تمام شدن تلاش‌ها یا
+    بودجه) بالا می‌رود تا خطای دائمی از تمام شدن تلاش‌ها قابل تشخیص باشد.
+    """
+    
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        jitter: bool = True,
+        max_retry_after: float = 60.0,
+        idempotent_methods: Optional[Iterable[str]] = None,
+        retry_status_codes: Optional[Iterable[int]] = None,
+        budget: Optional[RetryBudget] = None,
+        raise_errors: bool = False
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.max_retry_after = max_retry_after
+        self.idempotent_methods: FrozenSet[str] = frozenset(
+            IDEMPOTENT_METHODS if idempotent_methods is None else idempotent_methods
+        )
+        self.retry_status_codes: FrozenSet[int] = frozenset(
+            RETRY_STATUS_CODES if retry_status_codes is None else retry_status_codes
+        )
+        self.budget = budget if budget is not None else RetryBudget()
+        self.raise_errors = raise_errors
+    
+    def is_retryable(self, method: str, error: Exception) -> bool:
+        """آیا این خطا برای این متد قابل تکرار است"""
+        if isinstance(error, (RateLimitException, ConnectException)):
+            return True
+        
+        idempotent = method in self.idempotent_methods
+        if isinstance(error, NetworkException):
+            return idempotent
+        if isinstance(error, APIException) and error.status_code in self.retry_status_codes:
+            return idempotent
+        return False
+    
+    def backoff(self, attempt: int) -> float:
+        """مکث قبل از تلاش شماره‌ی attempt (از صفر) با full jitter"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+    
+    def next_delay(self, method: str, error: Exception, attempt: int) -> Optional[float]:
+        """
+        مدت مکث پیش از تلاش بعدی یا None اگر نباید دوباره تلاش کرد
+        
+        attempt تعداد تلاش‌های ناموفق قبلی منهای یک است (اولین خطا = 0).
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if not self.is_retryable(method, error):
+            return None
+        
+        delay = self.backoff(attempt)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            delay = max(delay, retry_after)
+        
+        if self.budget is not None and not self.budget.withdraw():
+            return None
+        return delay
+    
+    def on_success(self):
+        if self.budget is not None:
+            self.budget.deposit()
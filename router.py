@@ -0,0 +1,237 @@
+import inspect
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Tuple, Union
+
+# الگوی رشته‌ای که با * تمام شود یک مسیر پیشوندی است؛ مثلا "item_*"
+WILDCARD = "*"
+
+MATCH_TYPES = ("CommandMatch", "ButtonMatch")
+
+def accepts_match(func: Callable) -> bool:
+    """
+    آیا هندلر آرگومان دوم (نتیجه‌ی تطبیق) را می‌خواهد: پارامتر دوم بدون مقدار
+    پیش‌فرض یا با annotation از نوع CommandMatch/ButtonMatch. هندلرهایی مثل
+    h(message, extra=None) یا h(message, *args) مثل قبل فقط پیام را می‌گیرند.
+    """
+    try:
+        parameters = list(inspect.signature(func).parameters.values())
+    except (TypeError, ValueError):
+        return False
+    positional = [
+        parameter for parameter in parameters
+        if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+    ]
+    if len(positional) < 2:
+        return False
+    second = positional[1]
+    if second.default is second.empty:
+        return True
+    annotation = second.annotation
+    name = annotation if isinstance(annotation, str) else getattr(annotation, "__name__", "")
+    return name in MATCH_TYPES
+
+class PrefixTrie:
+    """trie کاراکتری برای یافتن بلندترین پیشوند ثبت‌شده‌ی یک رشته"""
+    
+    def __init__(self):
+        self._root: Dict[Any, Any] = {}
+        self._size = 0
+    
+    def insert(self, prefix: str, value: Any):
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if None not in node:
+            self._size += 1
+        # کلید None مقدار گره را نگه می‌دارد و با هیچ کاراکتری تداخل ندارد
+        node[None] = value
+    
+    def longest(self, text: str) -> Optional[Tuple[Any, int]]:
+        """(مقدار، طول پیشوند) برای بلندترین پیشوند ثبت‌شده یا None"""
+        node = self._root
+        found = (node[None], 0) if None in node else None
+        for index, char in enumerate(text):
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                found = (node[None], index + 1)
+        return found
+    
+    def __len__(self) -> int:
+        return self._size
+
+class BoundHandler:
+    """
+    هندلر ثبت‌شده همراه با نتیجه‌ی تطبیق که فقط context را می‌گیرد
+    
+    __wrapped__ خود هندلر ثبت‌شده است تا metrics و tracer برای همه‌ی
+    پیام‌های یک مسیر همان هندلر (و همان نام) را ببینند.
+    """
+    
+    __slots__ = ("__wrapped__", "match")
+    
+    def __init__(self, handler: Callable, match: Any):
+        self.__wrapped__ = handler
+        self.match = match
+    
+    def __call__(self, context: Any) -> Any:
+        return self.__wrapped__(context, self.match)
+
+class Route:
+    """یک هندلر ثبت‌شده به همراه این‌که نتیجه‌ی تطبیق را می‌خواهد یا نه"""
+    
+    __slots__ = ("pattern", "handler", "pass_match")
+    
+    def __init__(self, pattern: Any, handler: Callable):
+        self.pattern = pattern
+        self.handler = handler
+        self.pass_match = accepts_match(handler)
+    
+    def bind(self, match: Any) -> Callable:
+        """هندلری که فقط context را می‌گیرد"""
+        if not self.pass_match:
+            return self.handler
+        return BoundHandler(self.handler, match)
+
+class Router:
+    """
+    جدول مسیرهای از پیش ساخته‌شده: dict برای تطبیق دقیق، trie برای
+    پیشوندها و لیست regexهای کامپایل‌شده
+    
+    ترتیب تطبیق: دقیق، بلندترین پیشوند و در آخر regexها به ترتیب ثبت. هزینه‌ی
+    دو مرحله‌ی اول به تعداد مسیرها بستگی ندارد.
+    """
+    
+    def __init__(self):
+        self.exact: Dict[str, Route] = {}
+        self.prefixes = PrefixTrie()
+        self.patterns: List[Tuple[Pattern, Route]] = []
+    
+    def add(self, pattern: Union[str, Pattern], handler: Callable) -> Route:
+        if isinstance(pattern, str) and pattern.endswith(WILDCARD):
+            route = Route(pattern, handler)
+            self.prefixes.insert(pattern[:-1], route)
+        elif isinstance(pattern, str):
+            route = Route(pattern, handler)
+            self.exact[pattern] = route
+        else:
+            route = Route(pattern.pattern, handler)
+            self.patterns.append((pattern, route))
+        return route
+    
+    def find(self, key: str, text: Optional[str] = None) -> Optional[Tuple[Route, str, Optional["re.Match"]]]:
+        """
+        (مسیر، باقی‌مانده بعد از پیشوند، آبجکت match) یا None؛ regexها روی
+        text (در صورت وجود) و در غیر این صورت روی key اجرا می‌شوند
+        """
+        route = self.exact.get(key)
+        if route is not None:
+            return route, "", None
+        
+        if len(self.prefixes):
+            found = self.prefixes.longest(key)
+            if found is not None:
+                return found[0], key[found[1]:], None
+        
+        if self.patterns:
+            subject = key if text is None else text
+            for pattern, route in self.patterns:
+                match = pattern.match(subject)
+                if match is not None:
+                    return route, "", match
+        return None
+    
+    def __len__(self) -> int:
+        return len(self.exact) + len(self.prefixes) + len(self.patterns)
+
+@dataclass
+class CommandMatch:
+    """نتیجه‌ی پارس یک دستور که به هندلرهای دارای آرگومان دوم داده می‌شود"""
+    command: str
+    route: str
+    args: List[str] = field(default_factory=list)
+    arg_text: str = ""
+    suffix: str = ""
+    match: Optional["re.Match"] = None
+
+class CommandRouter(Router):
+    """
+    مسیریاب دستورات (/start، /item_42 و ...)
+    
+    نام دستورها و پیشوندها بدون / و با حروف کوچک ثبت می‌شوند و نام بات بعد
+    از @ نادیده گرفته می‌شود. regexها روی متن بعد از / (با آرگومان‌ها) اجرا
+    می‌شوند.
+    """
+    
+    def add_command(self, command: Union[str, Pattern], handler: Callable, aliases: Iterable[str] = ()):
+        if isinstance(command, str):
+            command = command.lstrip("/").lower()
+        route = self.add(command, handler)
+        for alias in aliases:
+            # نام‌های مستعار همان مسیر را با نام اصلی به اشتراک می‌گذارند
+            alias = alias.lstrip("/").lower()
+            if alias.endswith(WILDCARD):
+                self.prefixes.insert(alias[:-1], route)
+            else:
+                self.exact[alias] = route
+        return route
+    
+    def resolve(self, text: Optional[str]) -> Optional[Callable]:
+        """هندلر آماده‌ی اجرا برای متن پیام یا None اگر دستوری نباشد"""
+        if not text or text[0] != "/" or not len(self):
+            return None
+        # مانند قبل: اولین توکن متن بدون / و نام بات؛ "/ start" دستور نیست
+        parts = text.split(None, 1)
+        command = parts[0][1:].lower().split("@")[0]
+        if not command:
+            return None
+        arg_text = parts[1] if len(parts) > 1 else ""
+        
+        # regexها متن کامل دستور را می‌بینند
+        found = self.find(command, text[1:])
+        if found is None:
+            return None
+        
+        route, suffix, match = found
+        if not route.pass_match:
+            return route.handler
+        return route.bind(CommandMatch(
+            command=command,
+            route=route.pattern,
+            args=arg_text.split(),
+            arg_text=arg_text,
+            suffix=suffix,
+            match=match
+        ))
+
+@dataclass
+class ButtonMatch:
+    """نتیجه‌ی تطبیق button_id که به هندلرهای دارای آرگومان دوم داده می‌شود"""
+    button_id: str
+    route: str
+    suffix: str = ""
+    match: Optional["re.Match"] = None
+
+class ButtonRouter(Router):
+    """
+    مسیریاب کلیک دکمه‌ها بر اساس button_id
+    
+    الگو می‌تواند شناسه‌ی دقیق ("profile")، پیشوند با * ("product:*") یا
+    regex کامپایل‌شده باشد؛ برای پیشوندها باقی‌مانده‌ی شناسه در suffix
+    قرار می‌گیرد.
+    """
+    
+    def resolve(self, button_id: Optional[str]) -> Optional[Callable]:
+        """هندلر آماده‌ی اجرا برای button_id یا None اگر مسیری پیدا نشود"""
+        if not button_id or not len(self):
+            return None
+        found = self.find(button_id)
+        if found is None:
+            return None
+        
+        route, suffix, match = found
+        if not route.pass_match:
+            return route.handler
+        return route.bind(ButtonMatch(button_id=button_id, route=route.pattern, suffix=suffix, match=match))
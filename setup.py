@@ -22,7 +22,6 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
@@ -31,8 +30,12 @@ setup(
         "Topic :: Software Development :: Libraries :: Python Modules",
         "Topic :: Communications :: Chat",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     install_requires=requirements,
+    extras_require={
+        "async": ["aiohttp>=3.7"],
+        "fast": ["orjson>=3.6"],
+    },
     keywords="rubika bot api messenger library ruplika",
     project_urls={
         "Documentation": "https://ruplika.github.io/docs",
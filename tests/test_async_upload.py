@@ -0,0 +1,53 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_server import MockRubikaServer
+from ruplika.async_client import AsyncClient
+from ruplika.enums import FileTypeEnum
+from ruplika.filecache import FileIdCache
+
+@pytest.fixture
+def slow_api():
+    server = MockRubikaServer(latency=0.05)
+    server.start_in_thread()
+    yield server
+    server.stop_thread()
+
+def test_same_content_is_uploaded_once(slow_api, tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"x" * 4096)
+    
+    async def main():
+        async with AsyncClient("token", api_url=slow_api.url, file_id_cache=FileIdCache()) as client:
+            first = await asyncio.gather(*[client.upload_file(str(path), FileTypeEnum.IMAGE) for _ in range(3)])
+            again = await client.upload_file(str(path), FileTypeEnum.IMAGE)
+        return first, again
+    
+    first, again = asyncio.run(main())
+    assert len(set(first)) == 1 and again == first[0]
+    assert slow_api.counts["upload"] == 1
+
+def test_cancelled_uploader_does_not_cancel_waiters(slow_api, tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"x" * 4096)
+    
+    async def main():
+        async with AsyncClient("token", api_url=slow_api.url, file_id_cache=FileIdCache()) as client:
+            owner = asyncio.ensure_future(client.upload_file(str(path), FileTypeEnum.IMAGE))
+            while not client._upload_flights:
+                await asyncio.sleep(0.001)
+            waiters = [asyncio.ensure_future(client.upload_file(str(path), FileTypeEnum.IMAGE)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            results = await asyncio.gather(*waiters)
+            assert owner.cancelled()
+            return results
+    
+    # یکی از منتظرها آپلود را دوباره انجام می‌دهد و دیگری نتیجه‌ی آن را می‌گیرد
+    results = asyncio.run(main())
+    assert results[0] and results[0] == results[1]
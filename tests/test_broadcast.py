@@ -0,0 +1,91 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_server import MockRubikaServer
+from ruplika.bot import Bot
+from ruplika.broadcast import AsyncBroadcaster, BroadcastCheckpoint, Broadcaster
+from ruplika.exceptions import APIException
+
+@pytest.fixture
+def mock_api():
+    server = MockRubikaServer()
+    server.start_in_thread()
+    yield server
+    server.stop_thread()
+
+def test_results_errors_and_bounded_concurrency():
+    active = [0, 0]
+    lock = threading.Lock()
+    
+    def send(chat_id):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.005)
+        with lock:
+            active[0] -= 1
+        if chat_id.endswith("7"):
+            raise APIException("blocked", status_code=403)
+        return "m" + chat_id
+    
+    results = list(Broadcaster(send, workers=4).run(f"c{i}" for i in range(40)))
+    
+    assert sorted(result.chat_id for result in results) == sorted(f"c{i}" for i in range(40))
+    failed = [result for result in results if not result.ok]
+    assert sorted(result.chat_id for result in failed) == ["c17", "c27", "c37", "c7"]
+    assert all(result.message_id == "m" + result.chat_id for result in results if result.ok)
+    assert active[1] <= 4
+
+def test_checkpoint_skips_delivered_chats(tmp_path):
+    path = str(tmp_path / "broadcast.txt")
+    sent = []
+    
+    def flaky(chat_id):
+        if chat_id == "c2":
+            raise APIException("unavailable", status_code=503)
+        sent.append(chat_id)
+        return "m"
+    
+    list(Broadcaster(flaky, workers=2, checkpoint=path).run(["c1", "c2", "c3"]))
+    with BroadcastCheckpoint(path) as checkpoint:
+        assert len(checkpoint) == 2 and "c2" not in checkpoint
+    
+    # اجرای دوباره فقط چت ناموفق را می‌فرستد
+    sent.clear()
+    results = list(Broadcaster(lambda chat_id: sent.append(chat_id) or "m", checkpoint=path).run(["c1", "c2", "c3"]))
+    assert sent == ["c2"]
+    assert sorted(result.chat_id for result in results if result.skipped) == ["c1", "c3"]
+
+def test_async_broadcaster_accepts_async_iterables():
+    async def send(chat_id):
+        await asyncio.sleep(0.001)
+        if chat_id == "c3":
+            raise APIException("blocked", status_code=403)
+        return "m" + chat_id
+    
+    async def chat_ids():
+        for i in range(10):
+            yield f"c{i}"
+    
+    async def main():
+        return [result async for result in AsyncBroadcaster(send, concurrency=3).run(chat_ids())]
+    
+    results = asyncio.run(main())
+    assert sorted(result.chat_id for result in results) == sorted(f"c{i}" for i in range(10))
+    assert [result.chat_id for result in results if not result.ok] == ["c3"]
+
+def test_bot_broadcast_against_mock_api(mock_api):
+    bot = Bot("token", api_url=mock_api.url)
+    keypad = bot.create_keypad([[bot.create_simple_button("b1", "Hi")]])
+    results = list(bot.broadcast([f"c{i}" for i in range(25)], "hello", inline_keypad=keypad, workers=4))
+    
+    assert len(results) == 25 and all(result.ok for result in results)
+    assert len({result.message_id for result in results}) == 25
+    assert mock_api.counts["sendMessage"] == 25
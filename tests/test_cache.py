@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ruplika.cache import ResponseCache
+
+def test_ttl_and_uncached_methods():
+    cache = ResponseCache(ttls={"getChat": 0.05})
+    cache.put("getChat", "c1", {"id": 1})
+    cache.put("sendMessage", "c1", {"id": 2})
+    assert cache.get("getChat", "c1") == (True, {"id": 1})
+    assert cache.get("sendMessage", "c1") == (False, None)
+    
+    time.sleep(0.06)
+    assert cache.get("getChat", "c1") == (False, None)
+    assert len(cache) == 0 and cache.bytes == 0
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = ResponseCache(ttls={"getChat": 60}, max_entries=2, size_of=lambda value: 10)
+    cache.put("getChat", "a", 1)
+    cache.put("getChat", "b", 2)
+    # استفاده از a آن را تازه نگه می‌دارد و b حذف می‌شود
+    assert cache.get("getChat", "a")[0]
+    cache.put("getChat", "c", 3)
+    assert not cache.get("getChat", "b")[0]
+    assert cache.get("getChat", "a")[0] and cache.get("getChat", "c")[0]
+    assert cache.stats()["methods"]["getChat"]["evictions"] == 1
+    
+    small = ResponseCache(ttls={"getChat": 60}, max_bytes=25, size_of=lambda value: 10)
+    for key in "abc":
+        small.put("getChat", key, key)
+    assert len(small) == 2 and small.bytes == 20
+    assert not small.get("getChat", "a")[0]
+    small.invalidate("getChat")
+    assert len(small) == 0 and small.bytes == 0
+
+def test_concurrent_loads_are_collapsed():
+    cache = ResponseCache(ttls={"getChat": 60})
+    release = threading.Event()
+    calls = []
+    
+    def loader():
+        calls.append(1)
+        release.wait(2)
+        return {"id": 1}
+    
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load("getChat", "c", loader)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1 and results == [{"id": 1}] * 5
+    assert cache.stats()["methods"]["getChat"]["collapsed"] == 4
+
+def test_async_errors_are_not_cached():
+    cache = ResponseCache(ttls={"getChat": 60})
+    
+    async def failing():
+        raise RuntimeError("boom")
+    
+    async def main():
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load_async("getChat", "c", failing)
+    
+    asyncio.run(main())
+    assert len(cache) == 0
+
+def test_cancelled_owner_does_not_cancel_waiters():
+    cache = ResponseCache(ttls={"getChat": 60})
+    calls = []
+    
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+        return {"id": len(calls)}
+    
+    async def main():
+        owner = asyncio.ensure_future(cache.get_or_load_async("getChat", "c", loader))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(cache.get_or_load_async("getChat", "c", loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+        owner.cancel()
+        results = await asyncio.gather(*waiters)
+        assert owner.cancelled()
+        return results
+    
+    # یکی از منتظرها بارگذاری را دوباره انجام می‌دهد و بقیه نتیجه‌ی آن را می‌گیرند
+    assert asyncio.run(main()) == [{"id": 2}] * 3
+    assert len(calls) == 2
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from ruplika.codec import JSONCodec, OrjsonCodec, UjsonCodec, get_default_codec, orjson, ujson
+from ruplika.keypad import CompiledKeypad
+
+CODECS = [
+    JSONCodec,
+    pytest.param(OrjsonCodec, marks=pytest.mark.skipif(orjson is None, reason="orjson not installed")),
+    pytest.param(UjsonCodec, marks=pytest.mark.skipif(ujson is None, reason="ujson not installed")),
+]
+
+KEYPAD = {"rows": [{"buttons": [{"id": "b1", "type": "Simple", "button_text": "سلام"}]}], "resize_keyboard": True}
+
+@pytest.mark.parametrize("codec_class", CODECS)
+def test_compiled_keypads_are_spliced_into_the_body(codec_class):
+    codec = codec_class()
+    compiled = CompiledKeypad(KEYPAD)
+    data = {"chat_id": "c1", "text": "متن", "inline_keypad": compiled}
+    
+    body = codec.encode_body(data)
+    # بایت‌های آماده‌ی کیپد بدون کدگذاری دوباره در بدنه قرار می‌گیرند
+    assert compiled.json_bytes in body
+    assert json.loads(body) == {"chat_id": "c1", "text": "متن", "inline_keypad": KEYPAD}
+
+@pytest.mark.parametrize("codec_class", CODECS)
+def test_body_edge_cases(codec_class):
+    codec = codec_class()
+    assert codec.encode_body(None) is None
+    assert json.loads(codec.encode_body({"chat_id": "c1"})) == {"chat_id": "c1"}
+    
+    only_keypads = codec.encode_body({"inline_keypad": CompiledKeypad(KEYPAD), "chat_keypad": CompiledKeypad({"rows": []})})
+    assert json.loads(only_keypads) == {"inline_keypad": KEYPAD, "chat_keypad": {"rows": []}}
+    assert codec.loads(codec.dumps({"text": "سلام"})) == {"text": "سلام"}
+
+@pytest.mark.parametrize("codec_class", CODECS[:2])
+def test_nested_compiled_keypads_use_the_payload(codec_class):
+    nested = codec_class().dumps({"data": {"keypad": CompiledKeypad(KEYPAD)}})
+    assert json.loads(nested) == {"data": {"keypad": KEYPAD}}
+
+def test_stdlib_codec_keeps_text_readable():
+    assert JSONCodec().dumps({"text": "سلام"}) == '{"text":"سلام"}'.encode("utf-8")
+    with pytest.raises(TypeError):
+        JSONCodec().dumps({"value": object()})
+
+def test_default_codec_prefers_fast_libraries():
+    codec = get_default_codec()
+    expected = "orjson" if orjson is not None else "ujson" if ujson is not None else "json"
+    assert codec.name == expected
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from ruplika.bot import Bot
+from ruplika.dedup import BloomDedup, RecentUpdates, RedisDedup, SQLiteDedup, dedup_key
+
+def new_message(message_id, chat_id="c1", text="hi"):
+    return {"type": "NewMessage", "chat_id": chat_id, "new_message": {
+        "message_id": message_id, "text": text, "time": "1", "is_edited": False,
+        "sender_type": "User", "sender_id": "u1",
+    }}
+
+def edited(message_id, text, edit_time="2"):
+    return {"type": "UpdatedMessage", "chat_id": "c1", "updated_message": {
+        "message_id": message_id, "text": text, "time": edit_time,
+    }}
+
+class FakeRedis:
+    """کمینه‌ی set با nx و px مانند redis-py"""
+    
+    def __init__(self):
+        self.values = {}
+        self.calls = []
+    
+    def set(self, key, value, nx=False, px=None):
+        self.calls.append((key, px))
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+def test_keys():
+    assert dedup_key(new_message("1")) == "NewMessage:c1:1"
+    assert dedup_key(new_message("1", chat_id="c2")) != dedup_key(new_message("1"))
+    assert dedup_key({"type": "RemovedMessage", "chat_id": "c1", "removed_message_id": "9"}) == "RemovedMessage:c1:9"
+    # ویرایش‌های مختلف یک پیام جدا هستند
+    assert dedup_key(edited("1", "a")) != dedup_key(edited("1", "b"))
+    assert dedup_key(edited("1", "a")) == dedup_key(edited("1", "a"))
+    assert dedup_key({"type": "InlineMessage", "inline_message": {"message_id": "1"}}) is None
+    assert dedup_key(new_message("")) is None
+
+def test_recent_updates_size_and_ttl():
+    window = RecentUpdates(size=2)
+    assert [window.seen(key) for key in "aab"] == [False, True, False]
+    window.seen("c")
+    # a از پنجره بیرون رفته است
+    assert not window.seen("a") and len(window) == 2
+    
+    expiring = RecentUpdates(ttl=0.05)
+    assert not expiring.seen("a") and expiring.seen("a")
+    time.sleep(0.06)
+    assert not expiring.seen("a")
+    with pytest.raises(ValueError):
+        RecentUpdates(size=0)
+
+def test_bloom_remembers_at_least_capacity_keys():
+    bloom = BloomDedup(capacity=100, error_rate=1e-4)
+    keys = [f"k{i}" for i in range(250)]
+    assert not any(bloom.seen(key) for key in keys)
+    # 100 کلید آخر حتما به خاطر سپرده شده‌اند (بدون خطای منفی)
+    assert all(bloom.seen(key) for key in keys[-100:])
+    assert sum(bloom.seen(f"new{i}") for i in range(1000)) < 5
+    with pytest.raises(ValueError):
+        BloomDedup(error_rate=1)
+
+def test_sqlite_window_is_shared_and_expires(tmp_path):
+    path = str(tmp_path / "dedup.db")
+    first, second = SQLiteDedup(path, ttl=0.1), SQLiteDedup(path, ttl=0.1)
+    try:
+        assert not first.seen("a")
+        assert second.seen("a")
+        time.sleep(0.15)
+        assert not second.seen("a")
+        assert first.seen("a")
+    finally:
+        first.close()
+        second.close()
+
+def test_redis_uses_prefixed_set_nx_with_ttl():
+    client = FakeRedis()
+    window = RedisDedup(client, prefix="bot1:", ttl=2.5)
+    assert not window.is_duplicate(new_message("1"))
+    assert window.is_duplicate(new_message("1"))
+    assert client.calls[0] == ("bot1:NewMessage:c1:1", 2500)
+    assert window.duplicates == 1
+
+def test_bot_drops_redelivered_updates():
+    bot = Bot("token", dedup=RecentUpdates())
+    seen = []
+    bot.message_handler()(lambda message: seen.append(message.message_id))
+    
+    bot.process_updates({"updates": [new_message("1"), new_message("2"), new_message("1")]})
+    bot.process_updates({"updates": [new_message("2"), new_message("3")]})
+    assert seen == ["1", "2", "3"]
+    assert bot.dedup.duplicates == 2
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+from ruplika.dispatcher import AsyncDispatcher, Dispatcher, shard_for
+
+def test_shard_is_stable():
+    assert shard_for("b0chat", 8) == shard_for("b0chat", 8)
+    assert shard_for(None, 8) == 0
+
+def test_per_key_order_is_kept():
+    dispatcher = Dispatcher(workers=4, queue_size=100)
+    seen = {}
+    lock = threading.Lock()
+    
+    def work(key, index):
+        time.sleep(0.0005)
+        with lock:
+            seen.setdefault(key, []).append(index)
+    
+    for index in range(50):
+        for key in ("a", "b", "c"):
+            dispatcher.submit(key, work, key, index)
+    dispatcher.stop()
+    
+    assert seen == {key: list(range(50)) for key in ("a", "b", "c")}
+    assert dispatcher.pending == 0
+
+def test_submit_times_out_when_queue_is_full():
+    dispatcher = Dispatcher(workers=1, queue_size=1)
+    release = threading.Event()
+    assert dispatcher.submit("a", release.wait)
+    assert not dispatcher.submit("a", lambda: None, timeout=0.05)
+    release.set()
+    dispatcher.stop()
+
+def test_errors_go_to_on_error():
+    errors = []
+    dispatcher = Dispatcher(workers=2, on_error=errors.append)
+    dispatcher.submit("a", lambda: 1 / 0)
+    dispatcher.stop()
+    assert len(errors) == 1 and isinstance(errors[0], ZeroDivisionError)
+
+def test_restart_after_stop():
+    dispatcher = Dispatcher(workers=2, queue_size=2)
+    # stop بدون کارگر فعال نباید _STOP در صف جا بگذارد
+    dispatcher.stop()
+    dispatcher.start()
+    dispatcher.stop()
+    dispatcher.start()
+    
+    done = []
+    for index in range(10):
+        # با _STOP باقی‌مانده کارگرها فورا خارج می‌شدند و submit سوم برای همیشه بلاک می‌شد
+        assert dispatcher.submit("a", done.append, index, timeout=2)
+    assert dispatcher.join(timeout=2)
+    dispatcher.stop()
+    assert done == list(range(10))
+
+def test_async_dispatcher_restart_after_stop():
+    async def run():
+        dispatcher = AsyncDispatcher(workers=2, queue_size=2)
+        blocker = asyncio.Event()
+        
+        await dispatcher.submit("a", blocker.wait)
+        await dispatcher.submit("a", blocker.wait)
+        await dispatcher.stop(drain=False)
+        
+        done = []
+        dispatcher.start()
+        for index in range(10):
+            await asyncio.wait_for(dispatcher.submit("a", done.append, index), 2)
+        await asyncio.wait_for(dispatcher.join(), 2)
+        await dispatcher.stop()
+        return done, dispatcher.pending
+    
+    done, pending = asyncio.run(run())
+    assert done == list(range(10))
+    assert pending == 0
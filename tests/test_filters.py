@@ -0,0 +1,89 @@
+import re
+
+import pytest
+
+from ruplika.bot import Bot
+from ruplika.enums import ChatTypeEnum
+from ruplika.filters import FilterIndex, chat_type_of
+
+def message(text="hello", sender_type="User", **extra):
+    return dict({"text": text, "sender_type": sender_type}, **extra)
+
+def names(handlers):
+    return [handler.__name__ for handler in handlers]
+
+def named(name):
+    def handler(message):
+        pass
+    handler.__name__ = name
+    return handler
+
+def test_chat_type_from_prefix():
+    assert chat_type_of("g0abc") == ChatTypeEnum.GROUP
+    assert chat_type_of("b0abc") == ChatTypeEnum.USER
+    assert chat_type_of("xx") is None and chat_type_of(None) is None
+
+def test_dimensions_are_and_combined_and_keep_registration_order():
+    index = FilterIndex()
+    index.add(named("everything"))
+    index.add(named("groups"), chat_types="Group")
+    index.add(named("group_files"), chat_types=ChatTypeEnum.GROUP, content="file")
+    index.add(named("vip"), chat_ids=["b0vip"])
+    index.add(named("bots"), sender_types="Bot")
+    
+    assert names(index.match("g0chat", message())) == ["everything", "groups"]
+    assert names(index.match("g0chat", message(file={"file_id": "f"}))) == ["everything", "groups", "group_files"]
+    assert names(index.match("b0vip", message())) == ["everything", "vip"]
+    assert names(index.match("b0vip", message(sender_type="Bot"))) == ["everything", "vip", "bots"]
+    assert len(index) == 5
+
+def test_text_patterns_and_predicates():
+    calls = []
+    
+    def long_text(message):
+        calls.append(message)
+        return len(message["text"]) > 5
+    
+    index = FilterIndex()
+    index.add(named("greeting"), text=r"^سلام")
+    index.add(named("greeting_ci"), text=re.compile(r"^hi", re.I))
+    index.add(named("long_greeting"), text=r"^سلام", predicate=long_text)
+    
+    assert names(index.match("b0u", message("سلام"), message("سلام"))) == ["greeting"]
+    assert names(index.match("b0u", message("سلام دوست من"), message("سلام دوست من"))) == ["greeting", "long_greeting"]
+    assert names(index.match("b0u", message("HI there"))) == ["greeting_ci"]
+    # predicate فقط برای هندلرهایی که از فیلترهای دیگر رد شده‌اند صدا زده می‌شود
+    index.match("b0u", message("bye"))
+    assert len(calls) == 2
+
+def test_invalid_content_is_rejected():
+    with pytest.raises(ValueError):
+        FilterIndex().add(named("x"), content="video")
+
+def test_returned_lists_are_independent_copies():
+    index = FilterIndex()
+    index.add(named("a"))
+    first = index.match("b0u", message())
+    first.clear()
+    assert names(index.match("b0u", message())) == ["a"]
+
+def test_bot_message_handler_filters():
+    bot = Bot("token")
+    seen = []
+    
+    @bot.message_handler
+    def everything(message):
+        seen.append("everything")
+    
+    @bot.message_handler(chat_types="Group", text=r"^!ban")
+    def moderation(message):
+        seen.append("moderation")
+    
+    def update(chat_id, text):
+        return {"type": "NewMessage", "chat_id": chat_id, "new_message": {
+            "message_id": "1", "text": text, "time": "0", "is_edited": False,
+            "sender_type": "User", "sender_id": "u1",
+        }}
+    
+    bot.process_updates({"updates": [update("g0group", "!ban u2"), update("b0user", "!ban u2")]})
+    assert seen == ["everything", "moderation", "everything"]
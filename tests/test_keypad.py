@@ -0,0 +1,59 @@
+from ruplika.client import Client
+from ruplika.enums import ButtonTypeEnum
+from ruplika.keypad import CompiledKeypad, KeypadCache, keypad_key
+from ruplika.models import Button, Keypad, KeypadPart, KeypadRow, SlottedLocation
+
+def make_keypad(text="Hi"):
+    return Keypad(rows=[KeypadRow(buttons=[Button("b1", ButtonTypeEnum.SIMPLE, text)])])
+
+def test_key_is_by_content_and_cached_on_the_keypad():
+    keypad = make_keypad()
+    key = keypad_key(keypad)
+    assert key == keypad_key(make_keypad())
+    assert key != keypad_key(make_keypad("Bye"))
+    # ارسال دوباره‌ی همان کیپد درخت دکمه‌ها را دوباره پیمایش نمی‌کند
+    assert keypad_key(keypad) is key
+    assert keypad == make_keypad()
+
+def test_assignment_invalidates_cached_key():
+    keypad = make_keypad()
+    key = keypad_key(keypad)
+    keypad.rows[0].buttons[0].button_text = "Bye"
+    assert keypad_key(keypad) == keypad_key(make_keypad("Bye")) != key
+    
+    keypad.rows.append(KeypadRow(buttons=[]))
+    keypad.rows = keypad.rows
+    assert len(keypad_key(keypad)[2]) == 2
+
+def test_keypad_cache_lru():
+    cache = KeypadCache(maxsize=2)
+    first, second, third = (CompiledKeypad({"rows": [], "n": n}) for n in range(3))
+    cache.put("a", first)
+    cache.put("b", second)
+    assert cache.get("a") is first
+    cache.put("c", third)
+    assert cache.get("b") is None
+    assert cache.get("a") is first and cache.get("c") is third
+    assert (cache.hits, cache.misses, len(cache)) == (3, 1, 2)
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == 0
+
+def test_client_reuses_compiled_keypads():
+    client = Client("token")
+    compiled = client.compile_keypad(make_keypad())
+    assert client.compile_keypad(make_keypad()) is compiled
+    assert client.compile_keypad(compiled) is compiled
+    
+    keypad = make_keypad()
+    client.compile_keypad(keypad)
+    keypad.rows[0].buttons[0].button_text = "Bye"
+    changed = client.compile_keypad(keypad)
+    assert changed is not compiled
+    assert changed.payload["rows"][0]["buttons"][0]["button_text"] == "Bye"
+
+def test_slotted_copies_of_keypad_parts_still_work():
+    generation = KeypadPart.generation
+    location = SlottedLocation("51.38", "35.68")
+    location.latitude = "35.70"
+    assert location.latitude == "35.70" and not hasattr(location, "__dict__")
+    assert KeypadPart.generation == generation
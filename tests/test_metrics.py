@@ -0,0 +1,103 @@
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ruplika.metrics import CONTENT_TYPE, Metrics, MetricsRegistry, start_metrics_server
+
+def test_counter_and_gauge_exposition():
+    registry = MetricsRegistry()
+    requests = registry.counter("app_requests_total", "Requests", ("method",))
+    requests.labels("send").inc()
+    requests.labels("send").inc(2)
+    depth = registry.gauge("app_depth", "Queue depth")
+    depth.set_function(lambda: 7)
+    broken = registry.gauge("app_broken", "Broken gauge")
+    broken.set_function(lambda: 1 / 0)
+    
+    lines = registry.exposition().splitlines()
+    assert lines[:3] == [
+        "# HELP app_requests_total Requests",
+        "# TYPE app_requests_total counter",
+        'app_requests_total{method="send"} 3',
+    ]
+    assert "app_depth 7" in lines and "app_broken nan" in lines
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("app_seconds", "Latency", ("method",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.labels("get").observe(value)
+    
+    text = registry.exposition()
+    assert 'app_seconds_bucket{method="get",le="0.1"} 2' in text
+    assert 'app_seconds_bucket{method="get",le="1"} 3' in text
+    assert 'app_seconds_bucket{method="get",le="+Inf"} 4' in text
+    assert 'app_seconds_sum{method="get"} 3.65' in text
+    assert 'app_seconds_count{method="get"} 4' in text
+
+def test_labels_are_escaped_and_checked():
+    registry = MetricsRegistry()
+    counter = registry.counter("app_total", "Total", ("name",))
+    counter.labels('a"b\\c\nd').inc()
+    assert 'app_total{name="a\\"b\\\\c\\nd"} 1' in registry.exposition()
+    
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+    with pytest.raises(ValueError):
+        registry.gauge("app_total", "Total")
+    assert registry.counter("app_total", "Total", ("name",)) is counter
+
+def test_counts_from_finished_threads_are_kept():
+    counter = MetricsRegistry().counter("app_total", "Total")
+    
+    def work():
+        for _ in range(1000):
+            counter.inc()
+    
+    for _ in range(3):
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    
+    assert counter.labels().value == 12000
+    # خانه‌ی تردهای تمام‌شده در مقدار پایه جمع شده است
+    assert len(counter.labels()._cells._cells) <= 4
+
+def test_metrics_observers():
+    metrics = Metrics(buckets=(1.0,))
+    
+    def on_start(message):
+        pass
+    
+    metrics.observe_request("sendMessage", 0.2)
+    metrics.observe_request("sendMessage", 0.3, TimeoutError())
+    metrics.observe_handler(on_start, 0.1, ValueError())
+    metrics.observe_update("")
+    metrics.observe_page([{"new_message": {"time": "0"}}, {"new_message": {"time": "bad"}}, {}])
+    
+    text = metrics.exposition()
+    assert 'ruplika_api_requests_total{method="sendMessage",result="ok"} 1' in text
+    assert 'ruplika_api_requests_total{method="sendMessage",result="TimeoutError"} 1' in text
+    assert 'ruplika_handler_errors_total{handler="test_metrics_observers.<locals>.on_start",error="ValueError"} 1' in text
+    assert 'ruplika_updates_total{type="unknown"} 1' in text
+    assert 'ruplika_polling_page_size_bucket{le="5"} 1' in text
+    assert "ruplika_update_lag_seconds_count 1" in text
+
+def test_metrics_server():
+    metrics = Metrics()
+    metrics.observe_update("NewMessage")
+    server = start_metrics_server(metrics, host="127.0.0.1", port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert 'ruplika_updates_total{type="NewMessage"} 1' in response.read().decode("utf-8")
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
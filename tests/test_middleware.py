@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+
+from ruplika.async_bot import AsyncBot
+from ruplika.bot import Bot
+from ruplika.middleware import MiddlewareChain
+
+def text_update(text: str) -> dict:
+    return {"type": "NewMessage", "chat_id": "b0chat", "new_message": {"message_id": "1", "text": text}}
+
+def test_chain_runs_in_order_and_counts_stops():
+    calls = []
+    
+    def outer(update_data, call_next):
+        calls.append("outer")
+        return call_next(update_data)
+    
+    def block_secret(update_data, call_next):
+        calls.append("block")
+        if update_data != "secret":
+            return call_next(update_data)
+    
+    chain = MiddlewareChain(lambda update_data: calls.append(update_data), [outer, block_secret])
+    chain.call("hello")
+    chain.call("secret")
+    
+    assert calls == ["outer", "block", "hello", "outer", "block"]
+    stats = chain.stats()
+    assert [stage["stage"] for stage in stats] == [
+        "test_chain_runs_in_order_and_counts_stops.<locals>.outer",
+        "test_chain_runs_in_order_and_counts_stops.<locals>.block_secret",
+        "handlers",
+    ]
+    assert [(stage["calls"], stage["stopped"]) for stage in stats] == [(2, 0), (2, 1), (1, 0)]
+
+def test_self_seconds_exclude_later_stages():
+    def slow(update_data, call_next):
+        time.sleep(0.02)
+        return call_next(update_data)
+    
+    chain = MiddlewareChain(lambda update_data: time.sleep(0.03), [slow])
+    chain.call({})
+    
+    first, handlers = chain.stats()
+    assert first["total_seconds"] >= 0.05
+    assert 0.02 <= first["self_seconds"] < handlers["total_seconds"]
+    assert handlers["self_seconds"] == handlers["total_seconds"] >= 0.03
+    assert "handlers" in chain.format_stats()
+
+def test_errors_are_still_counted():
+    def failing(update_data):
+        raise RuntimeError("boom")
+    
+    chain = MiddlewareChain(failing, [lambda update_data, call_next: call_next(update_data)])
+    with pytest.raises(RuntimeError):
+        chain.call({})
+    assert [stage["calls"] for stage in chain.stats()] == [1, 1]
+
+async def _async_middleware(update_data, call_next):
+    await call_next(update_data)
+
+def test_sync_bot_middleware():
+    bot = Bot("token")
+    handled = []
+    
+    @bot.middleware
+    def only_hello(update_data, call_next):
+        if update_data["new_message"]["text"] == "hello":
+            call_next(update_data)
+    
+    @bot.message_handler()
+    def on_message(message):
+        handled.append(message.text)
+    
+    bot.process_updates({"updates": [text_update("hello"), text_update("spam")]})
+    
+    assert handled == ["hello"]
+    assert [stage["stopped"] for stage in bot.middleware_stats()] == [1, 0]
+    with pytest.raises(TypeError):
+        bot.middleware(_async_middleware)
+
+def test_async_bot_middleware():
+    handled = []
+    
+    async def main():
+        bot = AsyncBot("token")
+        
+        with pytest.raises(TypeError):
+            bot.middleware(lambda update_data, call_next: None)
+        bot.middleware(_async_middleware)
+        
+        @bot.message_handler()
+        async def on_message(message):
+            handled.append(message.text)
+        
+        await bot.process_updates({"updates": [text_update("hello")]})
+        await bot.close()
+        return bot.middleware_stats()
+    
+    stats = asyncio.run(main())
+    assert handled == ["hello"]
+    assert [stage["calls"] for stage in stats] == [1, 1]
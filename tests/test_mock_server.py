@@ -0,0 +1,139 @@
+"""
+تست رفت‌وبرگشت AsyncClient و سرور وب‌هوک در برابر سرور mock محلی
+(benchmarks/mock_server.py)؛ بدون شبکه‌ی بیرونی اجرا می‌شوند
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_server import MockRubikaServer
+from ruplika.async_bot import AsyncBot
+from ruplika.async_client import AsyncClient
+from ruplika.bot import Bot
+from ruplika.webhook import WebhookServer
+
+TOKEN = "test-token"
+
+@pytest.fixture
+def mock_api():
+    server = MockRubikaServer(total_updates=250)
+    server.start_in_thread()
+    yield server
+    server.stop_thread()
+
+def text_update(index: int) -> dict:
+    return {
+        "type": "NewMessage",
+        "chat_id": f"b0chat{index % 3}",
+        "new_message": {
+            "message_id": str(index),
+            "text": f"message {index}",
+            "time": "1700000000",
+            "is_edited": False,
+            "sender_type": "User",
+            "sender_id": "u0sender",
+        },
+    }
+
+async def post_updates(port: int, updates: list):
+    """ارسال آپدیت‌ها روی یک اتصال keep-alive و برگرداندن وضعیت پاسخ‌ها"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    statuses = []
+    for update in updates:
+        body = json.dumps({"update": update}).encode("utf-8")
+        writer.write(
+            b"POST /receiveUpdate HTTP/1.1\r\nHost: test\r\nContent-Type: application/json\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        statuses.append(int(head.split(b" ", 2)[1]))
+        length = 0
+        for line in head.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        await reader.readexactly(length)
+    writer.close()
+    return statuses
+
+def test_async_client_send_and_get_updates(mock_api):
+    async def run():
+        async with AsyncClient(TOKEN, api_url=mock_api.url) as client:
+            message_ids = await asyncio.gather(*(client.send_message("b0chat", f"hi {i}") for i in range(20)))
+            first = await client.get_updates(limit=100)
+            second = await client.get_updates(limit=100, offset_id=first["next_offset_id"])
+            last = await client.get_updates(limit=100, offset_id="200")
+        return message_ids, first, second, last
+    
+    message_ids, first, second, last = asyncio.run(run())
+    
+    assert len(set(message_ids)) == 20
+    assert mock_api.counts["sendMessage"] == 20
+    assert len(first["updates"]) == 100
+    assert first["next_offset_id"] == "100"
+    assert second["updates"][0]["chat_id"] != "" and second["next_offset_id"] == "200"
+    assert len(last["updates"]) == 50
+    assert mock_api.statuses == {200: 23}
+
+def test_webhook_drains_sync_bot(mock_api):
+    bot = Bot(TOKEN, api_url=mock_api.url, workers=2)
+    handled = []
+    lock = threading.Lock()
+    
+    @bot.message_handler()
+    def reply(message):
+        time.sleep(0.005)
+        bot.send_message(message.chat_id or "b0chat", "ok")
+        with lock:
+            handled.append(message.message_id)
+    
+    async def run():
+        server = WebhookServer(bot, host="127.0.0.1", port=0)
+        await server.start()
+        statuses = await post_updates(server.sockets[0][1], [text_update(i) for i in range(30)])
+        await server.stop(timeout=10)
+        return statuses, server.stats()
+    
+    statuses, stats = asyncio.run(run())
+    bot._dispatcher.stop()
+    
+    # همه‌ی آپدیت‌های تاییدشده پیش از بازگشت stop پردازش شده‌اند
+    assert statuses == [200] * 30
+    assert sorted(handled, key=int) == [str(i) for i in range(30)]
+    assert stats["processed"] == 30 and stats["pending"] == 0
+    assert mock_api.counts["sendMessage"] == 30
+
+def test_webhook_drains_async_bot(mock_api):
+    handled = []
+    
+    async def run():
+        bot = AsyncBot(TOKEN, api_url=mock_api.url)
+        
+        @bot.message_handler()
+        async def reply(message):
+            await asyncio.sleep(0.005)
+            await bot.send_message(message.chat_id or "b0chat", "ok")
+            handled.append(message.message_id)
+        
+        server = WebhookServer(bot, host="127.0.0.1", port=0)
+        await server.start()
+        statuses = await post_updates(server.sockets[0][1], [text_update(i) for i in range(30)])
+        await server.stop(timeout=10)
+        await bot.close()
+        return statuses
+    
+    statuses = asyncio.run(run())
+    
+    assert statuses == [200] * 30
+    assert handled == [str(i) for i in range(30)]
+    assert mock_api.counts["sendMessage"] == 30
@@ -0,0 +1,94 @@
+"""
+تست خطاهای تزریقی، تأخیر و آپلود سرور mock (benchmarks/mock_server.py)
+"""
+
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_server import MockRubikaServer
+
+def call(url: str, body: bytes = b"{}", headers: dict = None):
+    """(وضعیت، هدرها، بدنه) یک درخواست POST"""
+    request = urllib.request.Request(url, data=body, headers=headers or {}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, dict(response.headers), json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), json.loads(e.read())
+
+@pytest.fixture
+def start():
+    servers = []
+    
+    def factory(**options):
+        server = MockRubikaServer(**options)
+        server.start_in_thread()
+        servers.append(server)
+        return server
+    
+    yield factory
+    for server in servers:
+        server.stop_thread()
+
+def test_rate_limit_sets_retry_after(start):
+    server = start(rate_limit_rate=1.0, retry_after=2.5)
+    status, headers, payload = call(f"{server.url}/tok/sendMessage")
+    
+    assert status == 429 and headers["Retry-After"] == "2.5"
+    assert payload["status"] == "ERR"
+    assert server.counts == {"sendMessage": 1} and server.statuses == {429: 1}
+
+def test_error_rate_is_seeded(start):
+    first = start(error_rate=0.5, seed=7)
+    second = start(error_rate=0.5, seed=7)
+    
+    runs = [
+        [call(f"{server.url}/tok/getMe")[0] for _ in range(20)]
+        for server in (first, second)
+    ]
+    
+    # با seed یکسان ترتیب خطاها تکرارپذیر است
+    assert runs[0] == runs[1]
+    assert set(runs[0]) == {200, 503}
+    assert first.statuses[503] == runs[0].count(503)
+
+def test_latency_and_reset_stats(start):
+    server = start(latency=0.05)
+    began = time.monotonic()
+    assert call(f"{server.url}/tok/getMe")[0] == 200
+    assert time.monotonic() - began >= 0.05
+    
+    server.reset_stats()
+    assert server.counts == {} and server.statuses == {}
+
+def test_updates_stop_at_total(start):
+    server = start(total_updates=5)
+    _, _, page = call(f"{server.url}/tok/getUpdates", json.dumps({"limit": 3, "offset_id": "3"}).encode())
+    assert [u["new_message"]["message_id"] for u in page["updates"]] == ["1003", "1004"]
+    assert page["next_offset_id"] == "5"
+    
+    _, _, empty = call(f"{server.url}/tok/getUpdates", json.dumps({"offset_id": "5"}).encode())
+    assert empty["updates"] == [] and empty["next_offset_id"] == "5"
+
+def test_upload_counts_bytes_without_keeping_them(start):
+    server = start()
+    _, _, target = call(f"{server.url}/tok/requestSendFile", json.dumps({"type": "Image"}).encode())
+    assert target["upload_url"] == f"{server.url}/upload/Image"
+    
+    status, _, payload = call(target["upload_url"], b"x" * 70000, {"Content-Type": "application/octet-stream"})
+    assert status == 200 and payload["file_id"].startswith("mock-file-")
+    assert server.bytes_uploaded == 70000 and server.counts["upload"] == 1
+
+def test_bad_requests(start):
+    server = start()
+    assert call(f"{server.url}/tok/sendMessage", b"not json")[0] == 400
+    assert call(f"{server.url}/sendMessage")[0] == 404
+    assert call(f"{server.url}/tok/noSuchMethod")[2]["status"] == "ERR"
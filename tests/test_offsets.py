@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from ruplika.bot import Bot
+from ruplika.dispatcher import Dispatcher
+from ruplika.offsets import (
+    FileOffsetStore, MemoryOffsetStore, OffsetCommitter, SQLiteOffsetStore, open_offset_store
+)
+
+@pytest.mark.parametrize("kind", ["file", "sqlite"])
+def test_store_survives_reopen(tmp_path, kind):
+    path = str(tmp_path / ("offset.db" if kind == "sqlite" else "offset.txt"))
+    store, owned = open_offset_store(path)
+    assert owned and isinstance(store, SQLiteOffsetStore if kind == "sqlite" else FileOffsetStore)
+    assert store.load() is None
+    store.save("41")
+    store.save("42")
+    store.close()
+    
+    store, _ = open_offset_store(path)
+    assert store.load() == "42"
+    store.close()
+
+def test_sqlite_store_keys_are_separate(tmp_path):
+    path = str(tmp_path / "offsets.sqlite")
+    with SQLiteOffsetStore(path, key="a") as first, SQLiteOffsetStore(path, key="b") as second:
+        first.save("1")
+        second.save("2")
+        assert first.load() == "1" and second.load() == "2"
+
+def test_commit_every_batches_saves():
+    store = MemoryOffsetStore()
+    committer = OffsetCommitter(store, commit_every=3)
+    assert not committer.advance("1")
+    assert not committer.advance("2")
+    assert committer.advance("3")
+    committer.commit()
+    assert store.offset_id == "3"
+    assert not committer.advance(None)
+
+def test_commit_interval():
+    committer = OffsetCommitter(MemoryOffsetStore(), commit_every=100, commit_interval=0.01)
+    assert not committer.advance("1")
+    time.sleep(0.02)
+    assert committer.advance("2")
+
+def test_only_contiguous_finished_pages_are_committed():
+    store = MemoryOffsetStore()
+    committer = OffsetCommitter(store)
+    first, second, third = committer.track("10"), committer.track("20"), committer.track("30")
+    
+    second()
+    third()
+    committer.commit()
+    # صفحه‌ی اول هنوز تمام نشده، پس هیچ offsetی ثبت نمی‌شود
+    assert store.offset_id is None
+    
+    first()
+    committer.commit()
+    assert store.offset_id == "30"
+
+def test_after_pending_waits_only_for_earlier_work():
+    dispatcher = Dispatcher(workers=4)
+    release = threading.Event()
+    finished = []
+    dispatcher.submit("slow", release.wait)
+    dispatcher.submit("fast", finished.append, "fast")
+    dispatcher.after_pending(lambda: finished.append("mark"))
+    
+    time.sleep(0.05)
+    assert finished == ["fast"]
+    release.set()
+    assert dispatcher.join(timeout=2)
+    assert finished == ["fast", "mark"]
+    assert dispatcher.pending == 0
+    dispatcher.stop()
+
+def test_polling_commit_does_not_wait_for_slow_chats():
+    bot = Bot("token", workers=2)
+    store = MemoryOffsetStore()
+    committer = OffsetCommitter(store)
+    release = threading.Event()
+    bot._dispatcher.submit("slow-chat", release.wait)
+    
+    started = time.monotonic()
+    bot._advance_offset(committer, "100")
+    bot._advance_offset(committer, "200")
+    # بدون join سراسری پولینگ منتظر چت کند نمی‌ماند
+    assert time.monotonic() - started < 0.5
+    assert store.offset_id is None
+    
+    release.set()
+    assert bot._dispatcher.join(timeout=2)
+    bot._advance_offset(committer, "300")
+    assert bot._dispatcher.join(timeout=2)
+    bot._commit_offset(committer, drain=True)
+    assert store.offset_id == "300"
+    bot._dispatcher.stop()
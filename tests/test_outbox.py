@@ -0,0 +1,125 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_server import MockRubikaServer
+from ruplika.async_client import AsyncClient
+from ruplika.client import Client
+from ruplika.outbox import FAILED, INFLIGHT, PENDING, Outbox, OutboxSender
+from ruplika.retry import RetryPolicy
+
+@pytest.fixture
+def api():
+    server = MockRubikaServer()
+    server.start_in_thread()
+    yield server
+    server.stop_thread()
+
+@pytest.fixture
+def failing_api():
+    server = MockRubikaServer(error_rate=1.0)
+    server.start_in_thread()
+    yield server
+    server.stop_thread()
+
+def test_claim_ack_retry_fail():
+    with Outbox() as outbox:
+        first = outbox.enqueue("sendMessage", b'{"text": "1"}')
+        second = outbox.enqueue("sendMessage", b'{"text": "2"}')
+        third = outbox.enqueue("sendMessage", b'{"text": "3"}')
+        
+        jobs = outbox.claim(2)
+        assert [job[0] for job in jobs] == [first, second]
+        assert outbox.counts() == {PENDING: 1, INFLIGHT: 2, FAILED: 0}
+        
+        outbox.ack(first)
+        outbox.retry(second, 60, RuntimeError("later"))
+        # کار در انتظار retry تا رسیدن زمانش برداشته نمی‌شود
+        assert [job[0] for job in outbox.claim(10)] == [third]
+        outbox.fail(third, RuntimeError("permanent"))
+        
+        assert len(outbox) == 1
+        assert outbox.ready_count() == 0
+        failed = outbox.failed()
+        assert [job["id"] for job in failed] == [third] and failed[0]["attempts"] == 1
+        assert outbox.requeue_failed() == 1
+        assert outbox.ready_count() == 1
+
+def test_inflight_jobs_are_recovered(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    with Outbox(path) as outbox:
+        job_id = outbox.enqueue("sendMessage", b"{}")
+        assert outbox.claim(1)[0][0] == job_id
+    
+    with Outbox(path) as outbox:
+        assert outbox.recovered == 1
+        assert outbox.claim(1)[0][0] == job_id
+
+def test_sender_does_not_stack_client_retries(failing_api):
+    client_policy = RetryPolicy(max_attempts=4, base_delay=0.001, idempotent_methods={"sendMessage"})
+    client = Client("token", api_url=failing_api.url, retry_policy=client_policy)
+    failures = []
+    with Outbox() as outbox:
+        sender = OutboxSender(
+            client, outbox, concurrency=1,
+            retry_policy=RetryPolicy(max_attempts=2, base_delay=0.001, idempotent_methods={"sendMessage"}),
+            on_failed=lambda job_id, error: failures.append(job_id)
+        )
+        job_id = outbox.enqueue("sendMessage", b'{"chat_id": "c", "text": "hi"}')
+        sender.start()
+        for _ in range(200):
+            if failures:
+                break
+            sender.flush(0.05)
+        sender.stop()
+    
+    assert failures == [job_id]
+    # هر نوبت outbox فقط یک درخواست است، نه max_attempts تلاش کلاینت
+    assert failing_api.counts["sendMessage"] == 2
+    assert sender.retried == 1 and sender.failures == 1
+
+class ThreadRecordingOutbox(Outbox):
+    """ثبت تردی که هر متد پایگاه داده در آن اجرا شده"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+    
+    def enqueue(self, *args):
+        self.threads.add(threading.current_thread())
+        return super().enqueue(*args)
+    
+    def claim(self, *args):
+        self.threads.add(threading.current_thread())
+        return super().claim(*args)
+    
+    def ack(self, *args):
+        self.threads.add(threading.current_thread())
+        return super().ack(*args)
+    
+    def ready_count(self):
+        self.threads.add(threading.current_thread())
+        return super().ready_count()
+
+def test_async_sender_keeps_sqlite_off_the_loop(api):
+    async def main(outbox):
+        client = AsyncClient("token", api_url=api.url, outbox=outbox)
+        try:
+            job_ids = [await client.send_message("chat", str(i)) for i in range(5)]
+            assert await client.flush_outbox(timeout=5)
+        finally:
+            await client.close()
+        return job_ids, client.outbox_sender.sent
+    
+    with ThreadRecordingOutbox() as outbox:
+        job_ids, sent = asyncio.run(main(outbox))
+        assert len(outbox) == 0
+    
+    assert len(set(job_ids)) == 5 and sent == 5
+    assert api.counts["sendMessage"] == 5
+    assert outbox.threads and threading.main_thread() not in outbox.threads
@@ -0,0 +1,67 @@
+import pytest
+
+from ruplika.bot import Bot
+from ruplika.enums import MessageSenderEnum
+from ruplika.models import Message
+from ruplika.parsing import DATACLASS_MODELS, SLOTTED_MODELS, LazyMessage, parse_message
+
+RAW = {
+    "message_id": 42,
+    "text": "سلام",
+    "time": "1700000000",
+    "is_edited": False,
+    "sender_type": "User",
+    "sender_id": "u0sender",
+    "aux_data": {"start_id": None, "button_id": "btn_1"},
+    "file": {"file_id": "f1", "file_name": "a.jpg", "size": "10"},
+    "location": {"longitude": "51.38", "latitude": "35.68"},
+    "contact_message": None,
+    "poll": None,
+}
+
+FIELDS = ("message_id", "text", "time", "is_edited", "sender_type", "sender_id", "reply_to_message_id")
+
+def summary(message):
+    values = tuple(getattr(message, name) for name in FIELDS)
+    return values + (
+        message.aux_data.button_id, message.file.file_id, message.location.latitude, message.contact_message
+    )
+
+@pytest.mark.parametrize("build", [
+    lambda raw: parse_message(raw, DATACLASS_MODELS),
+    lambda raw: parse_message(raw, SLOTTED_MODELS),
+    LazyMessage,
+], ids=["dataclass", "slotted", "lazy"])
+def test_all_models_expose_the_same_fields(build):
+    message = build(dict(RAW))
+    assert summary(message) == (
+        "42", "سلام", "1700000000", False, MessageSenderEnum.USER, "u0sender", None,
+        "btn_1", "f1", "35.68", None
+    )
+
+def test_slotted_models_have_no_instance_dict():
+    message = parse_message(RAW, SLOTTED_MODELS)
+    assert not hasattr(message, "__dict__") and not hasattr(message.location, "__dict__")
+    with pytest.raises(AttributeError):
+        message.extra = 1
+
+def test_lazy_message_builds_nested_objects_once():
+    message = LazyMessage(dict(RAW))
+    assert isinstance(message, Message) and message.raw["text"] == "سلام"
+    assert "file" not in message.__dict__
+    assert message.file is message.file
+    message.text = "changed"
+    assert message.text == "changed"
+    with pytest.raises(ValueError):
+        LazyMessage(dict(RAW, sender_type="Robot"))
+
+@pytest.mark.parametrize("model", ["dataclass", "slotted", "lazy"])
+def test_bot_message_models(model):
+    bot = Bot("token", message_model=model)
+    seen = []
+    bot.message_handler()(seen.append)
+    bot.process_updates({"updates": [{"type": "NewMessage", "chat_id": "c1", "new_message": dict(RAW)}]})
+    assert len(seen) == 1 and seen[0].location.longitude == "51.38"
+    
+    with pytest.raises(ValueError):
+        Bot("token", message_model="fast")
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_server import MockRubikaServer
+from ruplika.async_bot import AsyncBot
+from ruplika.bot import Bot
+from ruplika.offsets import MemoryOffsetStore
+
+TOTAL = 250
+
+@pytest.fixture
+def mock_api():
+    server = MockRubikaServer(latency=0.01, total_updates=TOTAL)
+    server.start_in_thread()
+    yield server
+    server.stop_thread()
+
+def update_id(update):
+    return update.get("removed_message_id") or update["new_message"]["message_id"]
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_next_poll_delay_backs_off_only_on_empty_pages():
+    bot = Bot("token")
+    assert bot._next_poll_delay(10, 0.4, 0.1, 2.0) == (0, 0.1)
+    assert bot._next_poll_delay(0, 0.1, 0.1, 2.0) == (0.1, 0.2)
+    assert bot._next_poll_delay(0, 1.5, 0.1, 2.0) == (1.5, 2.0)
+
+def test_pipelined_polling_processes_every_update_once(mock_api):
+    bot = Bot("token", api_url=mock_api.url)
+    store = MemoryOffsetStore()
+    seen = []
+    bot.update_handler(lambda update: seen.append(update_id(update)))
+    
+    bot.start_polling(interval=0.2, limit=100, pipelined=True, min_interval=0.01, offset_store=store)
+    try:
+        assert wait_for(lambda: len(seen) >= TOTAL)
+        assert wait_for(lambda: store.offset_id == str(TOTAL))
+    finally:
+        bot.stop_polling()
+    
+    assert seen == [str(1000 + index) for index in range(TOTAL)]
+    # سه صفحه‌ی پر و حداقل یک صفحه‌ی خالی
+    assert mock_api.counts["getUpdates"] >= 4
+
+def test_async_pipelined_polling_processes_every_update_once(mock_api):
+    async def main():
+        bot = AsyncBot("token", api_url=mock_api.url)
+        store = MemoryOffsetStore()
+        seen = []
+        
+        @bot.update_handler
+        async def collect(update):
+            seen.append(update_id(update))
+        
+        bot.start_polling(interval=0.2, limit=100, pipelined=True, min_interval=0.01, offset_store=store)
+        deadline = time.monotonic() + 10
+        while (len(seen) < TOTAL or store.offset_id != str(TOTAL)) and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        await bot.stop_polling()
+        await bot.close()
+        return seen, store.offset_id
+    
+    seen, offset_id = asyncio.run(main())
+    assert seen == [str(1000 + index) for index in range(TOTAL)]
+    assert offset_id == str(TOTAL)
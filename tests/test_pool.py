@@ -0,0 +1,53 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_server import MockRubikaServer
+from ruplika.client import Client
+
+@pytest.fixture
+def mock_api():
+    server = MockRubikaServer()
+    server.start_in_thread()
+    yield server
+    server.stop_thread()
+
+def only_pool(client):
+    stats = client.pool_stats()
+    assert len(stats) == 1
+    return next(iter(stats.values()))
+
+def test_keep_alive_connections_are_reused(mock_api):
+    client = Client("token", api_url=mock_api.url, pool_size_per_host=4)
+    for _ in range(10):
+        client.send_message("c1", "hi")
+    stats = only_pool(client)
+    assert (stats["requests"], stats["hits"], stats["misses"], stats["idle"]) == (10, 9, 1, 1)
+    
+    client.reset_pool_stats()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda i: client.send_message("c1", str(i)), range(40)))
+    stats = only_pool(client)
+    # بیش از pool_size_per_host اتصال جدید لازم نیست
+    assert stats["hits"] + stats["misses"] == 40 and stats["misses"] <= 3
+
+def test_warm_up_opens_connections_before_the_first_request(mock_api):
+    client = Client("token", api_url=mock_api.url, pool_size_per_host=3, warm_connections=3)
+    assert only_pool(client)["idle"] == 3
+    client.send_message("c1", "hi")
+    stats = only_pool(client)
+    assert (stats["hits"], stats["misses"]) == (1, 0)
+
+def test_warm_up_falls_back_to_head_requests(mock_api, monkeypatch):
+    client = Client("token", api_url=mock_api.url, pool_size_per_host=2)
+    monkeypatch.setattr(client, "_pool_for", lambda url: None)
+    assert client.warm_up() == 2
+    assert only_pool(client)["idle"] == 2
+
+def test_warm_up_is_a_no_op_without_keep_alive(mock_api):
+    client = Client("token", api_url=mock_api.url, keep_alive=False)
+    assert client.warm_up(4) == 0
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+
+from ruplika.ratelimit import RateLimiter, TokenBucket
+
+def test_token_bucket_reservations_go_into_debt():
+    bucket = TokenBucket(rate=10, capacity=2)
+    now = bucket.updated
+    assert bucket.delay(now) == 0
+    bucket.take(now)
+    bucket.take(now)
+    assert bucket.delay(now) == pytest.approx(0.1)
+    bucket.take(now)
+    # هر رزرو بعدی پشت بدهی قبلی صبر می‌کند
+    assert bucket.delay(now) == pytest.approx(0.2)
+    assert bucket.delay(now + 0.5) == 0 and bucket.full
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+def test_burst_then_waits_at_rate():
+    waits = []
+    limiter = RateLimiter(
+        global_rate=None, method_limits={"sendMessage": (20.0, 2)}, chat_rate=None,
+        on_wait=lambda method, chat_id, wait: waits.append((method, wait))
+    )
+    assert [limiter.reserve("sendMessage") for _ in range(2)] == [0.0, 0.0]
+    assert limiter.reserve("sendMessage") == pytest.approx(0.05, abs=0.01)
+    assert limiter.reserve("sendMessage") == pytest.approx(0.10, abs=0.01)
+    # متدهای بدون سطل محدود نمی‌شوند
+    assert limiter.reserve("getMe") == 0.0
+    
+    stats = limiter.stats()["sendMessage"]
+    assert (stats["calls"], stats["waited"]) == (4, 2)
+    assert stats["max_wait"] == pytest.approx(0.10, abs=0.01)
+    assert [method for method, _ in waits] == ["sendMessage", "sendMessage"]
+
+def test_acquire_sleeps_for_the_reserved_wait():
+    limiter = RateLimiter(global_rate=50.0, global_burst=1, method_limits={}, chat_rate=None)
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire("sendMessage")
+    assert time.monotonic() - started >= 0.055
+    
+    async def burst():
+        return [await limiter.acquire_async("sendMessage") for _ in range(2)]
+    assert all(wait > 0 for wait in asyncio.run(burst()))
+
+def test_chat_buckets_are_separate_and_bounded():
+    limiter = RateLimiter(global_rate=None, method_limits={}, chat_rate=1.0, chat_burst=1, max_chats=2)
+    assert limiter.try_acquire("sendMessage", "a")
+    assert not limiter.try_acquire("sendMessage", "a")
+    assert limiter.try_acquire("sendMessage", "b")
+    
+    limiter.try_acquire("sendMessage", "c")
+    # سطل‌های بدهکار حذف نمی‌شوند تا محدودیت دور زده نشود
+    assert len(limiter._chats) == 3
+    assert not limiter.try_acquire("sendMessage", "a")
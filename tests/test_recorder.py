@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+
+from ruplika.recorder import BINARY_MAGIC, RecordedUpdate, UpdateRecorder, UpdateReplayer, read_updates
+
+def update(index: int) -> dict:
+    return {"type": "NewMessage", "chat_id": "b0chat", "new_message": {"message_id": str(index), "text": "سلام"}}
+
+class FakeBot:
+    """ثبت صفحه‌ها و آپدیت‌های تکی‌ای که بازپخش‌کننده می‌فرستد"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def process_updates(self, response):
+        self.calls.append(("page", [u["new_message"]["message_id"] for u in response["updates"]]))
+    
+    def process_webhook_update(self, update):
+        self.calls.append(("webhook", update["new_message"]["message_id"]))
+
+class FakeAsyncBot(FakeBot):
+    async def process_updates(self, response):
+        FakeBot.process_updates(self, response)
+    
+    async def process_webhook_update(self, update):
+        FakeBot.process_webhook_update(self, update)
+
+def record_sample(path, **options):
+    with UpdateRecorder(path, **options) as recorder:
+        recorder.record_page([update(0), update(1)], timestamp=100.0)
+        recorder.record_page([update(2)], timestamp=100.5)
+        recorder.record(update(3), timestamp=101.0)
+        recorder.record(update(4), timestamp=101.0)
+    assert recorder.count == 5
+
+@pytest.mark.parametrize("format", ["jsonl", "binary"])
+@pytest.mark.parametrize("name", ["updates.rec", "updates.rec.gz"])
+def test_round_trip(tmp_path, format, name):
+    path = str(tmp_path / name)
+    record_sample(path, format=format)
+    
+    records = list(read_updates(path))
+    assert [r.update for r in records] == [update(i) for i in range(5)]
+    assert [r.source for r in records] == ["polling"] * 3 + ["webhook"] * 2
+    assert [r.timestamp for r in records] == [100.0, 100.0, 100.5, 101.0, 101.0]
+    
+    bot = FakeBot()
+    replayer = UpdateReplayer(path, speed=None)
+    assert replayer.replay(bot) == 5
+    # صفحه‌ها با زمان مشترک دوباره یک صفحه می‌شوند و آپدیت‌های وب‌هوک تکی می‌مانند
+    assert bot.calls == [("page", ["0", "1"]), ("page", ["2"]), ("webhook", "3"), ("webhook", "4")]
+
+def test_binary_header_written_once(tmp_path):
+    path = str(tmp_path / "updates.bin")
+    record_sample(path, format="binary")
+    record_sample(path, format="binary")
+    
+    with open(path, "rb") as fh:
+        assert fh.read().count(BINARY_MAGIC) == 1
+    assert len(list(read_updates(path))) == 10
+
+def test_truncated_tail_is_ignored(tmp_path):
+    for format in ("jsonl", "binary"):
+        path = str(tmp_path / f"updates.{format}")
+        record_sample(path, format=format)
+        with open(path, "rb+") as fh:
+            fh.truncate(fh.seek(0, 2) - 3)
+        assert [r.update for r in read_updates(path)] == [update(i) for i in range(4)]
+
+def test_modes_and_async_replay():
+    records = [RecordedUpdate(1.0, "polling", update(0)), RecordedUpdate(1.0, "webhook", update(1))]
+    
+    bot = FakeBot()
+    UpdateReplayer(records, speed=None, mode="webhook").replay(bot)
+    assert bot.calls == [("webhook", "0"), ("webhook", "1")]
+    
+    bot = FakeAsyncBot()
+    assert asyncio.run(UpdateReplayer(records, speed=None, mode="updates").areplay(bot)) == 2
+    assert bot.calls == [("page", ["0", "1"])]
+    
+    with pytest.raises(ValueError):
+        UpdateReplayer(records, mode="fast")
+
+def test_speed_keeps_recorded_spacing():
+    records = [RecordedUpdate(10.0, "webhook", update(0)), RecordedUpdate(10.2, "webhook", update(1))]
+    replayer = UpdateReplayer(records, speed=2)
+    began = time.perf_counter()
+    replayer.replay(FakeBot())
+    assert time.perf_counter() - began >= 0.09
@@ -0,0 +1,93 @@
+import os
+import sys
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_server import MockRubikaServer
+from ruplika.client import Client
+from ruplika.exceptions import APIException, ConnectException, NetworkException, RateLimitException
+from ruplika.retry import RetryBudget, RetryPolicy, parse_retry_after
+
+@pytest.fixture
+def failing_api():
+    server = MockRubikaServer(error_rate=1.0)
+    server.start_in_thread()
+    yield server
+    server.stop_thread()
+
+def test_backoff_is_exponential_capped_and_jittered():
+    policy = RetryPolicy(base_delay=0.5, max_delay=3.0, jitter=False)
+    assert [policy.backoff(attempt) for attempt in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    
+    jittered = RetryPolicy(base_delay=0.5, max_delay=3.0)
+    assert all(0 <= jittered.backoff(3) <= 3.0 for _ in range(100))
+
+def test_retryable_errors():
+    policy = RetryPolicy()
+    server_error = APIException("unavailable", status_code=503)
+    assert policy.is_retryable("getChat", server_error)
+    assert not policy.is_retryable("sendMessage", server_error)
+    assert policy.is_retryable("getChat", NetworkException("reset"))
+    assert not policy.is_retryable("sendMessage", NetworkException("reset"))
+    # درخواستی که به سرور نرسیده یا 429 برای همه‌ی متدها تکرار می‌شود
+    assert policy.is_retryable("sendMessage", ConnectException("refused"))
+    assert policy.is_retryable("sendMessage", RateLimitException("slow down"))
+    assert not policy.is_retryable("getChat", APIException("bad request", status_code=400))
+
+def test_next_delay_respects_attempts_and_retry_after():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.1, jitter=False, max_retry_after=10.0, budget=None)
+    error = APIException("unavailable", status_code=503)
+    assert policy.next_delay("getChat", error, 0) == 0.1
+    assert policy.next_delay("getChat", error, 1) == 0.2
+    assert policy.next_delay("getChat", error, 2) is None
+    
+    assert policy.next_delay("sendMessage", RateLimitException("slow", retry_after=5.0), 0) == 5.0
+    assert policy.next_delay("sendMessage", RateLimitException("slow", retry_after=60.0), 0) is None
+
+def test_budget_stops_retry_storms():
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, max_balance=2.0)
+    policy = RetryPolicy(max_attempts=10, base_delay=0, budget=budget)
+    error = NetworkException("reset")
+    assert policy.next_delay("getChat", error, 0) is not None
+    assert policy.next_delay("getChat", error, 0) is not None
+    assert policy.next_delay("getChat", error, 0) is None
+    
+    policy.on_success()
+    policy.on_success()
+    assert budget.balance == pytest.approx(1.0)
+    assert policy.next_delay("getChat", error, 0) is not None
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    moment = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(moment, usegmt=True)) <= 30
+
+def test_client_retries_only_idempotent_methods(failing_api):
+    policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+    client = Client("token", api_url=failing_api.url, retry_policy=policy)
+    
+    with pytest.raises(APIException):
+        client.get_chat("c1")
+    with pytest.raises(APIException):
+        client.send_message("c1", "hi")
+    
+    assert failing_api.counts["getChat"] == 3
+    assert failing_api.counts["sendMessage"] == 1
+
+def test_boolean_methods_can_raise_the_final_error(failing_api):
+    quiet = Client("token", api_url=failing_api.url, retry_policy=RetryPolicy(max_attempts=2, base_delay=0.001))
+    assert quiet.delete_message("c1", "m1") is False
+    
+    loud = Client("token", api_url=failing_api.url,
+                  retry_policy=RetryPolicy(max_attempts=2, base_delay=0.001, raise_errors=True))
+    with pytest.raises(APIException) as info:
+        loud.delete_message("c1", "m1")
+    assert info.value.status_code == 503
+    assert failing_api.counts["deleteMessage"] == 4
@@ -0,0 +1,112 @@
+import re
+
+import pytest
+
+from ruplika.bot import Bot
+from ruplika.router import ButtonMatch, ButtonRouter, CommandMatch, CommandRouter, PrefixTrie, accepts_match
+
+def test_prefix_trie_longest_match():
+    trie = PrefixTrie()
+    trie.insert("item", "short")
+    trie.insert("item_", "long")
+    assert trie.longest("item_42") == ("long", 5)
+    assert trie.longest("items") == ("short", 4)
+    assert trie.longest("other") is None
+    assert len(trie) == 2
+
+def test_exact_commands_aliases_and_bot_name():
+    router = CommandRouter()
+    start = lambda message: "start"
+    router.add_command("/Start", start, aliases=["begin"])
+    assert router.resolve("/start") is start
+    assert router.resolve("/START@my_bot hello") is start
+    assert router.resolve("/begin") is start
+    assert router.resolve("/stop") is None
+    assert router.resolve("start") is None
+
+def test_command_is_the_first_token():
+    router = CommandRouter()
+    router.add_command("start", lambda message: None)
+    router.add_command(re.compile(r"start"), lambda message: None)
+    # مانند قبل اسلش باید به دستور چسبیده باشد
+    assert router.resolve("/ start") is None
+    assert router.resolve("/") is None
+    assert router.resolve("/\tstart") is None
+
+def test_prefix_and_regex_routes_receive_match():
+    router = CommandRouter()
+    seen = []
+    router.add_command("item_*", lambda message, match: seen.append(match))
+    router.add_command(re.compile(r"pay (\d+)"), lambda message, match: seen.append(match))
+    
+    router.resolve("/item_42  extra args")("message")
+    router.resolve("/pay 100")("message")
+    
+    item, pay = seen
+    assert isinstance(item, CommandMatch)
+    assert (item.command, item.route, item.suffix) == ("item_42", "item_*", "42")
+    assert item.args == ["extra", "args"] and item.arg_text == "extra args"
+    assert pay.match.group(1) == "100" and pay.args == ["100"]
+
+def test_accepts_match():
+    assert accepts_match(lambda message, match: None)
+    assert not accepts_match(lambda message: None)
+    assert not accepts_match(lambda message, extra=None: None)
+    assert not accepts_match(lambda message, *args: None)
+    
+    def annotated(message, match: CommandMatch = None):
+        pass
+    assert accepts_match(annotated)
+
+def test_button_routes_prefer_exact_then_longest_prefix_then_regex():
+    router = ButtonRouter()
+    exact = lambda click: "exact"
+    router.add("product:1", exact)
+    router.add("product:*", lambda click, match: ("product", match.suffix))
+    router.add("product:sale:*", lambda click, match: ("sale", match.suffix))
+    router.add(re.compile(r"page_(\d+)"), lambda click, match: ("page", match.match.group(1)))
+    
+    assert router.resolve("product:1") is exact
+    assert router.resolve("product:7")("click") == ("product", "7")
+    assert router.resolve("product:sale:9")("click") == ("sale", "9")
+    assert router.resolve("page_3")("click") == ("page", "3")
+    assert router.resolve("other") is None
+    assert router.resolve(None) is None
+    assert ButtonRouter().resolve("product:1") is None
+
+def test_bound_handler_exposes_the_registered_handler():
+    router = ButtonRouter()
+    
+    def handler(click, match: ButtonMatch):
+        return match.button_id
+    router.add("item_*", handler)
+    bound = router.resolve("item_5")
+    assert bound.__wrapped__ is handler and bound("click") == "item_5"
+
+def inline_update(button_id):
+    return {
+        "type": "InlineMessage",
+        "inline_message": {
+            "sender_id": "u1", "text": "", "message_id": "m1", "chat_id": "c1",
+            "aux_data": {"button_id": button_id},
+        },
+    }
+
+@pytest.mark.parametrize("button_id, expected", [
+    ("buy:42", [("buy", "42")]),
+    ("help", [("inline", "help")]),
+])
+def test_button_clicks_skip_inline_handlers(button_id, expected):
+    bot = Bot("token")
+    seen = []
+    
+    @bot.button_handler("buy:*")
+    def buy(message, match):
+        seen.append(("buy", match.suffix))
+    
+    @bot.inline_handler
+    def fallback(message):
+        seen.append(("inline", message.button_id))
+    
+    bot.process_updates({"updates": [inline_update(button_id)]})
+    assert seen == expected
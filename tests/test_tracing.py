@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_server import MockRubikaServer
+from ruplika.bot import Bot
+from ruplika.tracing import SlowestUpdates, Tracer, UpdateTrace
+
+@pytest.fixture
+def mock_api():
+    server = MockRubikaServer(total_updates=3)
+    server.start_in_thread()
+    yield server
+    server.stop_thread()
+
+def finished_trace(seconds: float) -> UpdateTrace:
+    trace = UpdateTrace({"type": "NewMessage", "chat_id": "b0chat"})
+    trace.received -= seconds
+    trace.end = time.perf_counter()
+    return trace
+
+def test_slowest_updates_keeps_the_slowest():
+    slowest = SlowestUpdates(size=2)
+    traces = [finished_trace(seconds) for seconds in (0.01, 0.5, 0.2, 0.05)]
+    for trace in traces:
+        slowest.offer(trace)
+    
+    assert slowest.slowest() == [traces[1], traces[2]]
+    assert slowest.report().startswith("slowest 2 updates:")
+    
+    with pytest.raises(ValueError):
+        SlowestUpdates(size=0)
+
+def test_slowest_updates_flush_starts_a_new_window():
+    reports = []
+    slowest = SlowestUpdates(size=3, interval=0, output=reports.append)
+    slowest.offer(finished_trace(0.1))
+    assert len(reports) == 1 and "NewMessage chat=b0chat" in reports[0]
+    assert slowest.slowest() == [] and slowest.report() == "no traced updates"
+
+def test_hooks_and_spans_follow_the_current_update():
+    tracer = Tracer()
+    events = []
+    tracer.add_hook("before_handler", lambda span: events.append(("before", span.name)))
+    
+    @tracer.hook("after_handler")
+    def after(span):
+        events.append(("after", span.name))
+        raise RuntimeError("hook errors are swallowed")
+    
+    with pytest.raises(ValueError):
+        tracer.add_hook("before_everything", print)
+    
+    trace = tracer.receive({"type": "NewMessage", "chat_id": "c1"})
+    token = tracer.enter(trace)
+    assert Tracer.current() is trace
+    span = tracer.start("handler", "on_message")
+    tracer.finish(span, ValueError())
+    tracer.exit(trace, token)
+    
+    assert Tracer.current() is None
+    assert events == [("before", "on_message"), ("after", "on_message")]
+    assert trace.spans == [span] and isinstance(span.error, ValueError)
+    assert "!ValueError" in trace.format()
+
+def test_pending_pages_are_bounded():
+    tracer = Tracer()
+    pages = [{"updates": []} for _ in range(Tracer.MAX_PENDING_PAGES + 1)]
+    for page in pages:
+        tracer.finish(tracer.start("request", "getUpdates"), result=page)
+    
+    assert tracer.page_fetch(pages[0]) is None
+    assert tracer.page_fetch(pages[-1]) is not None
+    assert tracer.page_fetch(pages[-1]) is None
+
+def test_bot_traces_fetch_parse_handler_and_requests(mock_api):
+    slowest = SlowestUpdates(size=5)
+    bot = Bot("token", api_url=mock_api.url, tracer=Tracer(sampler=slowest))
+    
+    @bot.message_handler()
+    def reply(message):
+        bot.send_message("b0chat", "ok")
+    
+    page = bot.get_updates(limit=10)
+    # آپدیت‌های ساختگی سرور انواع مختلف دارند؛ همه با پیام متنی جایگزین می‌شوند
+    page["updates"][:] = [
+        {"type": "NewMessage", "chat_id": "b0chat", "new_message": {"message_id": str(i), "text": "hi"}}
+        for i in range(len(page["updates"]))
+    ]
+    bot.process_updates(page)
+    
+    traces = slowest.slowest()
+    assert len(traces) == 3
+    for trace in traces:
+        parts = trace.breakdown()
+        assert parts["fetch"] > 0 and parts["handler"] >= parts["request"] > 0
+        assert parts["total"] >= parts["handler"]
+        assert [span.kind for span in sorted(trace.spans, key=lambda span: span.start)] == [
+            "parse", "handler", "request"
+        ]
+        assert [span.name for span in trace.spans if span.kind == "handler"] == [
+            "test_bot_traces_fetch_parse_handler_and_requests.<locals>.reply"
+        ]
+    # سه آپدیت زمان دریافت یک صفحه را به اشتراک دارند
+    assert len({id(trace.fetch) for trace in traces}) == 1
@@ -0,0 +1,86 @@
+import asyncio
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_server import MockRubikaServer
+from ruplika.client import Client
+from ruplika.enums import FileTypeEnum
+from ruplika.upload import MultipartEncoder, source_size
+
+DATA = bytes(range(256)) * 40
+
+@pytest.fixture
+def mock_api():
+    server = MockRubikaServer()
+    server.start_in_thread()
+    yield server
+    server.stop_thread()
+
+def expected_body(encoder, data):
+    return encoder._head + data + encoder._tail
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_path_is_streamed_in_chunks(tmp_path, use_mmap):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(DATA)
+    reports = []
+    encoder = MultipartEncoder(str(path), chunk_size=1000, use_mmap=use_mmap,
+                               progress=lambda sent, total: reports.append((sent, total)))
+    
+    chunks = [bytes(chunk) for chunk in encoder]
+    assert b"".join(chunks) == expected_body(encoder, DATA)
+    assert max(len(chunk) for chunk in chunks[1:-1]) == 1000
+    assert encoder.len == encoder.length == len(b"".join(chunks))
+    assert reports[0] == (0, len(DATA)) and reports[-1] == (len(DATA), len(DATA))
+    assert b'filename="doc.pdf"' in encoder._head and b"application/pdf" in encoder._head
+
+def test_sources_of_unknown_size_are_chunked():
+    encoder = MultipartEncoder(iter([DATA[:100], b"", DATA[100:]]), filename="stream.bin")
+    assert encoder.length is None
+    with pytest.raises(AttributeError):
+        encoder.len
+    assert b"".join(encoder) == expected_body(encoder, DATA)
+
+def test_file_objects_are_read_from_their_position():
+    file = io.BytesIO(DATA)
+    file.seek(1000)
+    assert source_size(file) == len(DATA) - 1000
+    encoder = MultipartEncoder(file, filename="x.bin", chunk_size=333)
+    assert b"".join(encoder) == expected_body(encoder, DATA[1000:])
+
+def test_async_iteration_matches_sync(tmp_path):
+    path = tmp_path / "a.bin"
+    path.write_bytes(DATA)
+    
+    async def collect(encoder):
+        return b"".join([chunk async for chunk in encoder.aiter()])
+    
+    async def source():
+        yield DATA[:10]
+        yield DATA[10:]
+    
+    encoder = MultipartEncoder(str(path), chunk_size=777, use_mmap=True)
+    assert asyncio.run(collect(encoder)) == expected_body(encoder, DATA)
+    streamed = MultipartEncoder(source(), filename="a.bin")
+    assert asyncio.run(collect(streamed)) == expected_body(streamed, DATA)
+
+def test_invalid_chunk_size():
+    with pytest.raises(ValueError):
+        MultipartEncoder(b"x", chunk_size=0)
+
+def test_upload_file_streams_to_the_server(mock_api, tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(DATA)
+    client = Client("token", api_url=mock_api.url)
+    
+    file_id = client.upload_file(str(path), FileTypeEnum.IMAGE, chunk_size=1024)
+    generated = client.upload_file(iter([DATA]), FileTypeEnum.FILE, file_name="data.bin")
+    
+    assert file_id.startswith("mock-file-") and generated.startswith("mock-file-")
+    assert mock_api.counts["upload"] == 2
+    assert mock_api.bytes_uploaded >= 2 * len(DATA)
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+import aiohttp
+
+from ruplika.codec import JSONCodec
+from ruplika.webhook import WebhookServer
+
+class RecordingBot:
+    """بات همگام ساده که آپدیت‌ها و خطاها را ثبت می‌کند"""
+    
+    def __init__(self):
+        self.codec = JSONCodec()
+        self.updates = []
+        self.errors = []
+        self.threads = set()
+    
+    def process_webhook_update(self, update):
+        self.threads.add(threading.current_thread())
+        if update.get("fail"):
+            raise RuntimeError("handler failed")
+        self.updates.append(update)
+    
+    def _handle_error(self, error, update):
+        self.errors.append(error)
+
+def test_updates_are_processed_and_counted():
+    bot = RecordingBot()
+    server = WebhookServer(bot, host="127.0.0.1", port=0, path="/hook")
+    
+    async def main():
+        await server.start()
+        host, port = server.sockets[0]
+        async with aiohttp.ClientSession() as session:
+            for payload in ({"update": {"n": 1}}, {"update": {"fail": True}}, {"update": {"n": 2}}):
+                async with session.post(f"http://{host}:{port}/hook/receiveUpdate", json=payload) as response:
+                    assert response.status == 200
+            async with session.post(f"http://{host}:{port}/hook/unknown", json={}) as response:
+                assert response.status == 404
+        await server.stop(timeout=5)
+    
+    asyncio.run(main())
+    
+    assert bot.updates == [{"n": 1}, {"n": 2}]
+    assert len(bot.errors) == 1
+    assert threading.main_thread() not in bot.threads
+    stats = server.stats()
+    assert (stats["updates"], stats["processed"], stats["errors"], stats["rejected"]) == (3, 3, 1, 0)
+    assert stats["requests"] >= 3 and stats["pending"] == 0
@@ -0,0 +1,242 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+# رویدادهایی که می‌توان برایشان hook ثبت کرد
+EVENTS = (
+    "before_update", "after_update",
+    "before_parse", "after_parse",
+    "before_handler", "after_handler",
+    "before_request", "after_request",
+)
+
+def handler_name(handler: Callable) -> str:
+    """نام هندلر؛ هندلرهای مسیرهای دستور و دکمه (BoundHandler) با نام خود هندلر ثبت‌شده"""
+    handler = getattr(handler, "__wrapped__", handler)
+    return getattr(handler, "__qualname__", None) or type(handler).__name__
+
+_current_trace: ContextVar[Optional["UpdateTrace"]] = ContextVar("ruplika_trace", default=None)
+
+class Span:
+    """
+    یک مرحله‌ی زمان‌دار: kind یکی از parse، handler و request است و name
+    نوع آپدیت، نام هندلر یا متد API. trace آپدیتی است که span در آن رخ داده
+    (برای درخواست‌های بیرون از هندلرها None).
+    """
+    
+    __slots__ = ("kind", "name", "trace", "start", "end", "error")
+    
+    def __init__(self, kind: str, name: str, trace: Optional["UpdateTrace"]):
+        self.kind = kind
+        self.name = name
+        self.trace = trace
+        self.start = time.perf_counter()
+        self.end = 0.0
+        self.error: Optional[BaseException] = None
+    
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+    
+    def __repr__(self) -> str:
+        return f"Span({self.kind}:{self.name}, {self.duration * 1000:.2f} ms)"
+
+class UpdateTrace:
+    """
+    مسیر یک آپدیت ورودی از دریافت تا پایان هندلرها
+    
+    fetch درخواست getUpdates است که آپدیت را آورده (فقط در پولینگ)، queue
+    زمان انتظار در صف dispatcher و spans همه‌ی مراحل پارس، هندلرها و
+    درخواست‌های API که هندلرها فرستاده‌اند. زمان هر هندلر شامل درخواست‌های
+    داخل آن هم هست.
+    """
+    
+    _ids = itertools.count(1)
+    
+    def __init__(self, update_data: Dict[str, Any], fetch: Optional[Span] = None):
+        self.id = next(self._ids)
+        self.update_type = update_data.get("type", "")
+        self.chat_id = update_data.get("chat_id") or (update_data.get("inline_message") or {}).get("chat_id")
+        self.fetch = fetch
+        self.received = time.perf_counter()
+        self.started = 0.0
+        self.end = 0.0
+        self.spans: List[Span] = []
+    
+    @property
+    def duration(self) -> float:
+        """از دریافت آپدیت تا پایان هندلرها"""
+        return (self.end or time.perf_counter()) - self.received
+    
+    @property
+    def queue(self) -> float:
+        return (self.started or self.received) - self.received
+    
+    def breakdown(self) -> Dict[str, float]:
+        """مجموع زمان (ثانیه) به تفکیک مرحله"""
+        totals = {
+            "fetch": self.fetch.duration if self.fetch else 0.0,
+            "queue": self.queue,
+            "parse": 0.0,
+            "handler": 0.0,
+            "request": 0.0,
+        }
+        for span in self.spans:
+            totals[span.kind] = totals.get(span.kind, 0.0) + span.duration
+        totals["total"] = self.duration
+        return totals
+    
+    def format(self) -> str:
+        parts = self.breakdown()
+        lines = [
+            f"{self.update_type} chat={self.chat_id} total {parts['total'] * 1000:.2f} ms "
+            f"(fetch {parts['fetch'] * 1000:.2f}, queue {parts['queue'] * 1000:.2f}, "
+            f"parse {parts['parse'] * 1000:.2f}, handler {parts['handler'] * 1000:.2f}, "
+            f"request {parts['request'] * 1000:.2f})"
+        ]
+        for span in sorted(self.spans, key=lambda span: span.start):
+            error = f" !{type(span.error).__name__}" if span.error is not None else ""
+            offset = (span.start - self.received) * 1000
+            lines.append(f"  +{offset:8.2f} ms  {span.kind:<8} {span.name:<32} {span.duration * 1000:8.2f} ms{error}")
+        return "\n".join(lines)
+
+class SlowestUpdates:
+    """
+    نگه‌داری size آپدیت کندتر با جزئیات کامل
+    
+    با interval هر interval ثانیه گزارش کندترین‌ها با output (پیش‌فرض print)
+    چاپ و پنجره از نو شروع می‌شود؛ بدون آن report یا flush را خودتان صدا بزنید.
+    """
+    
+    def __init__(self, size: int = 10, interval: Optional[float] = None,
+                 output: Callable[[str], Any] = print):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        self.interval = interval
+        self.output = output
+        self._heap: List[tuple] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+    
+    def offer(self, trace: UpdateTrace):
+        duration = trace.duration
+        heap = self._heap
+        # مسیر سریع بدون قفل برای آپدیت‌هایی که به فهرست نمی‌رسند
+        if len(heap) < self.size or duration > heap[0][0]:
+            with self._lock:
+                if len(heap) < self.size:
+                    heapq.heappush(heap, (duration, trace.id, trace))
+                elif duration > heap[0][0]:
+                    heapq.heapreplace(heap, (duration, trace.id, trace))
+        if self.interval is not None and time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+    
+    def slowest(self) -> List[UpdateTrace]:
+        with self._lock:
+            return [item[2] for item in sorted(self._heap, reverse=True)]
+    
+    @staticmethod
+    def _format(traces: List[UpdateTrace]) -> str:
+        return "\n".join([f"slowest {len(traces)} updates:"] + [trace.format() for trace in traces])
+    
+    def report(self) -> str:
+        traces = self.slowest()
+        return self._format(traces) if traces else "no traced updates"
+    
+    def flush(self):
+        """چاپ گزارش و شروع پنجره‌ی جدید"""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._heap:
+                return
+            traces = [item[2] for item in sorted(self._heap, reverse=True)]
+            self._heap = []
+        self.output(self._format(traces))
+
+class Tracer:
+    """
+    hookهای قبل/بعد از هر مرحله و اتصال درخواست‌های API به آپدیت
+    
+    آپدیت در حال پردازش در یک ContextVar نگه داشته می‌شود، پس هر درخواستی
+    که هندلر (در همان ترد یا task) بفرستد به همان UpdateTrace اضافه می‌شود.
+    hookها با یک آرگومان (Span یا برای رویدادهای update خود UpdateTrace)
+    صدا زده می‌شوند و خطایشان پردازش را متوقف نمی‌کند. sampler (مثلا
+    SlowestUpdates) هر trace کامل‌شده را دریافت می‌کند.
+    """
+    
+    # تعداد پاسخ‌های getUpdates که زمانشان تا رسیدن به process_updates نگه داشته می‌شود
+    MAX_PENDING_PAGES = 16
+    
+    def __init__(self, sampler: Optional[SlowestUpdates] = None):
+        self.sampler = sampler
+        self._hooks: Dict[str, List[Callable]] = {event: [] for event in EVENTS}
+        self._pages: "OrderedDict[int, Span]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def add_hook(self, event: str, func: Callable[[Any], Any]):
+        if event not in self._hooks:
+            raise ValueError(f"event must be one of {', '.join(EVENTS)}")
+        self._hooks[event].append(func)
+    
+    def hook(self, event: str):
+        """دکوریتور ثبت hook برای یک رویداد"""
+        def decorator(func: Callable):
+            self.add_hook(event, func)
+            return func
+        return decorator
+    
+    def _emit(self, event: str, item: Any):
+        for func in self._hooks[event]:
+            try:
+                func(item)
+            except Exception as e:
+                print(f"❌ خطا در hook {event}: {e}")
+    
+    @staticmethod
+    def current() -> Optional[UpdateTrace]:
+        """trace آپدیتی که در ترد یا task فعلی پردازش می‌شود"""
+        return _current_trace.get()
+    
+    def start(self, kind: str, name: str) -> Span:
+        span = Span(kind, name, _current_trace.get())
+        self._emit("before_" + kind, span)
+        return span
+    
+    def finish(self, span: Span, error: Optional[BaseException] = None, result: Any = None):
+        span.end = time.perf_counter()
+        span.error = error
+        if span.trace is not None:
+            span.trace.spans.append(span)
+        elif span.name == "getUpdates" and result is not None:
+            # زمان دریافت صفحه به آپدیت‌های آن در process_updates متصل می‌شود
+            with self._lock:
+                self._pages[id(result)] = span
+                while len(self._pages) > self.MAX_PENDING_PAGES:
+                    self._pages.popitem(last=False)
+        self._emit("after_" + span.kind, span)
+    
+    def page_fetch(self, updates_data: Dict[str, Any]) -> Optional[Span]:
+        with self._lock:
+            return self._pages.pop(id(updates_data), None)
+    
+    def receive(self, update_data: Dict[str, Any], fetch: Optional[Span] = None) -> UpdateTrace:
+        """ساخت trace در لحظه‌ی دریافت آپدیت (قبل از صف dispatcher)"""
+        return UpdateTrace(update_data, fetch)
+    
+    def enter(self, trace: UpdateTrace):
+        trace.started = time.perf_counter()
+        token = _current_trace.set(trace)
+        self._emit("before_update", trace)
+        return token
+    
+    def exit(self, trace: UpdateTrace, token):
+        trace.end = time.perf_counter()
+        _current_trace.reset(token)
+        self._emit("after_update", trace)
+        if self.sampler is not None:
+            self.sampler.offer(trace)
@@ -0,0 +1,196 @@
+import asyncio
+import mimetypes
+import mmap
+import os
+import uuid
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Union
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+# progress(ارسال‌شده، کل یا None)
+ProgressCallback = Callable[[int, Optional[int]], Any]
+
+def is_path(source: Any) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+def source_size(source: Any) -> Optional[int]:
+    """حجم باقی‌مانده‌ی منبع یا None اگر از پیش معلوم نباشد"""
+    if is_path(source):
+        return os.path.getsize(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source).nbytes
+    if hasattr(source, "read"):
+        try:
+            position = source.tell()
+            end = os.fstat(source.fileno()).st_size
+            return max(0, end - position)
+        except (AttributeError, OSError, ValueError):
+            pass
+        try:
+            position = source.tell()
+            end = source.seek(0, os.SEEK_END)
+            source.seek(position)
+            return max(0, end - position)
+        except (AttributeError, OSError, ValueError):
+            return None
+    return None
+
+def source_name(source: Any) -> str:
+    if is_path(source):
+        return os.path.basename(os.fspath(source))
+    name = getattr(source, "name", None)
+    if isinstance(name, str) and name:
+        return os.path.basename(name)
+    return "file"
+
+class MultipartEncoder:
+    """
+    بدنه‌ی multipart/form-data جریانی با یک فیلد فایل
+    
+    فایل تکه به تکه (chunk_size بایت) خوانده و ارسال می‌شود و هیچ‌وقت کامل
+    در حافظه قرار نمی‌گیرد. منبع می‌تواند مسیر فایل، bytes، آبجکت فایل‌مانند
+    (دارای read) یا iterable از bytes باشد؛ در کلاینت ناهمگام async iterable
+    هم پذیرفته می‌شود. با use_mmap فایل مسیر به صورت memory-mapped و بدون
+    کپی در حافظه‌ی پایتون ارسال می‌شود.
+    
+    وقتی حجم منبع معلوم باشد (یا با size داده شود) Content-Length ارسال
+    می‌شود و در غیر این صورت بدنه به صورت chunked فرستاده می‌شود.
+    """
+    
+    def __init__(
+        self,
+        source: Any,
+        filename: Optional[str] = None,
+        field: str = "file",
+        content_type: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Optional[ProgressCallback] = None,
+        use_mmap: bool = False,
+        size: Optional[int] = None
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        
+        self.source = source
+        self.filename = filename or source_name(source)
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.use_mmap = use_mmap
+        self.size = size if size is not None else source_size(source)
+        self.boundary = uuid.uuid4().hex
+        
+        part_type = content_type or mimetypes.guess_type(self.filename)[0] or "application/octet-stream"
+        quoted = self.filename.replace("\\", "\\\\").replace('"', "%22").replace("\r", "").replace("\n", "")
+        self._head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{quoted}"\r\n'
+            f"Content-Type: {part_type}\r\n\r\n"
+        ).encode("utf-8")
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+    
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+    
+    @property
+    def length(self) -> Optional[int]:
+        """طول کل بدنه یا None اگر حجم منبع معلوم نباشد"""
+        if self.size is None:
+            return None
+        return len(self._head) + self.size + len(self._tail)
+    
+    @property
+    def len(self) -> int:
+        # requests طول بدنه‌های جریانی را از این ویژگی می‌خواند؛ نبودن آن یعنی chunked
+        if self.size is None:
+            raise AttributeError("len")
+        return self.length
+    
+    def _report(self, sent: int):
+        if self.progress is not None:
+            self.progress(sent, self.size)
+    
+    def _read_chunks(self, file) -> Iterator[bytes]:
+        while True:
+            chunk = file.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    
+    def _mmap_chunks(self, file) -> Iterator[memoryview]:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, len(view), self.chunk_size):
+                    chunk = view[offset:offset + self.chunk_size]
+                    try:
+                        yield chunk
+                    finally:
+                        # mmap تا وقتی نمایی از آن باز است بسته نمی‌شود
+                        chunk.release()
+            finally:
+                view.release()
+    
+    def _chunks(self) -> Iterator[Union[bytes, memoryview]]:
+        source = self.source
+        if is_path(source):
+            with open(source, "rb") as file:
+                if self.use_mmap:
+                    yield from self._mmap_chunks(file)
+                else:
+                    yield from self._read_chunks(file)
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            view = memoryview(source).cast("B")
+            for offset in range(0, len(view), self.chunk_size):
+                yield view[offset:offset + self.chunk_size]
+        elif hasattr(source, "read"):
+            yield from self._read_chunks(source)
+        else:
+            for chunk in source:
+                if chunk:
+                    yield chunk
+    
+    def __iter__(self) -> Iterator[Union[bytes, memoryview]]:
+        yield self._head
+        sent = 0
+        self._report(sent)
+        for chunk in self._chunks():
+            yield chunk
+            sent += len(chunk)
+            self._report(sent)
+        yield self._tail
+    
+    async def aiter(self) -> AsyncIterator[bytes]:
+        """
+        نسخه‌ی ناهمگام؛ خواندن از فایل در ترد جداگانه انجام می‌شود تا event
+        loop بلاک نشود
+        """
+        yield self._head
+        sent = 0
+        self._report(sent)
+        
+        if hasattr(self.source, "__aiter__"):
+            async for chunk in self.source:
+                if chunk:
+                    yield chunk
+                    sent += len(chunk)
+                    self._report(sent)
+        else:
+            loop = asyncio.get_running_loop()
+            chunks = self._chunks()
+            done = object()
+            try:
+                while True:
+                    chunk = await loop.run_in_executor(None, next, chunks, done)
+                    if chunk is done:
+                        break
+                    # aiohttp فقط bytes می‌پذیرد
+                    yield bytes(chunk) if isinstance(chunk, memoryview) else chunk
+                    sent += len(chunk)
+                    self._report(sent)
+            finally:
+                chunks.close()
+        
+        yield self._tail
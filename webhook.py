@@ -0,0 +1,395 @@
+import asyncio
+import inspect
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from .enums import UpdateEndpointTypeEnum
+from .metrics import _Cells
+
+# مسیر هر نوع endpoint زیر آدرس وب‌هوک (ReceiveUpdate -> receiveUpdate)
+ENDPOINT_PATHS = {
+    endpoint_type: endpoint_type.value[0].lower() + endpoint_type.value[1:]
+    for endpoint_type in UpdateEndpointTypeEnum
+}
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+# شمارنده‌های stats؛ errors از ترد اجرای هندلرها هم زیاد می‌شود
+_STAT_NAMES = ("requests", "updates", "processed", "rejected", "errors")
+_STAT_INDEX = {name: index for index, name in enumerate(_STAT_NAMES)}
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, close: bool = False):
+        super().__init__(status)
+        self.status = status
+        self.close = close
+
+class WebhookServer:
+    """
+    سرور وب‌هوک asyncio بدون وابستگی به فریم‌ورک
+    
+    هر نوع UpdateEndpointTypeEnum روی مسیر خودش زیر path دریافت می‌شود
+    (مثلا /receiveUpdate و /receiveInlineMessage). آپدیت‌ها بلافاصله پس از
+    قرار گرفتن در صف محدود تایید می‌شوند و یک مصرف‌کننده به ترتیب ورود آن‌ها
+    را به process_webhook_update بات می‌دهد؛ برای اجرای موازی هندلرها بات را
+    با workers > 0 بسازید. اگر صف تا enqueue_timeout ثانیه پر بماند پاسخ 503
+    برگردانده می‌شود.
+    
+    endpointهای ReceiveQuery، GetSelectionItem و SearchSelectionItems پاسخ
+    هم‌زمان لازم دارند و با responder ثبت می‌شوند.
+    """
+    
+    def __init__(
+        self,
+        bot: Any,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        path: str = "/",
+        queue_size: int = 10000,
+        enqueue_timeout: float = 5.0,
+        max_body_size: int = 1024 * 1024,
+        keepalive_timeout: float = 75.0,
+        batch_size: int = 100
+    ):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self.max_body_size = max_body_size
+        self.keepalive_timeout = keepalive_timeout
+        self.batch_size = batch_size
+        
+        prefix = "/" + path.strip("/") if path.strip("/") else ""
+        self.routes: Dict[str, UpdateEndpointTypeEnum] = {
+            f"{prefix}/{name}": endpoint_type for endpoint_type, name in ENDPOINT_PATHS.items()
+        }
+        self._responders: Dict[UpdateEndpointTypeEnum, Callable] = {}
+        self._async_bot = inspect.iscoroutinefunction(bot.process_webhook_update)
+        
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._connections: Set[asyncio.Task] = set()
+        self._busy: Set[asyncio.Task] = set()
+        self._closing = False
+        self._stats = _Cells(len(_STAT_NAMES))
+    
+    def responder(self, endpoint_type: UpdateEndpointTypeEnum):
+        """ثبت تابع پاسخ (همگام یا async) برای endpointهای درخواست/پاسخ"""
+        def decorator(func: Callable):
+            self._responders[endpoint_type] = func
+            return func
+        return decorator
+    
+    @property
+    def sockets(self) -> List[Tuple[str, int]]:
+        if self._server is None:
+            return []
+        return [sock.getsockname()[:2] for sock in self._server.sockets]
+    
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    def stats(self) -> Dict[str, int]:
+        stats = {name: int(value) for name, value in zip(_STAT_NAMES, self._stats.totals())}
+        stats["pending"] = self.pending
+        return stats
+    
+    def _count(self, name: str, amount: int = 1):
+        self._stats.cell()[_STAT_INDEX[name]] += amount
+    
+    def _normalize(self, endpoint_type: UpdateEndpointTypeEnum, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """تبدیل بدنه‌ی وب‌هوک به ساختار آپدیت getUpdates"""
+        if endpoint_type == UpdateEndpointTypeEnum.RECEIVE_UPDATE:
+            return payload.get("update", payload)
+        
+        if endpoint_type == UpdateEndpointTypeEnum.RECEIVE_INLINE_MESSAGE:
+            inline_message = payload.get("inline_message", payload)
+            return {
+                "type": "InlineMessage",
+                "chat_id": inline_message.get("chat_id"),
+                "inline_message": inline_message,
+            }
+        
+        return None
+    
+    async def start(self):
+        """شروع گوش دادن روی host:port"""
+        if self._server is not None:
+            return
+        
+        self._closing = False
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if not self._async_bot:
+            # هندلرهای بات همگام روی یک ترد جدا و به ترتیب ورود اجرا می‌شوند
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ruplika-webhook")
+        self._consumer = asyncio.ensure_future(self._consume())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+    
+    async def stop(self, timeout: Optional[float] = 10.0):
+        """
+        توقف با تخلیه‌ی کامل: دریافت اتصال جدید متوقف می‌شود، درخواست‌های در
+        حال پردازش پاسخ می‌گیرند و آپدیت‌های صف و dispatcher بات اجرا می‌شوند
+        """
+        if self._server is None:
+            return
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        def remaining() -> Optional[float]:
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+        
+        self._closing = True
+        self._server.close()
+        
+        # اتصال‌های بیکار keep-alive بسته می‌شوند و درخواست‌های فعال تمام می‌شوند
+        for task in self._connections - self._busy:
+            task.cancel()
+        if self._connections:
+            await asyncio.wait(set(self._connections), timeout=remaining())
+        # از پایتون 3.12 منتظر بسته شدن همه‌ی اتصال‌ها هم می‌ماند
+        await self._server.wait_closed()
+        
+        try:
+            await asyncio.wait_for(self._queue.join(), remaining())
+        except asyncio.TimeoutError:
+            pass
+        
+        self._consumer.cancel()
+        try:
+            await self._consumer
+        except asyncio.CancelledError:
+            pass
+        
+        dispatcher = getattr(self.bot, "_dispatcher", None)
+        if dispatcher is not None:
+            if self._async_bot:
+                try:
+                    await asyncio.wait_for(dispatcher.join(), remaining())
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(self._executor, dispatcher.join, remaining())
+        
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._server = None
+    
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+    
+    def run(self, drain_timeout: Optional[float] = 10.0):
+        """اجرای بلاک‌کننده تا SIGINT/SIGTERM و سپس توقف با تخلیه"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        stopped = asyncio.Event()
+        
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stopped.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        
+        try:
+            loop.run_until_complete(self.start())
+            try:
+                loop.run_until_complete(stopped.wait())
+            except KeyboardInterrupt:
+                pass
+            loop.run_until_complete(self.stop(drain_timeout))
+        finally:
+            loop.close()
+    
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            try:
+                if self._async_bot:
+                    for update in batch:
+                        await self._process_async(update)
+                else:
+                    await loop.run_in_executor(self._executor, self._process_batch, batch)
+            finally:
+                self._count("processed", len(batch))
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _process_batch(self, batch: List[Dict[str, Any]]):
+        for update in batch:
+            try:
+                self.bot.process_webhook_update(update)
+            except Exception as e:
+                self._count("errors")
+                self.bot._handle_error(e, None)
+    
+    async def _process_async(self, update: Dict[str, Any]):
+        try:
+            await self.bot.process_webhook_update(update)
+        except Exception as e:
+            self._count("errors")
+            self.bot._handle_error(e, None)
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task() if hasattr(asyncio, "current_task") else asyncio.Task.current_task()
+        self._connections.add(task)
+        try:
+            while not self._closing:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keepalive_timeout)
+                except asyncio.LimitOverrunError:
+                    self._write_response(writer, 431, close=True)
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                
+                self._busy.add(task)
+                try:
+                    keep_alive = await self._handle_request(head, reader, writer)
+                    await writer.drain()
+                finally:
+                    self._busy.discard(task)
+                if not keep_alive:
+                    break
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+    
+    async def _handle_request(self, head: bytes, reader: asyncio.StreamReader,
+                              writer: asyncio.StreamWriter) -> bool:
+        try:
+            method, target, version, headers = self._parse_head(head)
+        except _HTTPError as e:
+            self._write_response(writer, e.status, close=True)
+            return False
+        
+        connection = headers.get("connection", "").lower()
+        keep_alive = (version == "HTTP/1.1" and connection != "close") or connection == "keep-alive"
+        keep_alive = keep_alive and not self._closing
+        self._count("requests")
+        
+        try:
+            body = await self._read_body(headers, reader, writer)
+            if method != "POST":
+                raise _HTTPError(405)
+            
+            endpoint_type = self.routes.get(target.split("?", 1)[0].rstrip("/"))
+            if endpoint_type is None:
+                raise _HTTPError(404)
+            
+            try:
+                payload = self.bot.codec.loads(body)
+            except ValueError:
+                raise _HTTPError(400)
+            if not isinstance(payload, dict):
+                raise _HTTPError(400)
+            
+            response = await self._dispatch(endpoint_type, payload)
+        except _HTTPError as e:
+            keep_alive = keep_alive and not e.close
+            self._write_response(writer, e.status, close=not keep_alive)
+            return keep_alive
+        
+        self._write_response(writer, 200, response, close=not keep_alive)
+        return keep_alive
+    
+    def _parse_head(self, head: bytes):
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise _HTTPError(400)
+        
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, sep, value = line.partition(":")
+            if not sep:
+                raise _HTTPError(400)
+            headers[name.strip().lower()] = value.strip()
+        return method, target, version, headers
+    
+    async def _read_body(self, headers: Dict[str, str], reader: asyncio.StreamReader,
+                         writer: asyncio.StreamWriter) -> bytes:
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise _HTTPError(411, close=True)
+        
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise _HTTPError(400, close=True)
+        if length < 0:
+            raise _HTTPError(400, close=True)
+        if length > self.max_body_size:
+            raise _HTTPError(413, close=True)
+        
+        if headers.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        
+        try:
+            return await reader.readexactly(length) if length else b""
+        except asyncio.IncompleteReadError:
+            raise _HTTPError(400, close=True)
+    
+    async def _dispatch(self, endpoint_type: UpdateEndpointTypeEnum, payload: Dict[str, Any]) -> Any:
+        update = self._normalize(endpoint_type, payload)
+        if update is None:
+            responder = self._responders.get(endpoint_type)
+            if responder is None:
+                return {}
+            try:
+                result = responder(payload)
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception as e:
+                self._count("errors")
+                self.bot._handle_error(e, None)
+                raise _HTTPError(500)
+            return result if result is not None else {}
+        
+        try:
+            await asyncio.wait_for(self._queue.put(update), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self._count("rejected")
+            raise _HTTPError(503)
+        
+        self._count("updates")
+        return {}
+    
+    def _write_response(self, writer: asyncio.StreamWriter, status: int, payload: Any = None, close: bool = False):
+        body = self.bot.codec.dumps(payload if payload is not None else {})
+        headers = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Connection: close" if close else "Connection: keep-alive",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)